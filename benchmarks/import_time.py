@@ -0,0 +1,81 @@
+import os
+import sys
+import json
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+# entry points, utility modules first
+MODULES = ('src.utils', 'src.sinks', 'src.index', 'src.report', 'src.screening', 'src.columnar',
+           'src.acm', 'src.ieee', 'src.scidirect', 'src.orchestrator')
+
+# modules which make an import slow when pulled in without need
+HEAVY = ('numpy', 'pandas', 'pyarrow', 'openpyxl', 'requests', 'lxml',
+         'selenium.webdriver.remote.webdriver', 'undetected_chromedriver', 'selenium_stealth')
+
+SCRIPT = """
+import sys, time, json
+started = time.perf_counter()
+import {module}
+print(json.dumps({{"seconds": time.perf_counter() - started,
+                   "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def import_time(module: str, repeat=5) -> dict:
+    """
+    time a cold import of a module in fresh interpreters, run outside the
+    repository root so imports that need config.json fail
+
+    Parameters
+    ----------
+    module: str
+
+    repeat: int
+        number of interpreters started, the median is reported
+
+    Returns
+    -------
+    median and best milliseconds and heavy modules loaded: dict
+
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=root + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    runs = []
+
+    with tempfile.TemporaryDirectory() as folder:
+        for _ in range(repeat):
+            done = subprocess.run([sys.executable, '-c', SCRIPT.format(module=module, heavy=HEAVY)],
+                                  cwd=folder, env=env, capture_output=True, text=True)
+
+            if done.returncode != 0:
+                return {"module": module, "error": done.stderr.strip().splitlines()[-1]}
+
+            runs.append(json.loads(done.stdout))
+
+    return {"module": module,
+            "median_ms": round(statistics.median(r["seconds"] for r in runs) * 1000, 1),
+            "best_ms": round(min(r["seconds"] for r in runs) * 1000, 1),
+            "heavy": runs[-1]["heavy"]}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='cold import time of the entry points')
+    parser.add_argument('modules', nargs='*', default=list(MODULES))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--save_to', default=None, help='write the results as json')
+    args = parser.parse_args()
+
+    results = [import_time(module, args.repeat) for module in args.modules]
+
+    for result in results:
+        if "error" in result:
+            print(f"{result['module']:<18} failed: {result['error']}")
+
+        else:
+            print(f"{result['module']:<18} {result['median_ms']:>8} ms  loads {', '.join(result['heavy']) or '-'}")
+
+    if args.save_to is not None:
+        with open(args.save_to, 'w') as file:
+            json.dump(results, file, indent=2)
@@ -0,0 +1,353 @@
+import json
+import zlib
+import math
+import time
+import random
+import threading
+import multiprocessing
+
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+WORDS = ('sign', 'language', 'gesture', 'recognition', 'video', 'processing', 'deep', 'learning',
+         'network', 'hand', 'pose', 'tracking', 'dataset', 'model', 'accuracy', 'real', 'time',
+         'camera', 'feature', 'temporal', 'spatial', 'translation', 'deaf', 'communication')
+
+TYPES = ('Research Article', 'Short Paper', 'Review Article', 'Research article')
+
+BLOCK_PAGE = "<html><head><title>Access Denied</title></head><body>blocked</body></html>"
+
+
+def text(seed: int, words: int) -> str:
+    generator = random.Random(seed)
+
+    return ' '.join(generator.choice(WORDS) for _ in range(words))
+
+
+def paper(source: str, i: int) -> dict:
+    """
+    fake publication of a source, the same for every request
+    """
+    seed = zlib.crc32(f"{source}:{i}".encode('utf-8'))
+
+    return {"title": f"{text(seed, 8).capitalize()} {i}",
+            "year": 2000 + i % 24,
+            "type_": TYPES[i % len(TYPES)],
+            "abs": text(seed + 1, 120 + i % 80),
+            "kws": [text(seed + 2, 2), text(seed + 3, 1), text(seed + 4, 2)],
+            "doi": f"10.{1000 + i % 9000}/{source.lower()}.{i}"}
+
+
+def ieee_search(options, body: dict) -> tuple:
+    rows = int(body.get('rowsPerPage', 25))
+    page = int(body.get('pageNumber', 1))
+    records = []
+
+    for i in range((page - 1) * rows, min(page * rows, options['papers'])):
+        found = paper('IEEE', i)
+        record = {"articleNumber": str(9000000 + i),
+                  "articleTitle": found["title"].replace('sign', '[::sign::]'),
+                  "documentLink": f"/document/{9000000 + i}/",
+                  "publicationYear": str(found["year"]),
+                  "doi": found["doi"]}
+
+        # some search results come without the abstract, as the real api does
+        if i % 10:
+            record["abstract"] = found["abs"]
+
+        records.append(record)
+
+    return 'application/json', json.dumps({"totalRecords": options['papers'],
+                                           "totalPages": max(1, math.ceil(options['papers'] / rows)),
+                                           "records": records})
+
+
+def ieee_keywords(options, number: int) -> tuple:
+    found = paper('IEEE', number - 9000000)
+
+    return 'application/json', json.dumps({"keywords": [{"type": "IEEE Keywords", "kwd": found["kws"][:2]},
+                                                        {"type": "Author Keywords", "kwd": found["kws"][2:]}]})
+
+
+def ieee_document(options, number: int) -> tuple:
+    found = paper('IEEE', number - 9000000)
+    metadata = {"abstract": found["abs"],
+                "keywords": [{"type": "IEEE Keywords", "kwd": found["kws"]}]}
+    keywords = ''.join(f"<li class='doc-keywords-list-item'><ul><li>{escape(kw)}</li></ul></li>"
+                       for kw in found["kws"])
+
+    return 'text/html', (f"<html><head><title>{escape(found['title'])}</title>"
+                         f"<script>xplGlobal.document.metadata={json.dumps(metadata)};\n</script></head>"
+                         f"<body><div class='abstract-text'>Abstract:\n{escape(found['abs'])}</div>"
+                         f"<button id='keywords'>Keywords</button>"
+                         f"<ul class='doc-keywords-list stats-keywords-list'>{keywords}</ul></body></html>")
+
+
+def acm_search(options, query: dict) -> tuple:
+    size = int(query.get('pageSize', ['50'])[0])
+    start = int(query.get('startPage', ['0'])[0])
+    items = []
+
+    for i in range(start * size, min((start + 1) * size, options['papers'])):
+        found = paper('ACM', i)
+        items.append(f"<li class='search__item'><div class='issue-heading'>{found['type_']}</div>"
+                     f"<div class='bookPubDate'>May {found['year']}</div>"
+                     f"<h5 class='issue-item__title'><span class='hlFld-Title'>"
+                     f"<a href='/doi/10.1145/{3000000 + i}'>{escape(found['title'])}</a></span></h5></li>")
+
+    return 'text/html', (f"<html><head><title>ACM Digital Library</title></head><body>"
+                         f"<span class='hitsLength result__count'>{options['papers']} Results</span>"
+                         f"<ul class='search-result__xsl-body'>{''.join(items)}</ul></body></html>")
+
+
+def acm_paper(options, number: int) -> tuple:
+    found = paper('ACM', number - 3000000)
+
+    return 'text/html', (f"<html><head><title>{escape(found['title'])}</title></head><body>"
+                         f"<div class='abstractSection abstractInFull'><p>{escape(found['abs'])}</p></div>"
+                         f"</body></html>")
+
+
+def scidir_search(options, query: dict) -> tuple:
+    size = int(query.get('show', ['25'])[0])
+    offset = int(query.get('offset', ['0'])[0])
+    items = []
+
+    for i in range(offset, min(offset + size, options['papers'])):
+        found = paper('SCIDIR', i)
+        items.append(f"<li class='ResultItem'><span class='article-type'>{found['type_']}</span>"
+                     f"<h2><a class='result-list-title-link' id='S{i:016d}' "
+                     f"href='/science/article/pii/S{i:016d}'>{escape(found['title'])}</a></h2></li>")
+
+    return 'text/html', (f"<html><head><title>ScienceDirect</title></head><body>"
+                         f"<span class='search-body-results-text'>{options['papers']} results</span>"
+                         f"<ol class='search-result-wrapper'>{''.join(items)}</ol></body></html>")
+
+
+def scidir_paper(options, pii: str) -> tuple:
+    found = paper('SCIDIR', int(pii.lstrip('S')))
+
+    return 'text/html', (f"<html><head><title>{escape(found['title'])}</title></head><body>"
+                         f"<div class='abstract author'><h2>Abstract</h2><p>{escape(found['abs'])}</p></div>"
+                         f"</body></html>")
+
+
+def route(options, method: str, path: str, query: dict, body: dict):
+    """
+    page for a request, None when the path is unknown
+    """
+    parts = [p for p in path.split('/') if p]
+
+    if method == 'POST' and path == '/rest/search':
+        return ieee_search(options, body)
+
+    if method != 'GET':
+        return None
+
+    if len(parts) == 4 and parts[:2] == ['rest', 'document'] and parts[3] == 'keywords':
+        return ieee_keywords(options, int(parts[2]))
+
+    if len(parts) == 2 and parts[0] == 'document':
+        return ieee_document(options, int(parts[1]))
+
+    if path == '/action/doSearch':
+        return acm_search(options, query)
+
+    if len(parts) == 3 and parts[0] == 'doi':
+        return acm_paper(options, int(parts[2]))
+
+    if path == '/search':
+        return scidir_search(options, query)
+
+    if len(parts) == 4 and parts[:3] == ['science', 'article', 'pii']:
+        return scidir_paper(options, parts[3])
+
+    return None
+
+
+class Handler(BaseHTTPRequestHandler):
+    # set by serve for each server
+    options = {}
+
+    # keep-alive connections, as the real sites allow
+    protocol_version = 'HTTP/1.1'
+
+    # headers and body are written separately, without this every
+    # response waits for a delayed ack
+    disable_nagle_algorithm = True
+
+    def respond(self, method):
+        options = self.options
+        url = urlsplit(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(length) or b'{}') if length else {}
+
+        delay = options['latency'] * (1 + options['jitter'] * (2 * random.random() - 1))
+        time.sleep(max(0.0, delay))
+
+        draw = random.random()
+
+        if draw < options['error_rate']:
+            self.send(503, 'text/plain', 'service unavailable')
+            return
+
+        if draw < options['error_rate'] + options['block_rate']:
+            self.send(200, 'text/html', BLOCK_PAGE)
+            return
+
+        page = route(options, method, url.path, parse_qs(url.query), body)
+
+        if page is None:
+            self.send(404, 'text/plain', 'not found')
+            return
+
+        self.send(200, *page)
+
+    def send(self, status, content_type, content):
+        data = content.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', f"{content_type}; charset=utf-8")
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self.respond('GET')
+
+    def do_POST(self):
+        self.respond('POST')
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(ports: dict, options: dict, ready=None) -> None:
+    """
+    run a mock server for each source until the process is stopped
+
+    Parameters
+    ----------
+    ports: dict
+        port of each source, 0 picks a free port
+
+    options: dict
+        papers, latency (seconds), jitter (fraction of latency), error_rate
+        and block_rate
+
+    ready: multiprocessing.Queue
+        the ports in use are put here once the servers listen
+
+    Returns
+    -------
+
+    """
+    handler = type('MockHandler', (Handler,), {'options': options})
+    servers = {source: ThreadingHTTPServer(('127.0.0.1', port), handler) for source, port in ports.items()}
+
+    for server in servers.values():
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    if ready is not None:
+        ready.put({source: server.server_address[1] for source, server in servers.items()})
+
+    threading.Event().wait()
+
+
+class MockServers:
+    """
+    Parameters
+    ----------
+    papers: int
+        number of publications each source finds
+
+    latency: float
+        mean seconds before a response
+
+    jitter: float
+        latency varies by this fraction either way
+
+    error_rate: float
+        fraction of requests answered with 503
+
+    block_rate: float
+        fraction of requests answered with a block page
+
+    Attributes
+    ----------
+    urls: dict
+        base url of each source, set once started
+
+    Methods
+    -------
+    start:
+        run the servers in a separate process, so they do not count
+        against the memory and cpu of the scrappers
+
+    stop:
+        end the server process
+    """
+
+    def __init__(self, papers=1000, latency=0.02, jitter=0.5, error_rate=0.0, block_rate=0.0):
+        self.options = {"papers": papers, "latency": latency, "jitter": jitter,
+                        "error_rate": error_rate, "block_rate": block_rate}
+        self.process = None
+        self.urls = {}
+
+    def start(self) -> dict:
+        ready = multiprocessing.Queue()
+        self.process = multiprocessing.Process(target=serve,
+                                               args=({'IEEE': 0, 'ACM': 0, 'SCIDIR': 0}, self.options, ready),
+                                               daemon=True)
+        self.process.start()
+        self.urls = {source: f"http://127.0.0.1:{port}" for source, port in ready.get(timeout=30).items()}
+
+        return self.urls
+
+    def stop(self) -> None:
+        if self.process is not None:
+            self.process.terminate()
+            self.process.join()
+            self.process = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+
+
+def acm_links(url: str, papers: int) -> dict:
+    """
+    search results the ACM scrapper finds on the mock server, used when
+    the search is not run in a browser
+    """
+    links = {}
+
+    for i in range(papers):
+        found = paper('ACM', i)
+        links[str(3000000 + i)] = {"type_": found["type_"],
+                                   "date": f"May {found['year']}",
+                                   "title": found["title"],
+                                   "link": f"{url}/doi/10.1145/{3000000 + i}"}
+
+    return links
+
+
+def scidir_links(url: str, papers: int) -> dict:
+    """
+    search results the ScienceDirect scrapper finds on the mock server,
+    used when the search is not run in a browser
+    """
+    links = {}
+
+    for i in range(papers):
+        found = paper('SCIDIR', i)
+        links[f"S{i:016d}"] = {"title": found["title"],
+                               "link": f"{url}/science/article/pii/S{i:016d}",
+                               "type_": found["type_"]}
+
+    return links
@@ -0,0 +1,316 @@
+import os
+import json
+import time
+import argparse
+import threading
+import requests
+import numpy as np
+
+from urllib.parse import urlsplit
+from src import rate_limit, retry
+from benchmarks.mock_servers import MockServers, acm_links, scidir_links
+
+try:
+    import psutil
+
+except ImportError:
+    psutil = None
+
+_lock = threading.Lock()
+_phase = None
+
+# attributes replaced while the benchmark runs, put back when it ends
+_patches = []
+
+# seconds between memory samples of a phase
+SAMPLE_EVERY = 0.05
+
+
+def patch(owner, name: str, value) -> None:
+    """
+    replace an attribute of a class or module until restore is called,
+    the raw attribute is kept so static methods stay static
+    """
+    _patches.append((owner, name, owner.__dict__.get(name, None), name in owner.__dict__))
+    setattr(owner, name, value)
+
+
+def restore() -> None:
+    while _patches:
+        owner, name, old, owned = _patches.pop()
+
+        if owned:
+            setattr(owner, name, old)
+
+        else:
+            delattr(owner, name)
+
+
+class Phase:
+    """
+    Parameters
+    ----------
+    name: str
+        source and phase, e.g. IEEE search
+
+    Attributes
+    ----------
+    latencies: list
+        seconds of every request made in the phase
+
+    errors: int
+        requests answered with an error status or failed
+
+    papers: int
+        publications found or read
+
+    failures: int
+        publications the scrapper could not read
+
+    Methods
+    -------
+    record:
+        add the latency of a request
+
+    report:
+        throughput, latency percentiles and peak memory of the phase
+
+    Notes
+    -----
+    memory is the largest resident size sampled while the phase runs,
+    so each phase reports its own peak. needs psutil, None otherwise
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.latencies = []
+        self.errors = 0
+        self.papers = 0
+        self.failures = 0
+        self.pages = None
+        self.seconds = 0.0
+        self.started = None
+        self.peak_rss = None
+        self.stopped = threading.Event()
+        self.sampler = None
+
+    def record(self, seconds: float, failed=False) -> None:
+        with _lock:
+            self.latencies.append(seconds)
+            self.errors += failed
+
+    def sample(self) -> None:
+        process = psutil.Process(os.getpid())
+
+        while True:
+            self.peak_rss = max(self.peak_rss or 0, process.memory_info().rss)
+
+            if self.stopped.wait(SAMPLE_EVERY):
+                return
+
+    def __enter__(self):
+        global _phase
+        _phase = self
+
+        if psutil is not None:
+            self.sampler = threading.Thread(target=self.sample, daemon=True)
+            self.sampler.start()
+
+        self.started = time.perf_counter()
+
+        return self
+
+    def __exit__(self, *args):
+        global _phase
+        self.seconds = time.perf_counter() - self.started
+        self.stopped.set()
+
+        if self.sampler is not None:
+            self.sampler.join()
+
+        _phase = None
+
+    def report(self) -> dict:
+        pages = self.pages if self.pages is not None else len(self.latencies)
+        latencies = np.array(self.latencies or [np.nan]) * 1000
+
+        return {"phase": self.name,
+                "seconds": round(self.seconds, 3),
+                "pages": pages,
+                "pages_per_s": round(pages / self.seconds, 2) if self.seconds else None,
+                "papers": self.papers,
+                "papers_per_s": round(self.papers / self.seconds, 2) if self.seconds else None,
+                "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+                "p99_ms": round(float(np.percentile(latencies, 99)), 2),
+                "errors": self.errors,
+                "failures": self.failures,
+                "peak_rss_mb": round(self.peak_rss / 2 ** 20, 1) if self.peak_rss is not None else None}
+
+
+def timed(function, failed=lambda result: False):
+    """
+    wrap a request function so each call is counted in the current phase
+    """
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+
+        try:
+            result = function(*args, **kwargs)
+
+        except Exception:
+            if _phase is not None:
+                _phase.record(time.perf_counter() - started, failed=True)
+
+            raise
+
+        if _phase is not None:
+            _phase.record(time.perf_counter() - started, failed=failed(result))
+
+        return result
+
+    return wrapper
+
+
+def no_browser():
+    raise RuntimeError("browser is disabled, run the benchmark with --browser")
+
+
+def read_details(paper, links: dict, phase: Phase, browser: bool) -> None:
+    """
+    read every publication the way stream mode does, a publication the
+    scrapper can not read is counted instead of stopping the benchmark
+    """
+    if not browser:
+        patch(paper, 'init_driver', no_browser)
+
+    for value in links.values():
+        try:
+            paper.update_paper(value)
+
+        except Exception:
+            phase.failures += 1
+            continue
+
+        phase.papers += 1
+
+    if paper.driver is not None:
+        paper.close_driver()
+
+
+def ieee_phases(url: str, args) -> list:
+    from src.ieee import IEEE, Paper
+
+    patch(IEEE, 'search_url', f"{url}/rest/search")
+    patch(Paper, 'base_url', url)
+
+    with Phase('IEEE search') as search:
+        scrapper = IEEE(args.query, workers=args.workers)
+        scrapper.get_links_to_papers()
+        search.papers = len(scrapper.links_to_paper)
+        search.pages = scrapper.page_count
+
+    with Phase('IEEE details') as details:
+        paper = Paper(scrapper.links_to_paper, use_api=True, api_workers=args.workers, checkpoint=False)
+        paper.api_update_details(25)
+        details.papers = sum(isinstance(v.get('abs'), str) for v in paper.link_object.values())
+        details.failures = len(paper.link_object) - details.papers
+
+    return [search, details]
+
+
+def html_phases(source: str, url: str, args) -> list:
+    if source == 'ACM':
+        from src.acm import ACM as Search, Paper
+
+        links = acm_links(url, args.papers)
+
+    else:
+        from src.scidirect import ScienceDirect as Search, Paper
+
+        links = scidir_links(url, args.papers)
+
+    phases = []
+    patch(Search, 'base_url', url)
+
+    # search result pages are only read in a browser
+    if args.browser:
+        patch(Search, 'post_request', timed(Search.post_request))
+        patch(Paper, 'request_paper', timed(Paper.request_paper))
+
+        with Phase(f'{source} search') as search:
+            scrapper = Search(args.start, args.end, args.query)
+            scrapper.get_links_to_papers()
+            search.papers = len(scrapper.links_to_paper)
+            links = scrapper.links_to_paper
+
+        phases.append(search)
+
+    with Phase(f'{source} details') as details:
+        read_details(Paper(links, http_first=True, checkpoint=False), links, details, args.browser)
+
+    phases.append(details)
+
+    return phases
+
+
+def run(args) -> list:
+    servers = MockServers(args.papers, args.latency / 1000, args.jitter, args.error_rate, args.block_rate)
+    urls = servers.start()
+
+    # pace the local hosts as configured instead of the polite defaults
+    pacing = {"rate": args.rate, "max_rate": args.rate, "min_rate": min(args.min_rate, args.rate), "jitter": 0.0}
+    rate_limit.configure({urlsplit(url).netloc: pacing for url in urls.values()})
+    retry.configure({"base_delay": args.retry_delay, "max_delay": 10 * args.retry_delay})
+
+    patch(requests.Session, 'send', timed(requests.Session.send, failed=lambda response: response.status_code >= 400))
+
+    phases = []
+
+    try:
+        for source in args.sources:
+            if source == 'IEEE':
+                phases.extend(ieee_phases(urls[source], args))
+
+            else:
+                phases.extend(html_phases(source, urls[source], args))
+
+    finally:
+        restore()
+        servers.stop()
+
+    return [phase.report() for phase in phases]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='scrapper throughput against local mock servers')
+    parser.add_argument('--sources', nargs='+', default=['IEEE', 'ACM', 'SCIDIR'],
+                        choices=['IEEE', 'ACM', 'SCIDIR'])
+    parser.add_argument('--papers', type=int, default=500, help='publications each source finds')
+    parser.add_argument('--latency', type=float, default=20.0, help='mean response time in milliseconds')
+    parser.add_argument('--jitter', type=float, default=0.5, help='latency varies by this fraction')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of 503 responses')
+    parser.add_argument('--block-rate', type=float, default=0.0, help='fraction of block pages')
+    parser.add_argument('--rate', type=float, default=1000.0, help='requests per second for each host')
+    parser.add_argument('--min-rate', type=float, default=50.0,
+                        help='lowest requests per second the limiter backs off to on errors')
+    parser.add_argument('--retry-delay', type=float, default=0.05, help='first retry delay in seconds')
+    parser.add_argument('--workers', type=int, default=4, help='IEEE search and api workers')
+    parser.add_argument('--query', default='sign language')
+    parser.add_argument('--start', type=int, default=2000)
+    parser.add_argument('--end', type=int, default=2024)
+    parser.add_argument('--browser', action='store_true',
+                        help='run ACM and ScienceDirect searches and unreadable pages in chrome')
+    parser.add_argument('--save_to', default=None, help='write the results as json')
+    args = parser.parse_args()
+
+    results = run(args)
+
+    columns = list(results[0].keys()) if results else []
+    print('\n' + ' | '.join(columns))
+
+    for result in results:
+        print(' | '.join(str(result[c]) for c in columns))
+
+    if args.save_to is not None:
+        with open(args.save_to, 'w') as file:
+            json.dump(results, file, indent=2)
@@ -1,12 +1,23 @@
 import os
-
-from datetime import datetime
-from src.scidirect import ScienceDirect, Paper as SDP
-from src.acm import ACM, Paper as ACMP
-from src.ieee import IEEE, Paper as IXP
+import atexit
+import argparse
+
+from src.cache import open_cache
+from src.driver_pool import DriverPool
+from src.orchestrator import run_sources
+from src import metrics, page_stats, profiling, retry, waits
+from src.rate_limit import configure, current_rates
 from src.utils import *
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--concurrent', action='store_true',
+                        help='run configured scrappers at the same time')
+    parser.add_argument('--profile', nargs='*', choices=['cpu', 'memory'], default=None,
+                        help='time the phases of the run and sample stacks into ./temp/profile, '
+                             'cpu adds cProfile and memory adds tracemalloc')
+    args = parser.parse_args()
+
     config = read_json("./config.json")
     assert validate(config)
 
@@ -16,86 +27,87 @@ if __name__ == "__main__":
     if not os.path.isdir('abs'):
         os.mkdir('abs')
 
-    scrappers = {'IEEE', 'ACM', 'SCIDIR'}.intersection(set(config.keys()))
-
-    for s in scrappers:
-        if s == 'IEEE':
-            # get links to individual search results
-            ieee = IEEE(config['IEEE']['search_term'])
-            ieee.get_links_to_papers()
-
-            # dump links
-            if config['IEEE']['keep_link_file']:
-                ieee.to_json(config['IEEE']['link_file_save_to'])
-
-            # get abstract of the and every search results
-            ieee_paper = IXP(config['IEEE']['link_file_save_to'])
-
-            if config['IEEE']['use_batches']:
-                ieee_paper.batch_update_details(config['IEEE']['batch_size'])
+    # profile files are written once the run ends, also when it fails
+    if args.profile is not None:
+        profiling.start('cpu' in args.profile, 'memory' in args.profile)
+        atexit.register(lambda: print(f"slowest phases: {profiling.stop()[:10]}"))
 
-            else:
-                ieee_paper.update_paper_details()
+    scrappers = sorted({'IEEE', 'ACM', 'SCIDIR'}.intersection(set(config.keys())))
 
-            ieee_paper.to_json(config['IEEE']['abs_file_save_to'])
+    # warm browsers shared by every paper scrapper
+    pool = None
 
-            if not config['IEEE']['keep_link_file']:
-                os.remove(config['IEEE']['link_file_save_to'])
+    if config.get('DRIVER_POOL', False):
+        options = config['DRIVER_POOL'] if isinstance(config['DRIVER_POOL'], dict) else {}
+        pool = DriverPool(config['BINARY_LOCATION'],
+                          config['EXECUTABLE_PATH'],
+                          options.get('size', 2),
+                          options.get('max_pages', 200),
+                          options.get('max_memory_mb', None),
+                          config.get('BROWSER_PROFILE', 'default'))
+        pool.warm()
 
-        elif s == 'ACM':
-            # get links to individual search results
-            current_year = datetime.now().year
-            acm = ACM((current_year - 5), current_year, config['ACM']['search_term'])
-            acm.get_links_to_papers()
+    # starting request rate and bounds of each host
+    configure(config.get('RATE_LIMITS', None))
 
-            # dump links
-            if config['ACM']['keep_link_file']:
-                acm.to_json(config['ACM']['link_file_save_to'])
+    # retry budget of failing requests and pause of failing hosts
+    retry.configure(config.get('RETRY', None))
 
-            # get abstract of the and every search results
-            acm_paper = ACMP(config['ACM']['link_file_save_to'])
+    # how long the browser waits for abstracts and keywords of each source
+    waits.configure(config.get('WAITS', None))
 
-            if config['ACM']['use_batches']:
-                acm_paper.batch_update_details(config['ACM']['batch_size'])
+    # responses of earlier runs
+    cache = open_cache(config.get('CACHE', None))
 
-            else:
-                acm_paper.update_paper_details()
+    # request, extraction and wait metrics are counted from this run on
+    metrics.reset()
 
-            acm_paper.to_json(config['ACM']['abs_file_save_to'])
+    try:
+        with profiling.span('scrape'):
+            errors = run_sources(config, scrappers, args.concurrent, pool, cache)
 
-            if not config['ACM']['keep_link_file']:
-                os.remove(config['ACM']['link_file_save_to'])
+    finally:
+        if pool is not None:
+            pool.close()
 
-        elif s == 'SCIDIR':
-            # get links to individual search results
-            current_year = datetime.now().year
-            sd = ScienceDirect((current_year - 5), current_year, config['SCIDIR']['search_term'])
+        if cache is not None:
+            print(f"cache: {cache.stats()}")
+            cache.close()
 
-            if sd.driver is not None:
-                sd.driver.delete_all_cookies()
+        print(f"request rates: {current_rates()}")
+        print(f"page waits: {waits.summary()}")
 
-            sd.get_links_to_papers()
+        page_stats.save()
+        print(f"page loads: {page_stats.report()}")
 
-            # dump links
-            if config['SCIDIR']['keep_link_file']:
-                sd.to_json(config['SCIDIR']['link_file_save_to'])
+        metrics.export(config.get('METRICS', {}).get('textfile', './temp/metrics.prom'),
+                       config.get('METRICS', {}).get('summary', './temp/metrics.json'))
 
-            # get abstract of the and every search results
-            sd_paper = SDP(config['SCIDIR']['link_file_save_to'])
+    # columnar copy of the results of the sources which finished
+    if config.get('PARQUET', False):
+        from src.columnar import write_parquet
 
-            if sd_paper.driver is not None:
-                sd_paper.driver.delete_all_cookies()
+        write_parquet({name: config[name]['abs_file_save_to'] for name in scrappers if name not in errors},
+                      config['PARQUET'].get('path', './abs/parquet'),
+                      config['PARQUET'].get('batch_size', 5000))
 
-            if config['SCIDIR']['use_batches']:
-                sd_paper.batch_update_details(config['SCIDIR']['batch_size'])
+    # screening index over the abstracts of the sources which finished
+    if config.get('INDEX', False):
+        from src.index import build_index
 
-            else:
-                sd_paper.update_paper_details()
+        build_index({name: config[name]['abs_file_save_to'] for name in scrappers if name not in errors},
+                    config['INDEX'].get('path', './abs/index.pkl'))
 
-            sd_paper.to_json(config['SCIDIR']['abs_file_save_to'])
+    # inclusion and exclusion rules applied to the abstracts of the sources which finished
+    if config.get('SCREENING', False):
+        from src.screening import load_rules, screen
 
-            if not config['SCIDIR']['keep_link_file']:
-                os.remove(config['SCIDIR']['link_file_save_to'])
+        screened = screen({name: config[name]['abs_file_save_to'] for name in scrappers if name not in errors},
+                          load_rules(config['SCREENING']['rules']),
+                          config['SCREENING'].get('save_to', './abs/screened.json'),
+                          config['SCREENING'].get('output', 'json'),
+                          config['SCREENING'].get('chunk_size', 100000))
+        print(f"screening: {screened}")
 
-        else:
-            raise ConfigurationError(f"wrong scrapper {s}.")
+    if errors:
+        raise SystemExit(1)
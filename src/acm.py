@@ -1,11 +1,15 @@
-import os
+import copy
 import time
 import json
-import numpy as np
-import undetected_chromedriver
-from selenium import webdriver
+import math
 from selenium.webdriver.common.by import By
-from selenium_stealth import stealth
+from src.cache import render_cached
+from src.rate_limit import limiter_for, is_block_page
+from src.waits import waits_for
+from src.driver_pool import new_driver, hide_automation
+from src import metrics, page_stats
+from src.journal import Journal, atomic_write_json
+from src.fast_fetch import HttpFetcher, text_by_class
 from src.utils import *
 
 
@@ -23,6 +27,9 @@ class ACM:
         string of search terms (it can be comma seperated or semicolon
         seperated string)
 
+    cache: ResponseCache
+        cache for search result pages
+
     Attributes
     ----------
     driver: undetected_chromedriver.Chrome
@@ -34,6 +41,9 @@ class ACM:
     links_to_paper: dict
         mined links and additional details for results
 
+    sink: RecordSink
+        results are written here one by one instead of links_to_paper
+
     origin: str
         origin of science direct advanced search url
 
@@ -69,6 +79,9 @@ class ACM:
     post_request:
         post a request to science direct server
 
+    cache_page:
+        save the page in the browser to the cache
+
     check_for_multiple_pages:
         check weather search results contains multiple pages
         in results
@@ -76,6 +89,15 @@ class ACM:
     mine_links:
         get links to each search result (for each individual paper)
 
+    add_link:
+        keep a search result or send it to the sink
+
+    pages:
+        startPage of every search results page
+
+    read_page:
+        mine a single search results page
+
     get_links_to_papers:
         create paper link list
 
@@ -83,24 +105,28 @@ class ACM:
         dump results into json
 
     """
-    options = webdriver.ChromeOptions()
-    config = read_json('./config.json')
+    # site searched, benchmarks use a local server
+    base_url = "https://dl.acm.org"
 
-    options.add_argument("--headless")
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option('useAutomationExtension', False)
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    options.binary_location = config['BINARY_LOCATION']
+    # read from config.json when first used
+    config = LazyConfig()
 
     def __init__(self,
                  start,
                  end,
-                 search_terms):
+                 search_terms,
+                 cache=None,
+                 sink=None):
         self.driver = None
+        self.cache = cache
+        self.waits = waits_for('ACM')
+        self.current_link = None
+        self.from_cache = False
         self.page_count = None
         self.links_to_paper = {}
+        self.sink = sink
         self.search_terms = search_terms
-        self.origin = "https://dl.acm.org/action/doSearch?"
+        self.origin = f"{self.base_url}/action/doSearch?"
         self.quick_search = "fillQuickSearch=false"
         self.target = "&target=advanced&expand=dl"
         self.date_filter = f"&AfterYear={start}&BeforeYear={end}"
@@ -165,9 +191,7 @@ class ACM:
         -------
 
         """
-        self.driver = undetected_chromedriver.Chrome(chrome_options=self.options,
-                                                     executable_path=self.config['EXECUTABLE_PATH'])
-        clean_cookies_and_caches(self.driver)
+        self.driver = new_driver(self.config['BINARY_LOCATION'], self.config['EXECUTABLE_PATH'])
 
     def close_driver(self) -> None:
         """
@@ -192,18 +216,40 @@ class ACM:
         -------
 
         """
-        stealth(self.driver,
-                languages=["en-US", "en"],
-                vendor="Google Inc.",
-                platform="Win32",
-                webgl_vendor="Intel Inc.",
-                renderer="Intel Iris OpenGL Engine",
-                fix_hairline=True,
-                )
-        # make request
+        self.current_link = link
+        cached = self.cache.get('ACM', link) if self.cache is not None else None
+        self.from_cache = cached is not None
+
+        if self.from_cache:
+            metrics.count('ACM', 'search_page', 'cached')
+            render_cached(self.driver, cached)
+            return
+
+        hide_automation(self.driver)
+        # make request, paced by the shared limiter of the host
+        limiter = limiter_for(link)
+        limiter.wait()
+
         self.driver.delete_all_cookies()
-        self.driver.get(link)
-        time.sleep(abs(np.random.normal(2, 0.4)))
+
+        with metrics.timed('ACM', 'search_page') as event:
+            self.driver.get(link)
+            blocked = is_block_page(self.driver)
+            event["outcome"] = 'blocked' if blocked else 'ok'
+
+        limiter.feedback(blocked=blocked)
+
+    def cache_page(self) -> None:
+        """
+        save the page in the browser to the cache, called once the page
+        is known to have search results
+
+        Returns
+        -------
+
+        """
+        if self.cache is not None and not self.from_cache:
+            self.cache.put('ACM', self.current_link, None, self.driver.page_source)
 
     def check_for_multiple_pages(self) -> bool:
         """
@@ -217,12 +263,14 @@ class ACM:
         link = self.construct_full_link()
         self.init_driver()
         self.post_request(link)
+        self.waits.present(self.driver, By.CLASS_NAME, 'result__count', 'result count')
 
         tot_results = int(self.driver.find_element(By.CLASS_NAME,
                                                    value="result__count").text.split(' ')[0])
 
-        self.page_count = int(np.round(tot_results / 50))
+        self.page_count = round(tot_results / 50)
 
+        self.cache_page()
         self.close_driver()
 
         return True if self.page_count > 1 else False
@@ -242,12 +290,78 @@ class ACM:
                                           value="h5[class='issue-item__title']>span[class='hlFld-Title']>a")
 
         for type_, date, title, link in zip(types, dates, titles, links):
-            self.links_to_paper[f'{link.get_attribute("href").split("/")[-1]}'] = {"type_": type_.text,
-                                                                                   "date": date.text,
-                                                                                   "title": title.text,
-                                                                                   "link": link.get_attribute('href')}
+            self.add_link(f'{link.get_attribute("href").split("/")[-1]}', {"type_": type_.text,
+                                                                           "date": date.text,
+                                                                           "title": title.text,
+                                                                           "link": link.get_attribute('href')})
 
-        time.sleep(abs(np.random.uniform(2, 4)))
+        if links:
+            self.cache_page()
+
+    def add_link(self, key: str, record: dict) -> None:
+        """
+        keep a search result, or send it straight to the sink when
+        results are streamed
+
+        Parameters
+        ----------
+        key: str
+            key of the publication
+
+        record: dict
+            listing details of the publication
+
+        Returns
+        -------
+
+        """
+        if self.sink is not None:
+            self.sink.write(key, record)
+
+        else:
+            self.links_to_paper[key] = record
+
+    def pages(self) -> range:
+        """
+        startPage of every search results page to mine, known once
+        check_for_multiple_pages is done
+
+        Returns
+        -------
+        page numbers: range
+
+        """
+        return range(1, (self.page_count + 1)) if self.page_count > 1 else range(0, 1)
+
+    def read_page(self, number: int) -> dict:
+        """
+        mine a single search results page in its own browser, pages can
+        be read at the same time
+
+        Parameters
+        ----------
+        number: int
+            startPage of the page
+
+        Returns
+        -------
+        links and additional details of the results in the page: dict
+
+        """
+        page = copy.copy(self)
+        page.links_to_paper, page.sink = {}, None
+        page.start_page = f"&startPage={number}"
+
+        page.init_driver()
+
+        try:
+            page.post_request(page.construct_full_link())
+            page.mine_links()
+
+        finally:
+            page.close_driver()
+
+        return page.links_to_paper
 
     def get_links_to_papers(self) -> None:
         """
@@ -257,22 +371,13 @@ class ACM:
         -------
 
         """
-        if self.check_for_multiple_pages():
-            for i in range(1, (self.page_count + 1)):
-                self.start_page = f"&startPage={i}"
-                self.init_driver()
-                self.post_request(self.construct_full_link())
-                self.mine_links()
+        self.check_for_multiple_pages()
 
-                print(f'reading page: {i + 1} from {self.page_count}', end='\r')
+        for i in self.pages():
+            for key, record in self.read_page(i).items():
+                self.add_link(key, record)
 
-                self.close_driver()
-
-        else:
-            self.init_driver()
-            self.post_request(self.construct_full_link())
-            self.mine_links()
-            self.close_driver()
+            print(f'reading page: {i + 1} from {self.page_count}', end='\r')
 
     def to_json(self, path) -> None:
         """
@@ -292,21 +397,83 @@ class ACM:
 
 
 class Paper:
-    options = webdriver.ChromeOptions()
-    config = read_json('./config.json')
+    # read from config.json when first used
+    config = LazyConfig()
+
+    # default or lean, see driver_pool.chrome_options
+    profile = LazyConfig(key='BROWSER_PROFILE', default='default')
 
-    options.add_argument("--headless")
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option('useAutomationExtension', False)
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    options.binary_location = config['BINARY_LOCATION']
+    journal_file = './acm_journal.jsonl'
 
-    def __init__(self, file_name):
+    def __init__(self,
+                 file_name,
+                 pool=None,
+                 http_first=False,
+                 cache=None,
+                 checkpoint=True,
+                 resume=False):
         self.driver = None
+        self.pool = pool
+        self.cache = cache
+        self.waits = waits_for('ACM')
+        self.fetcher = HttpFetcher(cache=cache, source='ACM') if http_first else None
         self.destination = file_name
+        self.journal = Journal(self.journal_file) if checkpoint else None
+        self.finished = set()
+
+        # records can be given directly, as parallel workers do
+        if isinstance(file_name, dict):
+            self.link_object = file_name
+
+        else:
+            with open(file_name, "r") as file:
+                self.link_object = json.load(file)
+
+        self.restore(resume)
+
+    def restore(self, resume) -> None:
+        """
+        take finished records from the journal of an earlier run, or
+        start over with an empty journal
+
+        Parameters
+        ----------
+        resume: bool
+            skip publications finished by an earlier run
+
+        Returns
+        -------
+
+        """
+        if self.journal is None:
+            return
+
+        if not resume:
+            self.journal.remove()
+            return
+
+        for key, value in self.journal.load().items():
+            if key in self.link_object:
+                self.link_object[key] = value
+                self.finished.add(key)
+
+    def checkpoint(self, key) -> None:
+        """
+        mark publication as finished and append it to the journal
+
+        Parameters
+        ----------
+        key: str
+            key of the publication in the link object
+
+        Returns
+        -------
+
+        """
+        self.finished.add(key)
 
-        with open(file_name, "r") as file:
-            self.link_object = json.load(file)
+        if self.journal is not None:
+            self.journal.append(key, self.link_object[key])
 
     def init_driver(self) -> None:
         """
@@ -316,9 +483,13 @@ class Paper:
         -------
 
         """
-        self.driver = undetected_chromedriver.Chrome(chrome_options=self.options,
-                                                     executable_path=self.config['EXECUTABLE_PATH'])
-        clean_cookies_and_caches(self.driver)
+        if self.pool is not None:
+            self.driver = self.pool.acquire()
+            return
+
+        self.driver = new_driver(self.config['BINARY_LOCATION'],
+                                 self.config['EXECUTABLE_PATH'],
+                                 self.profile)
 
     def close_driver(self) -> None:
         """
@@ -328,7 +499,13 @@ class Paper:
         -------
 
         """
-        self.driver.close()
+        if self.pool is not None:
+            self.pool.release(self.driver)
+
+        else:
+            self.driver.close()
+
+        self.driver = None
 
     def request_paper(self, page_link) -> None:
         """
@@ -343,22 +520,28 @@ class Paper:
         -------
 
         """
-        stealth(self.driver,
-                languages=["en-US", "en"],
-                vendor="Google Inc.",
-                platform="Win32",
-                webgl_vendor="Intel Inc.",
-                renderer="Intel Iris OpenGL Engine",
-                fix_hairline=True,
-                )
+        hide_automation(self.driver)
 
         URL = page_link
 
-        # make request
+        # make request, paced by the shared limiter of the host
+        limiter = limiter_for(URL)
+        limiter.wait()
+
         self.driver.delete_all_cookies()
-        self.driver.get(URL)
 
-        time.sleep(abs(np.random.normal(1, 0.4)))
+        with metrics.timed('ACM', 'paper_page') as event:
+            started = time.monotonic()
+            self.driver.get(URL)
+            page_stats.record(self.driver, self.profile, time.monotonic() - started)
+
+            blocked = is_block_page(self.driver)
+            event["outcome"] = 'blocked' if blocked else 'ok'
+
+        limiter.feedback(blocked=blocked)
+
+        if self.pool is not None:
+            self.pool.record_page(self.driver)
 
     def get_abstract_text(self) -> str:
         """
@@ -391,39 +574,85 @@ class Paper:
     #                                          "class='doc-keywords-list-item']>ul")
     #     return [kw.text.replace('\n', '') for kw in kw_types if kw.text != '']
 
-    def update_paper_details(self) -> None:
+    def update_paper(self, value: dict) -> bool:
         """
-        update the detail object of the publications
+        add abstract of a single publication to its record
+
+        Parameters
+        ----------
+        value: dict
+            record of the publication from the link object
 
         Returns
         -------
+        weather the abstract was read, records which failed are not
+        checkpointed so a resumed run tries them again: bool
 
         """
-        # start driver
-        self.init_driver()
+        # pages readable without javascript or read before skip the browser
+        abstract = None
 
-        for obj in self.link_object.values():
-            doc_link = obj['link']
-            self.request_paper(doc_link)
-            # self.click_kw_section()
+        if self.fetcher is not None:
+            abstract = self.fetcher.get_text(value["link"], 'abstractInFull')
 
-            time.sleep(abs(np.random.normal(1, 0.4)))
+        elif self.cache is not None:
+            abstract = text_by_class(self.cache.get('ACM', value["link"]) or '', 'abstractInFull')
 
-            try:
-                abstract = self.get_abstract_text()
-                # kws = self.get_keywords()
+        # an empty abstract in the static html is left to the browser
+        abstract = abstract.strip() if abstract else None
 
-            except:
-                abstract = np.NAN
-                # kws = np.NAN
+        if abstract:
+            value["abs"] = abstract
+            return True
 
-            obj['abs'] = abstract
+        # browser is only started for pages the fast path could not read
+        if self.driver is None:
+            self.init_driver()
 
-            # if kws not in value:
-            #     value.append(kws)
+        self.request_paper(value["link"])
+        self.waits.present(self.driver, By.CLASS_NAME, 'abstractInFull', 'abstract')
+
+        started = time.monotonic()
+
+        try:
+            abstract = self.get_abstract_text()
+
+        except:
+            abstract = math.nan
+            metrics.observe('ACM', 'extraction', time.monotonic() - started, 'miss')
+
+        else:
+            metrics.observe('ACM', 'extraction', time.monotonic() - started)
+
+            if self.cache is not None:
+                self.cache.put('ACM', value["link"], None, self.driver.page_source)
+
+        value["abs"] = abstract
+
+        return isinstance(abstract, str)
+
+    def update_paper_details(self) -> None:
+        """
+        update the detail object of the publications
+
+        Returns
+        -------
+
+        """
+        # start driver, http first mode starts it on demand
+        if self.fetcher is None:
+            self.init_driver()
+
+        for key, value in self.link_object.items():
+            if key in self.finished:
+                continue
+
+            if self.update_paper(value):
+                self.checkpoint(key)
 
         # close driver
-        self.close_driver()
+        if self.driver is not None:
+            self.close_driver()
 
     def batch_update_details(self, size) -> None:
         """
@@ -438,31 +667,21 @@ class Paper:
         -------
 
         """
-        keys = list(self.link_object.keys())
-
-        for i in range(size, len(self.link_object), size):
-            batch = keys[(i - size):i]
-            self.init_driver()
-
-            for p in batch:
-                doc_link = self.link_object[p]["link"]
-                self.request_paper(doc_link)
+        keys = [key for key in self.link_object.keys() if key not in self.finished]
 
-                try:
-                    abstract = self.get_abstract_text()
+        for i in range(0, len(keys), size):
+            batch = keys[i:(i + size)]
 
-                except:
-                    abstract = np.NAN
-
-                if abstract not in list(self.link_object[p].values()):
-                    self.link_object[p]["abs"] = abstract
+            if self.fetcher is None:
+                self.init_driver()
 
-            # dump updated link object to json
-            with open('./acm_temp.json', 'w') as file:
-                json.dump(self.link_object, file)
+            for p in batch:
+                if self.update_paper(self.link_object[p]):
+                    self.checkpoint(p)
 
             # close driver
-            self.close_driver()
+            if self.driver is not None:
+                self.close_driver()
 
     def to_json(self, path) -> None:
         """
@@ -477,11 +696,8 @@ class Paper:
         -------
 
         """
-        if os.path.isfile('./acm_temp.json'):
-            with open('./acm_temp.json') as file:
-                self.link_object = json.load(file)
+        atomic_write_json(path, self.link_object)
 
-            os.remove('./acm_temp.json')
-
-        with open(path, 'w') as file:
-            json.dump(self.link_object, file)
+        # results are safe in the output file, journal is not needed anymore
+        if self.journal is not None:
+            self.journal.remove()
@@ -0,0 +1,305 @@
+import re
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# puts between exact size counts of the cache file
+RECOUNT_EVERY = 100
+
+
+def normalize_url(url: str) -> str:
+    """
+    normalize URL so the same page always gives the same cache key,
+    scheme and host are lower cased, query parameters sorted and
+    fragment dropped
+
+    Parameters
+    ----------
+    url: str
+
+    Returns
+    -------
+    normalized url: str
+
+    """
+    parts = urlsplit(url.strip())
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or '/', query, ''))
+
+
+def make_key(url: str, body=None) -> str:
+    """
+    create cache key from the URL and the request body
+
+    Parameters
+    ----------
+    url: str
+        URL of the request
+
+    body: dict
+        json body of a post request
+
+    Returns
+    -------
+    key: str
+
+    """
+    raw = normalize_url(url)
+
+    if body is not None:
+        raw += '\n' + json.dumps(body, sort_keys=True, separators=(',', ':'))
+
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def render_cached(driver, document: str) -> None:
+    """
+    load a cached page into the browser without a request, scripts are
+    removed so the page does not call the server again
+
+    Parameters
+    ----------
+    driver: undetected_chromedriver.Chrome
+
+    document: str
+        html of the page
+
+    Returns
+    -------
+
+    """
+    document = re.sub(r'<script\b.*?</script\s*>', '', document, flags=re.S | re.I)
+
+    driver.get('about:blank')
+    driver.execute_script("document.open(); document.write(arguments[0]); document.close();", document)
+
+
+class ResponseCache:
+    """
+    Parameters
+    ----------
+    path: str
+        sqlite database file
+
+    max_mb: float
+        size limit of the stored (compressed) responses, least recently
+        used responses are removed above it
+
+    ttl_hours: dict
+        time to live of the responses of each source, keyed by source name
+
+    default_ttl_hours: float
+        time to live for sources not in ttl_hours
+
+    Attributes
+    ----------
+    hits: dict
+        number of responses served from the cache, keyed by source name
+
+    misses: dict
+        number of responses not found or expired, keyed by source name
+
+    Methods
+    -------
+    get:
+        get a cached response
+
+    put:
+        store a response
+
+    evict:
+        remove least recently used responses until size limit is met
+
+    stats:
+        hit and miss counters with the cache size
+
+    """
+
+    def __init__(self,
+                 path='./temp/cache.sqlite',
+                 max_mb=512,
+                 ttl_hours=None,
+                 default_ttl_hours=24):
+        self.path = path
+        self.max_bytes = int(max_mb * 2 ** 20)
+        self.ttl_hours = ttl_hours or {}
+        self.default_ttl_hours = default_ttl_hours
+        self.hits = {}
+        self.misses = {}
+        self.puts = 0
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+
+        with self.lock, self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS responses ("
+                                    "key TEXT PRIMARY KEY, source TEXT, created REAL, "
+                                    "accessed REAL, size INTEGER, body BLOB)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+
+        # running size of the stored responses, so a put does not sum the whole table
+        self.total = self.size()
+
+    def ttl_seconds(self, source: str) -> float:
+        return self.ttl_hours.get(source, self.default_ttl_hours) * 3600
+
+    def get(self, source: str, url: str, body=None):
+        """
+        get a cached response
+
+        Parameters
+        ----------
+        source: str
+            name of the source, IEEE, ACM or SCIDIR
+
+        url: str
+            URL of the request
+
+        body: dict
+            json body of a post request
+
+        Returns
+        -------
+        response text or None if not cached or expired
+
+        """
+        key = make_key(url, body)
+        now = time.time()
+
+        with self.lock, self.connection:
+            row = self.connection.execute("SELECT created, body, size FROM responses WHERE key = ?",
+                                          (key,)).fetchone()
+
+            if row is not None and now - row[0] > self.ttl_seconds(source):
+                self.connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.total -= row[2]
+                row = None
+
+            if row is None:
+                self.misses[source] = self.misses.get(source, 0) + 1
+                return None
+
+            self.connection.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self.hits[source] = self.hits.get(source, 0) + 1
+
+        return zlib.decompress(row[1]).decode('utf-8')
+
+    def put(self, source: str, url: str, body, content: str) -> None:
+        """
+        store a response
+
+        Parameters
+        ----------
+        source: str
+            name of the source, IEEE, ACM or SCIDIR
+
+        url: str
+            URL of the request
+
+        body: dict
+            json body of a post request
+
+        content: str
+            response text
+
+        Returns
+        -------
+
+        """
+        blob = zlib.compress(content.encode('utf-8'))
+        key = make_key(url, body)
+        now = time.time()
+
+        with self.lock, self.connection:
+            old = self.connection.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self.connection.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                                    (key, source, now, now, len(blob), blob))
+            self.total += len(blob) - (old[0] if old is not None else 0)
+            self.puts += 1
+
+            # workers of other processes write to the same file, their responses are counted now and then
+            if self.puts % RECOUNT_EVERY == 0:
+                self.total = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+        if self.total > self.max_bytes:
+            self.evict()
+
+    def size(self) -> int:
+        with self.lock:
+            return self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def evict(self) -> None:
+        """
+        remove least recently used responses until size limit is met
+
+        Returns
+        -------
+
+        """
+        with self.lock, self.connection:
+            self.total = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+            if self.total <= self.max_bytes:
+                return
+
+            rows = self.connection.execute("SELECT key, size FROM responses ORDER BY accessed").fetchall()
+            removed = []
+
+            for key, size in rows:
+                if self.total <= self.max_bytes:
+                    break
+
+                removed.append((key,))
+                self.total -= size
+
+            self.connection.executemany("DELETE FROM responses WHERE key = ?", removed)
+
+    def stats(self) -> dict:
+        """
+        hit and miss counters with the cache size
+
+        Returns
+        -------
+        stats: dict
+
+        """
+        return {"hits": dict(self.hits),
+                "misses": dict(self.misses),
+                "size_mb": round(self.size() / 2 ** 20, 2)}
+
+    def close(self) -> None:
+        with self.lock:
+            self.connection.close()
+
+
+def open_cache(options):
+    """
+    create response cache from the CACHE configuration
+
+    Parameters
+    ----------
+    options: dict
+        CACHE configuration, path, max_mb and ttl_hours, true for the
+        defaults
+
+    Returns
+    -------
+    cache: ResponseCache or None if caching is not configured
+
+    """
+    if not options:
+        return None
+
+    # "CACHE": true uses the defaults
+    options = options if isinstance(options, dict) else {}
+
+    return ResponseCache(options.get('path', './temp/cache.sqlite'),
+                         options.get('max_mb', 512),
+                         options.get('ttl_hours', None),
+                         options.get('default_ttl_hours', 24))
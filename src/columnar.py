@@ -0,0 +1,295 @@
+import re
+import math
+
+from src.sinks import read_records
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv
+    import pyarrow.dataset as ds
+
+except ImportError:
+    pa = None
+
+# fields of a publication, same for every source
+FIELDS = ('key', 'title', 'link', 'date', 'type', 'abs', 'kws')
+
+# columns the dataset is split into directories by
+PARTITION_FIELDS = ('source', 'year')
+
+YEAR_PATTERN = re.compile(r'(19|20)\d{2}')
+
+
+def require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("parquet output needs pyarrow, install it with `pip install pyarrow`")
+
+
+def schema():
+    """
+    fixed schema of the dataset, source and year are kept in the
+    directory names
+
+    Returns
+    -------
+    schema: pyarrow.Schema
+
+    """
+    require_pyarrow()
+
+    return pa.schema([('key', pa.string()),
+                      ('source', pa.string()),
+                      ('title', pa.string()),
+                      ('link', pa.string()),
+                      ('date', pa.string()),
+                      ('year', pa.int32()),
+                      ('type', pa.string()),
+                      ('abs', pa.string()),
+                      ('kws', pa.list_(pa.string()))])
+
+
+def clean(value):
+    # failed pages leave NaN in the json files
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+
+    return value
+
+
+def to_row(source: str, key: str, record: dict) -> dict:
+    """
+    map a record of any source to the dataset schema
+
+    Parameters
+    ----------
+    source: str
+        name of the source, IEEE, ACM or SCIDIR
+
+    key: str
+        key of the publication
+
+    record: dict
+        record from a link or abstract file
+
+    Returns
+    -------
+    row: dict
+
+    """
+    date = clean(record.get('date'))
+    year = YEAR_PATTERN.search(str(date)) if date is not None else None
+    kws = clean(record.get('kws'))
+    abstract = clean(record.get('abs'))
+
+    if abstract is None:
+        abstract = clean(record.get('abstract'))
+
+    if isinstance(kws, str):
+        kws = [kws]
+
+    return {'key': str(key),
+            'source': source,
+            'title': clean(record.get('title')),
+            'link': clean(record.get('link')),
+            'date': None if date is None else str(date),
+            'year': int(year.group(0)) if year is not None else None,
+            'type': clean(record.get('type_')),
+            'abs': None if abstract is None else str(abstract),
+            'kws': None if kws is None else [str(kw) for kw in kws]}
+
+
+def record_batches(sources: dict, batch_size=5000):
+    """
+    read result files record by record and group them into record batches
+
+    Parameters
+    ----------
+    sources: dict
+        link or abstract file of each source, keyed by source name
+
+    batch_size: int
+        number of rows in a batch
+
+    Returns
+    -------
+    generator of pyarrow.RecordBatch
+
+    """
+    fixed = schema()
+
+    for source, path in sources.items():
+        rows = []
+
+        for key, record in read_records(path):
+            rows.append(to_row(source, key, record))
+
+            if len(rows) == batch_size:
+                yield pa.RecordBatch.from_pylist(rows, schema=fixed)
+                rows = []
+
+        if rows:
+            yield pa.RecordBatch.from_pylist(rows, schema=fixed)
+
+
+def write_parquet(sources: dict, path='./abs/parquet', batch_size=5000) -> None:
+    """
+    write results of the sources as a parquet dataset partitioned by
+    source and year, partitions written before for the same source and
+    year are replaced
+
+    Parameters
+    ----------
+    sources: dict
+        link or abstract file of each source, keyed by source name
+
+    path: str
+        root directory of the dataset
+
+    batch_size: int
+        number of rows read into memory at once
+
+    Returns
+    -------
+
+    """
+    fixed = schema()
+    partitioning = ds.partitioning(pa.schema([fixed.field(f) for f in PARTITION_FIELDS]), flavor='hive')
+
+    ds.write_dataset(record_batches(sources, batch_size),
+                     path,
+                     schema=fixed,
+                     format='parquet',
+                     partitioning=partitioning,
+                     existing_data_behavior='delete_matching')
+
+
+def open_dataset(path='./abs/parquet'):
+    require_pyarrow()
+
+    return ds.dataset(path, format='parquet', partitioning='hive', schema=schema())
+
+
+def read_table(path='./abs/parquet', sources=None, columns=None):
+    """
+    load the dataset, only the partitions of the given sources are read
+
+    Parameters
+    ----------
+    path: str
+        root directory of the dataset
+
+    sources: list
+        names of the sources to read, all if not given
+
+    columns: list
+        columns to read, all if not given
+
+    Returns
+    -------
+    table: pyarrow.Table
+
+    """
+    dataset = open_dataset(path)
+    condition = ds.field('source').isin(list(sources)) if sources else None
+
+    return dataset.to_table(columns=columns, filter=condition)
+
+
+def load_frame(path='./abs/parquet', sources=None, columns=None):
+    """
+    load the dataset into a pandas dataframe, one row per publication
+
+    Parameters
+    ----------
+    path: str
+        root directory of the dataset
+
+    sources: list
+        names of the sources to read, all if not given
+
+    columns: list
+        columns to read, all if not given
+
+    Returns
+    -------
+    dataframe: pandas.DataFrame
+
+    """
+    return read_table(path, sources, columns).to_pandas()
+
+
+def to_csv(path='./abs/parquet', save_to='./SLR.csv', sources=None) -> None:
+    """
+    write the dataset into a csv file batch by batch, keywords are joined
+    with semicolons
+
+    Parameters
+    ----------
+    path: str
+        root directory of the dataset
+
+    save_to: str
+        csv file
+
+    sources: list
+        names of the sources to write, all if not given
+
+    Returns
+    -------
+
+    """
+    dataset = open_dataset(path)
+    condition = ds.field('source').isin(list(sources)) if sources else None
+    writer = None
+
+    try:
+        for batch in dataset.to_batches(filter=condition):
+            kws = pa.array([None if kw is None else '; '.join(kw) for kw in batch.column('kws').to_pylist()],
+                           pa.string())
+            batch = batch.set_column(batch.schema.get_field_index('kws'), 'kws', kws)
+
+            if writer is None:
+                writer = pyarrow.csv.CSVWriter(save_to, batch.schema)
+
+            writer.write_batch(batch)
+
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def to_excel(path='./abs/parquet', save_to='./SLR.xlsx', sources=None, hyperlink=False) -> dict:
+    """
+    write the dataset into an excel workbook with a sheet per source, rows
+    are read batch by batch
+
+    Parameters
+    ----------
+    path: str
+        root directory of the dataset
+
+    save_to: str
+        excel file
+
+    sources: list
+        names of the sources to write, all if not given
+
+    hyperlink: bool
+        make link cells clickable
+
+    Returns
+    -------
+    number of rows written to each sheet: dict
+
+    """
+    from src.report import write_workbook
+
+    dataset = open_dataset(path)
+    sources = sources or sorted(set(dataset.to_table(columns=['source']).column('source').to_pylist()))
+
+    def rows(source):
+        for batch in dataset.to_batches(columns=list(FIELDS), filter=ds.field('source') == source):
+            for row in batch.to_pylist():
+                yield row.pop('key'), row
+
+    return write_workbook({source: (lambda source=source: rows(source)) for source in sources}, save_to, hyperlink)
@@ -0,0 +1,313 @@
+import re
+import zlib
+import unicodedata
+import numpy as np
+
+# sources whose details are cheapest to get come first, a paper found
+# in several sources is read from the first of them
+DEFAULT_PREFERENCE = ('IEEE', 'ACM', 'SCIDIR')
+
+DOI_PATTERN = re.compile(r'10\.\d{4,9}/[^\s?#"]+')
+
+# largest prime below 2 ** 32, hashes are permuted modulo it
+PRIME = (1 << 32) - 5
+
+
+def normalize_title(title) -> str:
+    """
+    lower case title without accents, punctuation and extra spaces
+
+    Parameters
+    ----------
+    title: str
+
+    Returns
+    -------
+    normalized title: str
+
+    """
+    if not isinstance(title, str):
+        return ''
+
+    text = unicodedata.normalize('NFKD', title)
+    text = ''.join(c for c in text if not unicodedata.combining(c)).lower()
+
+    return ' '.join(re.sub(r'[^a-z0-9]+', ' ', text).split())
+
+
+def extract_doi(record: dict):
+    """
+    DOI of a publication, from the record or from its link
+
+    Parameters
+    ----------
+    record: dict
+        record of the publication
+
+    Returns
+    -------
+    lower case DOI or None: str
+
+    """
+    for field in ('doi', 'link'):
+        found = DOI_PATTERN.search(str(record.get(field) or ''))
+
+        if found is not None:
+            return found.group(0).rstrip('/.').lower()
+
+    return None
+
+
+def shingles(text: str, k=4) -> set:
+    if len(text) <= k:
+        return {text} if text else set()
+
+    return {text[i:(i + k)] for i in range(len(text) - k + 1)}
+
+
+def jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+class UnionFind:
+    """
+    disjoint sets of item ids, used to group matching publications
+
+    Methods
+    -------
+    find:
+        root of the set of an item
+
+    union:
+        merge the sets of two items
+    """
+
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, item):
+        self.parent.setdefault(item, item)
+        root = item
+
+        while self.parent[root] != root:
+            root = self.parent[root]
+
+        # point the path straight to the root for the next lookups
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+
+        return root
+
+    def union(self, a, b) -> None:
+        root_a, root_b = self.find(a), self.find(b)
+
+        if root_a != root_b:
+            self.parent[root_b] = root_a
+
+
+class MinHashLSH:
+    """
+    Parameters
+    ----------
+    num_perm: int
+        number of hash functions in a signature
+
+    bands: int
+        number of bands the signature is split into, items sharing a band
+        are candidate pairs. more bands find less similar pairs
+
+    seed: int
+        seed of the hash functions
+
+    Attributes
+    ----------
+    buckets: dict
+        ids of the items keyed by band number and band of the signature
+
+    Methods
+    -------
+    signature:
+        minhash signature of a set of shingles
+
+    insert:
+        add an item to the index
+
+    candidate_pairs:
+        pairs of items sharing at least one band
+    """
+
+    def __init__(self, num_perm=64, bands=16, seed=7):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+
+        generator = np.random.RandomState(seed)
+        self.rows = num_perm // bands
+        self.bands = bands
+        self.a = generator.randint(1, PRIME, size=num_perm).astype(np.uint64)
+        self.b = generator.randint(0, PRIME, size=num_perm).astype(np.uint64)
+        self.buckets = {}
+
+    def signature(self, items: set) -> np.ndarray:
+        hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in items), dtype=np.uint64, count=len(items))
+
+        return ((np.outer(hashes, self.a) + self.b) % PRIME).min(axis=0)
+
+    def insert(self, item, items: set) -> None:
+        signature = self.signature(items)
+
+        for band in range(self.bands):
+            key = (band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            self.buckets.setdefault(key, []).append(item)
+
+    def candidate_pairs(self) -> set:
+        pairs = set()
+
+        for items in self.buckets.values():
+            for i in range(1, len(items)):
+                for other in items[:i]:
+                    pairs.add((other, items[i]))
+
+        return pairs
+
+
+def find_clusters(links: dict, threshold=0.8, num_perm=64, bands=16) -> UnionFind:
+    """
+    group search results of every source which are the same publication,
+    by equal DOI or by titles with a shingle jaccard similarity above the
+    threshold. similar titles are not merged when both groups have DOIs
+    and none of them is shared, or when both groups hold a result of the
+    same source, since a source lists a publication once
+
+    Parameters
+    ----------
+    links: dict
+        link object of each source, keyed by source name
+
+    threshold: float
+        smallest title similarity counted as the same publication
+
+    num_perm: int
+        number of hash functions in a minhash signature
+
+    bands: int
+        number of lsh bands
+
+    Returns
+    -------
+    groups of (source, key) ids: UnionFind
+
+    """
+    groups = UnionFind()
+    index = MinHashLSH(num_perm, bands)
+    by_doi = {}
+    titles = {}
+    # DOIs and sources of every group, keyed by its root
+    dois = {}
+    sources = {}
+
+    def merge(a, b):
+        root_a, root_b = groups.find(a), groups.find(b)
+
+        if root_a != root_b:
+            groups.union(root_a, root_b)
+            dois[root_a] |= dois.pop(root_b)
+            sources[root_a] |= sources.pop(root_b)
+
+    for source, records in links.items():
+        for key, record in records.items():
+            item = (source, key)
+            groups.find(item)
+
+            doi = extract_doi(record)
+            dois[item] = {doi} if doi is not None else set()
+            sources[item] = {source}
+
+            if doi is not None:
+                if doi in by_doi:
+                    merge(by_doi[doi], item)
+
+                else:
+                    by_doi[doi] = item
+
+            title = shingles(normalize_title(record.get('title')))
+
+            if title:
+                titles[item] = title
+                index.insert(item, title)
+
+    # only pairs sharing a band are compared, the most similar merged first
+    similar = []
+
+    for a, b in index.candidate_pairs():
+        similarity = jaccard(titles[a], titles[b])
+
+        if similarity >= threshold:
+            similar.append((-similarity, str(a), str(b), a, b))
+
+    for *_, a, b in sorted(similar):
+        root_a, root_b = groups.find(a), groups.find(b)
+
+        if root_a == root_b or sources[root_a] & sources[root_b]:
+            continue
+
+        if dois[root_a] and dois[root_b] and not dois[root_a] & dois[root_b]:
+            continue
+
+        merge(a, b)
+
+    return groups
+
+
+def deduplicate(links: dict, prefer=DEFAULT_PREFERENCE, threshold=0.8, num_perm=64, bands=16):
+    """
+    keep a single search result of every publication, taken from the most
+    preferred source. kept records get the id of their cluster and the ids
+    of the results they stand for
+
+    Parameters
+    ----------
+    links: dict
+        link object of each source, keyed by source name
+
+    prefer: list
+        source names, most preferred first
+
+    threshold: float
+        smallest title similarity counted as the same publication
+
+    num_perm: int
+        number of hash functions in a minhash signature
+
+    bands: int
+        number of lsh bands
+
+    Returns
+    -------
+    unique link object of each source and members of the clusters with
+    more than one result: tuple
+
+    """
+    groups = find_clusters(links, threshold, num_perm, bands)
+    rank = {source: i for i, source in enumerate(prefer)}
+    members = {}
+
+    for source, records in links.items():
+        for key in records:
+            members.setdefault(groups.find((source, key)), []).append((source, key))
+
+    unique = {source: {} for source in links}
+    clusters = {}
+
+    for items in members.values():
+        items.sort(key=lambda item: (rank.get(item[0], len(rank)), str(item[1])))
+        source, key = items[0]
+        cluster = f"{source}:{key}"
+
+        unique[source][key] = dict(links[source][key],
+                                   cluster=cluster,
+                                   duplicates=[f"{s}:{k}" for s, k in items[1:]])
+
+        if len(items) > 1:
+            clusters[cluster] = [f"{s}:{k}" for s, k in items]
+
+    return unique, clusters
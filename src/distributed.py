@@ -0,0 +1,549 @@
+import os
+import json
+import time
+import socket
+import sqlite3
+import argparse
+import threading
+import traceback
+import multiprocessing
+
+from contextlib import contextmanager
+from src.journal import atomic_write_json
+from src.parallel import SOURCES, fetch_chunk, split_records
+from src.orchestrator import run_each, search_source, worker_options_for
+from src.utils import read_json
+
+
+class LeaseQueue:
+    """
+    Parameters
+    ----------
+    path: str
+        sqlite database file, every worker must reach it, on the same
+        machine or a shared disk with working file locks
+
+    lease_seconds: float
+        seconds a worker holds a task before it can be given to another
+        one, workers renew their lease while they work
+
+    max_attempts: int
+        leases of a task before it is given up
+
+    Methods
+    -------
+    add_job:
+        split a link file into tasks
+
+    lease:
+        take a pending task or one whose lease expired
+
+    renew:
+        extend the lease of a task
+
+    complete:
+        store the results of a task
+
+    fail:
+        hand a task back, or give it up after max_attempts
+
+    progress:
+        number of tasks in each state
+
+    results:
+        merged results of the finished tasks of a job
+
+    Notes
+    -----
+    a task is pending, leased, done or failed. a leased task whose lease
+    expired is leased again, so the work of a worker that died is picked
+    up by the others. results of a worker that lost its lease are refused
+    """
+
+    def __init__(self, path='./temp/queue.sqlite', lease_seconds=300.0, max_attempts=3):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.lock = threading.Lock()
+
+        # transactions are opened by hand, BEGIN IMMEDIATE keeps two workers from taking one task
+        self.connection = sqlite3.connect(path, timeout=60, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+
+        with self.transaction() as connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS jobs ("
+                               "job TEXT PRIMARY KEY, source TEXT, link_file TEXT, save_to TEXT, "
+                               "options TEXT, created REAL)")
+            connection.execute("CREATE TABLE IF NOT EXISTS tasks ("
+                               "id INTEGER PRIMARY KEY, job TEXT, records TEXT, state TEXT, owner TEXT, "
+                               "expires REAL, attempts INTEGER, result TEXT, error TEXT)")
+            connection.execute("CREATE INDEX IF NOT EXISTS tasks_state ON tasks (state, expires)")
+
+    @contextmanager
+    def transaction(self):
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+
+            try:
+                yield self.connection
+
+            except BaseException:
+                self.connection.execute("ROLLBACK")
+                raise
+
+            self.connection.execute("COMMIT")
+
+    def add_job(self, job: str, source: str, link_file: str, save_to: str,
+                options: dict = None, chunk_size=20, keep=False) -> int:
+        """
+        split a link file into tasks of chunk_size publications
+
+        Parameters
+        ----------
+        job: str
+            name of the job
+
+        source: str
+            name of the source, one of parallel.SOURCES
+
+        link_file: str
+            json file created by the search scrapper
+
+        save_to: str
+            json file the coordinator writes the results into
+
+        options: dict
+            arguments for the paper scrapper, as for parallel workers
+
+        chunk_size: int
+            publications in a task
+
+        keep: bool
+            keep the tasks of a job already in the queue, finished ones
+            are not read again. publications of the link file in none of
+            the tasks get new ones
+
+        Returns
+        -------
+        number of unfinished tasks of the job: int
+
+        """
+        if source not in SOURCES:
+            raise KeyError(f"unknown source {source}")
+
+        with self.transaction() as connection:
+            exists = connection.execute("SELECT 1 FROM jobs WHERE job = ?", (job,)).fetchone()
+
+            records = read_json(link_file)
+
+            if keep and exists:
+                # a search of a resumed run may find publications the queued tasks do not hold
+                for (queued,) in connection.execute("SELECT records FROM tasks WHERE job = ?", (job,)).fetchall():
+                    for key in json.loads(queued):
+                        records.pop(key, None)
+
+            else:
+                connection.execute("DELETE FROM tasks WHERE job = ?", (job,))
+                connection.execute("INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?)",
+                                   (job, source, link_file, save_to, json.dumps(options or {}), time.time()))
+
+            connection.executemany("INSERT INTO tasks (job, records, state, attempts) VALUES (?, ?, 'pending', 0)",
+                                   [(job, json.dumps(chunk)) for chunk in split_records(records, chunk_size)])
+
+            # failed tasks of a kept job get another round
+            connection.execute("UPDATE tasks SET state = 'pending', attempts = 0 WHERE job = ? AND state = 'failed'",
+                               (job,))
+
+            return connection.execute("SELECT COUNT(*) FROM tasks WHERE job = ? AND state != 'done'",
+                                      (job,)).fetchone()[0]
+
+    def lease(self, owner: str):
+        """
+        take a pending task or one whose lease expired
+
+        Parameters
+        ----------
+        owner: str
+            name of the worker
+
+        Returns
+        -------
+        task with id, job, source, records, options and attempts: dict or
+        None when nothing can be leased
+
+        """
+        now = time.time()
+
+        with self.transaction() as connection:
+            self.give_up_expired(connection, now)
+
+            row = connection.execute("SELECT t.id, t.job, j.source, t.records, j.options, t.attempts "
+                                     "FROM tasks t JOIN jobs j ON t.job = j.job "
+                                     "WHERE t.state = 'pending' OR (t.state = 'leased' AND t.expires < ?) "
+                                     "ORDER BY t.state = 'leased', t.id LIMIT 1", (now,)).fetchone()
+
+            if row is None:
+                return None
+
+            connection.execute("UPDATE tasks SET state = 'leased', owner = ?, expires = ?, attempts = attempts + 1 "
+                               "WHERE id = ?", (owner, now + self.lease_seconds, row[0]))
+
+        return {"id": row[0],
+                "job": row[1],
+                "source": row[2],
+                "records": json.loads(row[3]),
+                "options": json.loads(row[4]),
+                "attempts": row[5] + 1}
+
+    def give_up_expired(self, connection, now: float) -> None:
+        # a task which wore out its leases without a result is given up
+        connection.execute("UPDATE tasks SET state = 'failed', owner = NULL, error = 'lease expired' "
+                           "WHERE state = 'leased' AND expires < ? AND attempts >= ?",
+                           (now, self.max_attempts))
+
+    def holding(self, connection, task_id: int, owner: str, sql: str, *args) -> bool:
+        cursor = connection.execute(f"{sql} WHERE id = ? AND owner = ? AND state = 'leased'", (*args, task_id, owner))
+
+        return cursor.rowcount == 1
+
+    def renew(self, task_id: int, owner: str) -> bool:
+        """
+        extend the lease of a task
+
+        Returns
+        -------
+        weather the owner still holds the lease: bool
+
+        """
+        with self.transaction() as connection:
+            return self.holding(connection, task_id, owner, "UPDATE tasks SET expires = ?",
+                                time.time() + self.lease_seconds)
+
+    def complete(self, task_id: int, owner: str, results: dict) -> bool:
+        """
+        store the results of a task
+
+        Parameters
+        ----------
+        task_id: int
+
+        owner: str
+            name of the worker
+
+        results: dict
+            updated records of the task
+
+        Returns
+        -------
+        false if the lease was lost and the results are refused: bool
+
+        """
+        with self.transaction() as connection:
+            return self.holding(connection, task_id, owner,
+                                "UPDATE tasks SET state = 'done', expires = NULL, result = ?, error = NULL",
+                                json.dumps(results))
+
+    def fail(self, task_id: int, owner: str, error: str) -> bool:
+        """
+        hand a task back to the queue, it is given up once it used
+        max_attempts leases
+
+        Returns
+        -------
+        false if the lease was already lost: bool
+
+        """
+        with self.transaction() as connection:
+            return self.holding(connection, task_id, owner,
+                                "UPDATE tasks SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                                "owner = NULL, expires = NULL, error = ?",
+                                self.max_attempts, error)
+
+    def progress(self, job: str = None) -> dict:
+        """
+        number of tasks in each state
+
+        Parameters
+        ----------
+        job: str
+            only tasks of this job
+
+        Returns
+        -------
+        counts keyed by state: dict
+
+        """
+        with self.lock:
+            rows = self.connection.execute("SELECT state, COUNT(*) FROM tasks WHERE ? IS NULL OR job = ? "
+                                           "GROUP BY state", (job, job)).fetchall()
+
+        return dict(rows)
+
+    def drained(self, job: str = None) -> bool:
+        with self.transaction() as connection:
+            self.give_up_expired(connection, time.time())
+
+        progress = self.progress(job)
+
+        return not progress.get('pending', 0) and not progress.get('leased', 0)
+
+    def results(self, job: str) -> dict:
+        """
+        merged results of the finished tasks of a job
+
+        Returns
+        -------
+        updated records: dict
+
+        """
+        merged = {}
+
+        with self.lock:
+            for (result,) in self.connection.execute("SELECT result FROM tasks WHERE job = ? AND state = 'done'",
+                                                     (job,)):
+                merged.update(json.loads(result))
+
+        return merged
+
+    def errors(self, job: str) -> list:
+        with self.lock:
+            return [error for (error,) in self.connection.execute("SELECT error FROM tasks "
+                                                                  "WHERE job = ? AND state = 'failed'", (job,))]
+
+    def close(self) -> None:
+        with self.lock:
+            self.connection.close()
+
+
+class Heartbeat(threading.Thread):
+    """
+    renew the lease of a task while a worker is on it
+
+    Parameters
+    ----------
+    queue: LeaseQueue
+
+    task_id: int
+
+    owner: str
+        name of the worker
+
+    Attributes
+    ----------
+    lost: bool
+        the lease could not be renewed, another worker may have the task
+    """
+
+    def __init__(self, queue, task_id, owner):
+        super().__init__(name=f'lease-{task_id}', daemon=True)
+        self.queue = queue
+        self.task_id = task_id
+        self.owner = owner
+        self.lost = False
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.queue.lease_seconds / 3):
+            if not self.queue.renew(self.task_id, self.owner):
+                self.lost = True
+                return
+
+    def stop(self) -> None:
+        self.stopped.set()
+        self.join()
+
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def work(path='./temp/queue.sqlite',
+         owner: str = None,
+         lease_seconds=300.0,
+         max_attempts=3,
+         until_done=True,
+         poll=5.0,
+         fetch=fetch_chunk) -> int:
+    """
+    lease tasks and read details of their publications until the queue
+    is drained, or forever if until_done is false
+
+    Parameters
+    ----------
+    path: str
+        sqlite database file of the queue
+
+    owner: str
+        name of the worker, host name and process id if not given
+
+    lease_seconds: float
+        seconds a lease lasts without renewal
+
+    max_attempts: int
+        leases of a task before it is given up
+
+    until_done: bool
+        stop once no task is pending or leased
+
+    poll: float
+        seconds between two looks at an empty queue
+
+    fetch: callable
+        reads the details of a task, takes source, records and options
+
+    Returns
+    -------
+    number of tasks completed: int
+
+    """
+    queue = LeaseQueue(path, lease_seconds, max_attempts)
+    owner = owner or worker_name()
+    completed = 0
+
+    try:
+        while True:
+            task = queue.lease(owner)
+
+            if task is None:
+                # leases of other workers may still expire and come back
+                if until_done and queue.drained():
+                    return completed
+
+                time.sleep(poll)
+                continue
+
+            heartbeat = Heartbeat(queue, task["id"], owner)
+            heartbeat.start()
+
+            try:
+                results = fetch(task["source"], task["records"], task["options"])
+
+            except Exception:
+                heartbeat.stop()
+                queue.fail(task["id"], owner, traceback.format_exc())
+                continue
+
+            heartbeat.stop()
+
+            if queue.complete(task["id"], owner, results):
+                completed += 1
+
+            else:
+                print(f"{owner}: lease of task {task['id']} was lost, results dropped")
+
+    finally:
+        queue.close()
+
+
+def save_results(queue: LeaseQueue, job: str, link_file: str, save_to: str) -> int:
+    """
+    write the records of a job with the details read by the workers, records
+    of failed tasks, or of no task at all, are saved without details
+
+    Returns
+    -------
+    number of records saved without details: int
+
+    """
+    records = read_json(link_file)
+    results = {key: value for key, value in queue.results(job).items() if key in records}
+    records.update(results)
+    atomic_write_json(save_to, records)
+
+    return len(records) - len(results)
+
+
+def run_distributed(config: dict, sources: list, concurrent: bool, cache=None, errors: dict = None) -> dict:
+    """
+    search every source here, then hand the links out as leased tasks to
+    workers on this and other machines and collect their results
+
+    Parameters
+    ----------
+    config: dict
+        full configuration, with DISTRIBUTED options
+
+    sources: list
+        names of the sources to run
+
+    concurrent: bool
+        run searches at the same time
+
+    cache: ResponseCache
+        cache for search result pages
+
+    errors: dict
+        traceback of the failed sources, keyed by source name
+
+    Returns
+    -------
+    errors: dict
+
+    """
+    options = config['DISTRIBUTED'] if isinstance(config['DISTRIBUTED'], dict) else {}
+    errors = {} if errors is None else errors
+    path = options.get('queue', './temp/queue.sqlite')
+    lease_seconds = options.get('lease_seconds', 300.0)
+    max_attempts = options.get('max_attempts', 3)
+
+    run_each(lambda name: search_source(name, config, cache), sources, concurrent, errors)
+
+    searched = [name for name in sources if name not in errors]
+    queue = LeaseQueue(path, lease_seconds, max_attempts)
+
+    for name in searched:
+        paper_options = worker_options_for(name, config)
+        keep = paper_options.pop('resume')
+        pending = queue.add_job(name, name, config[name]['link_file_save_to'], config[name]['abs_file_save_to'],
+                                paper_options, options.get('chunk_size', 20), keep)
+
+        print(f"{name}: {pending} tasks in {path}")
+
+    # workers of this machine, others join with python -m src.distributed
+    workers = [multiprocessing.Process(target=work,
+                                       args=(path, f"{worker_name()}-{i}", lease_seconds, max_attempts))
+               for i in range(options.get('local_workers', 2))]
+
+    for worker in workers:
+        worker.start()
+
+    try:
+        while not queue.drained():
+            print(f"tasks: {queue.progress()}", end='\r')
+            time.sleep(options.get('poll', 5.0))
+
+    finally:
+        for worker in workers:
+            worker.join()
+
+    for name in searched:
+        missing = save_results(queue, name, config[name]['link_file_save_to'], config[name]['abs_file_save_to'])
+
+        if missing:
+            print(f"{name}: {missing} records saved without details, "
+                  f"{len(queue.errors(name))} tasks failed")
+
+        if not config[name]['keep_link_file']:
+            os.remove(config[name]['link_file_save_to'])
+
+    queue.close()
+
+    return errors
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='read publication details from a shared lease queue')
+    parser.add_argument('--queue', default='./temp/queue.sqlite', help='sqlite file of the queue')
+    parser.add_argument('--owner', default=None, help='name of the worker, host:pid if not given')
+    parser.add_argument('--lease-seconds', type=float, default=300.0)
+    parser.add_argument('--max-attempts', type=int, default=3)
+    parser.add_argument('--poll', type=float, default=5.0, help='seconds between looks at an empty queue')
+    parser.add_argument('--until-done', action='store_true',
+                        help='stop once the queue is drained instead of waiting for new jobs')
+    args = parser.parse_args()
+
+    # workers keep their page and request metrics in ./temp as the main run does
+    if not os.path.isdir('temp'):
+        os.mkdir('temp')
+
+    print(f"completed {work(args.queue, args.owner, args.lease_seconds, args.max_attempts, args.until_done, args.poll)} tasks")
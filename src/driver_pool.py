@@ -0,0 +1,420 @@
+import queue
+import threading
+
+from src.utils import clean_cookies_and_caches
+
+try:
+    import psutil
+
+except ImportError:
+    psutil = None
+
+PROFILES = ('default', 'lean')
+
+# content the lean profile does not download, only a few text nodes are read
+LEAN_CONTENT_SETTINGS = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.managed_default_content_settings.media_stream": 2,
+    "profile.managed_default_content_settings.plugins": 2,
+    "profile.managed_default_content_settings.popups": 2,
+    "profile.managed_default_content_settings.notifications": 2,
+}
+
+# request patterns blocked by the lean profile, static media, fonts,
+# stylesheets and third party ads, analytics and widgets
+LEAN_BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.mp4", "*.webm", "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot", "*.css",
+    "*googletagmanager.com*", "*google-analytics.com*", "*doubleclick.net*",
+    "*googlesyndication.com*", "*adservice.google.com*", "*facebook.net*",
+    "*hotjar.com*", "*newrelic.com*", "*nr-data.net*", "*crazyegg.com*",
+    "*addthis.com*", "*scorecardresearch.com*", "*qualtrics.com*",
+    "*cookielaw.org*", "*onetrust.com*", "*trendmd.com*", "*altmetric.com*",
+]
+
+
+def chrome_options(binary_location: str, profile='default') -> 'webdriver.ChromeOptions':
+    """
+    create headless chrome options used by all the scrappers, every
+    browser needs its own options object
+
+    Parameters
+    ----------
+    binary_location: str
+        path to the chrome executable
+
+    profile: str
+        default or lean, lean skips images and media and returns from a
+        page load once the document is parsed
+
+    Returns
+    -------
+    options: webdriver.ChromeOptions
+
+    """
+    # selenium is only loaded once a browser is needed
+    from selenium import webdriver
+
+    if profile not in PROFILES:
+        raise ValueError(f"unknown browser profile {profile}, use one of {PROFILES}")
+
+    options = webdriver.ChromeOptions()
+
+    options.add_argument("--headless")
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option('useAutomationExtension', False)
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.binary_location = binary_location
+
+    if profile == 'lean':
+        options.add_experimental_option("prefs", LEAN_CONTENT_SETTINGS)
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.page_load_strategy = 'eager'
+
+    return options
+
+
+def block_resources(driver, patterns=None) -> None:
+    """
+    block requests matching the patterns through the devtools protocol
+
+    Parameters
+    ----------
+    driver: undetected_chromedriver.Chrome
+
+    patterns: list
+        url patterns with * wildcards, LEAN_BLOCKED_URLS by default
+
+    Returns
+    -------
+
+    """
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns or LEAN_BLOCKED_URLS})
+
+
+def hide_automation(driver) -> None:
+    """
+    make the browser look like a regular chrome on windows, called before
+    every page request
+
+    Parameters
+    ----------
+    driver: undetected_chromedriver.Chrome
+
+    Returns
+    -------
+
+    """
+    from selenium_stealth import stealth
+
+    stealth(driver,
+            languages=["en-US", "en"],
+            vendor="Google Inc.",
+            platform="Win32",
+            webgl_vendor="Intel Inc.",
+            renderer="Intel Iris OpenGL Engine",
+            fix_hairline=True,
+            )
+
+
+def new_driver(binary_location: str, executable_path: str, profile='default') -> 'undetected_chromedriver.Chrome':
+    """
+    start a new browser with a clean session
+
+    Parameters
+    ----------
+    binary_location: str
+        path to the chrome executable
+
+    executable_path: str
+        path to the chrome web driver
+
+    profile: str
+        default or lean
+
+    Returns
+    -------
+    driver: undetected_chromedriver.Chrome
+
+    """
+    import undetected_chromedriver
+
+    driver = undetected_chromedriver.Chrome(chrome_options=chrome_options(binary_location, profile),
+                                            executable_path=executable_path)
+    clean_cookies_and_caches(driver)
+
+    if profile == 'lean':
+        block_resources(driver)
+
+    return driver
+
+
+class DriverPool:
+    """
+    Parameters
+    ----------
+    binary_location: str
+        path to the chrome executable
+
+    executable_path: str
+        path to the chrome web driver
+
+    size: int
+        number of warm browsers kept in the pool
+
+    max_pages: int
+        number of pages a browser can load before it get replaced
+
+    max_memory_mb: int
+        memory limit of a browser (with its child processes), browser get
+        replaced when it goes above. needs psutil
+
+    profile: str
+        browser profile, default or lean
+
+    Attributes
+    ----------
+    idle: queue.Queue
+        browsers ready to use
+
+    pages: dict
+        number of pages loaded by each browser
+
+    started: int
+        number of live browsers owned by the pool
+
+    Methods
+    -------
+    warm:
+        start browsers until the pool is full
+
+    acquire:
+        take a browser from the pool
+
+    release:
+        give a browser back to the pool
+
+    record_page:
+        count a page load against a browser
+
+    discard:
+        close a broken browser and forget it
+
+    close:
+        close every idle browser
+
+    """
+
+    def __init__(self,
+                 binary_location,
+                 executable_path,
+                 size=2,
+                 max_pages=200,
+                 max_memory_mb=None,
+                 profile='default'):
+        if max_memory_mb is not None and psutil is None:
+            raise ImportError("max_memory_mb needs psutil, install it with `pip install psutil`")
+
+        self.binary_location = binary_location
+        self.executable_path = executable_path
+        self.profile = profile
+        self.size = max(1, size)
+        self.max_pages = max_pages
+        self.max_memory_mb = max_memory_mb
+        self.idle = queue.Queue()
+        self.pages = {}
+        self.started = 0
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def start_driver(self) -> 'undetected_chromedriver.Chrome':
+        """
+        start a browser owned by the pool
+
+        Returns
+        -------
+        driver: undetected_chromedriver.Chrome
+
+        """
+        driver = new_driver(self.binary_location, self.executable_path, self.profile)
+
+        with self.lock:
+            self.pages[id(driver)] = 0
+
+        return driver
+
+    def warm(self) -> None:
+        """
+        start browsers until the pool is full
+
+        Returns
+        -------
+
+        """
+        while self.reserve():
+            self.idle.put(self.start_driver())
+
+    def reserve(self) -> bool:
+        """
+        book a slot for a new browser if the pool is not full
+
+        Returns
+        -------
+
+        """
+        with self.lock:
+            if self.started < self.size:
+                self.started += 1
+                return True
+
+        return False
+
+    def acquire(self) -> 'undetected_chromedriver.Chrome':
+        """
+        take a browser from the pool, wait until one get free if all
+        browsers are busy
+
+        Returns
+        -------
+        driver: undetected_chromedriver.Chrome
+
+        """
+        try:
+            return self.idle.get_nowait()
+
+        except queue.Empty:
+            pass
+
+        if self.reserve():
+            try:
+                return self.start_driver()
+
+            except Exception:
+                with self.lock:
+                    self.started -= 1
+                raise
+
+        return self.idle.get()
+
+    def release(self, driver) -> None:
+        """
+        give a browser back to the pool, browser is replaced if it
+        used up its page or memory allowance
+
+        Parameters
+        ----------
+        driver: undetected_chromedriver.Chrome
+            browser taken with acquire
+
+        Returns
+        -------
+
+        """
+        if self.is_worn_out(driver):
+            self.discard(driver)
+            return
+
+        self.idle.put(driver)
+
+    def record_page(self, driver) -> None:
+        """
+        count a page load against a browser
+
+        Parameters
+        ----------
+        driver: undetected_chromedriver.Chrome
+
+        Returns
+        -------
+
+        """
+        with self.lock:
+            self.pages[id(driver)] = self.pages.get(id(driver), 0) + 1
+
+    def memory_mb(self, driver) -> float:
+        """
+        resident memory of the browser and its child processes
+
+        Parameters
+        ----------
+        driver: undetected_chromedriver.Chrome
+
+        Returns
+        -------
+        memory in MB: float
+
+        """
+        if psutil is None or getattr(driver, 'browser_pid', None) is None:
+            return 0.0
+
+        try:
+            browser = psutil.Process(driver.browser_pid)
+            processes = [browser] + browser.children(recursive=True)
+
+            return sum(p.memory_info().rss for p in processes) / 2 ** 20
+
+        except psutil.Error:
+            return 0.0
+
+    def is_worn_out(self, driver) -> bool:
+        """
+        check weather browser reached the page or memory limit
+
+        Parameters
+        ----------
+        driver: undetected_chromedriver.Chrome
+
+        Returns
+        -------
+
+        """
+        if self.max_pages is not None and self.pages.get(id(driver), 0) >= self.max_pages:
+            return True
+
+        if self.max_memory_mb is not None and self.memory_mb(driver) >= self.max_memory_mb:
+            return True
+
+        return False
+
+    def discard(self, driver) -> None:
+        """
+        close a browser and free its slot in the pool
+
+        Parameters
+        ----------
+        driver: undetected_chromedriver.Chrome
+
+        Returns
+        -------
+
+        """
+        with self.lock:
+            self.pages.pop(id(driver), None)
+            self.started -= 1
+
+        try:
+            driver.quit()
+
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        """
+        close every idle browser
+
+        Returns
+        -------
+
+        """
+        while True:
+            try:
+                self.discard(self.idle.get_nowait())
+
+            except queue.Empty:
+                break
@@ -0,0 +1,225 @@
+import json
+import requests
+
+from lxml import html
+from requests.adapters import HTTPAdapter
+from src import metrics
+from src.rate_limit import limiter_for
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/114.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+
+def text_by_class(document: str, class_name: str):
+    """
+    get text of the first element with the given class, same element
+    selenium find_element(By.CLASS_NAME, ...) returns
+
+    Parameters
+    ----------
+    document: str
+        html of the page
+
+    class_name: str
+        class of the element
+
+    Returns
+    -------
+    text of the element or None if there is no such element or it is empty
+
+    """
+    try:
+        tree = html.fromstring(document)
+
+    except (ValueError, html.etree.ParserError):
+        return None
+
+    nodes = tree.xpath(f'//*[contains(concat(" ", normalize-space(@class), " "), " {class_name} ")]')
+
+    if not nodes:
+        return None
+
+    text = ' '.join(' '.join(nodes[0].itertext()).split())
+
+    return text or None
+
+
+class HttpFetcher:
+    """
+    Parameters
+    ----------
+    pool_size: int
+        number of keep-alive connections kept for each host
+
+    timeout: float
+        seconds to wait for a server response
+
+    cache: ResponseCache
+        cache for the responses, pages are requested again when not given
+
+    source: str
+        name of the source, used for cache time to live
+
+    Attributes
+    ----------
+    session: requests.Session
+        pooled http client
+
+    hits: int
+        number of pages the fast path found the content in
+
+    misses: int
+        number of pages had to be left to the browser
+
+    Methods
+    -------
+    fetch:
+        get html of a page
+
+    fetch_json:
+        get json response of an api endpoint
+
+    get_text:
+        get text of an element from a page
+
+    """
+
+    def __init__(self, pool_size=4, timeout=20, cache=None, source=None):
+        self.timeout = timeout
+        self.cache = cache
+        self.source = source
+        self.hits = 0
+        self.misses = 0
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        self.session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=pool_size))
+
+    def fetch(self, link: str):
+        """
+        get html of a page
+
+        Parameters
+        ----------
+        link: str
+            URL to make request on
+
+        Returns
+        -------
+        html of the page or None if the request failed
+
+        """
+        if self.cache is not None:
+            cached = self.cache.get(self.source, link)
+
+            if cached is not None:
+                metrics.count(self.source or metrics.source_of(link), 'paper_page', 'cached')
+                return cached
+
+        limiter = limiter_for(link)
+        limiter.wait()
+
+        with metrics.timed(self.source or metrics.source_of(link), 'paper_page') as event:
+            try:
+                response = self.session.get(link, timeout=self.timeout)
+
+            except requests.RequestException:
+                event["outcome"] = 'error'
+                limiter.throttled()
+                return None
+
+            event["outcome"] = 'ok' if response.status_code == 200 else f"http_{response.status_code}"
+
+        limiter.feedback(response.status_code)
+
+        if response.status_code != 200:
+            return None
+
+        if self.cache is not None:
+            self.cache.put(self.source, link, None, response.text)
+
+        return response.text
+
+    def fetch_json(self, link: str, headers: dict = None):
+        """
+        get json response of an api endpoint
+
+        Parameters
+        ----------
+        link: str
+            URL to make request on
+
+        headers: dict
+            extra headers for the request
+
+        Returns
+        -------
+        decoded json or None if the request failed
+
+        """
+        cached = self.cache.get(self.source, link) if self.cache is not None else None
+
+        if cached is not None:
+            try:
+                result = json.loads(cached)
+
+            except ValueError:
+                pass
+
+            else:
+                metrics.count(self.source or metrics.source_of(link), 'paper_page', 'cached')
+                return result
+
+        limiter = limiter_for(link)
+        limiter.wait()
+
+        with metrics.timed(self.source or metrics.source_of(link), 'paper_page') as event:
+            try:
+                response = self.session.get(link, headers=headers, timeout=self.timeout)
+                limiter.feedback(response.status_code)
+                event["outcome"] = 'ok' if response.status_code == 200 else f"http_{response.status_code}"
+
+                if response.status_code != 200:
+                    return None
+
+                result = response.json()
+
+            except (requests.RequestException, ValueError):
+                event["outcome"] = 'error'
+                return None
+
+        if self.cache is not None:
+            self.cache.put(self.source, link, None, response.text)
+
+        return result
+
+    def get_text(self, link: str, class_name: str):
+        """
+        get text of an element from a page without a browser
+
+        Parameters
+        ----------
+        link: str
+            URL to make request on
+
+        class_name: str
+            class of the element
+
+        Returns
+        -------
+        text of the element or None when the browser should be used
+
+        """
+        document = self.fetch(link)
+        text = text_by_class(document, class_name) if document else None
+
+        if text is None:
+            self.misses += 1
+
+        else:
+            self.hits += 1
+
+        return text
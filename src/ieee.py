@@ -1,19 +1,44 @@
-import os
+import re
+import copy
+import math
 import time
 import requests
-import numpy as np
 import json
-import undetected_chromedriver
 
-from selenium import webdriver
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
 from selenium.common import exceptions
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.wait import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium_stealth import stealth
+from lxml import html
+from src.rate_limit import limiter_for, is_block_page
+from src.retry import default_policy
+from src.waits import waits_for
+from src.driver_pool import new_driver, hide_automation
+from src import metrics, page_stats
+from src.journal import Journal, atomic_write_json
+from src.fast_fetch import HttpFetcher, text_by_class
 from src.utils import *
 
 
+def strip_highlight(text):
+    """
+    remove search term highlight markers, [::term::], added by the search api
+
+    Parameters
+    ----------
+    text: str
+
+    Returns
+    -------
+    clean text: str
+
+    """
+    if not isinstance(text, str):
+        return text
+
+    return text.replace('[::', '').replace('::]', '')
+
+
 class IEEE:
     """
     Parameters
@@ -22,6 +47,13 @@ class IEEE:
         search term for either simple search or advanced search, if for advanced
         search need to add AND, OR, NOT in between search keywords.
 
+    workers: int
+        number of search result pages to fetch at the same time, 1 means
+        pages are read one after the other
+
+    cache: ResponseCache
+        cache for search result pages
+
     Attributes
     ----------
     headers: dict
@@ -36,11 +68,23 @@ class IEEE:
     links_to_paper: dict
         mined links and additional details for results
 
+    sink: RecordSink
+        results are written here one by one instead of links_to_paper
+
+    session: requests.Session
+        keep-alive connection pool shared by every page request
+
+    retry: RetryPolicy
+        backoff and retry budget of the page requests
+
     Methods
     -------
     post_request:
         send request to IEEE server
 
+    fetch_page:
+        get the json search results of a single page
+
     check_for_multiple_pages:
         check weather results has been divide to multiple
         web pages, if so update the page count.
@@ -48,6 +92,18 @@ class IEEE:
     mine_links:
         get links for each document from search results
 
+    add_records:
+        add records of a search results page to the link object
+
+    add_link:
+        keep a search result or send it to the sink
+
+    pages:
+        number of every search results page after the first
+
+    read_page:
+        get the records of a single search results page
+
     get_links_to_papers:
         add all links to single object
 
@@ -56,7 +112,11 @@ class IEEE:
 
     """
 
-    def __init__(self, query):
+    # largest page size accepted by the search API
+    rows_per_page = 100
+    search_url = "https://ieeexplore.ieee.org/rest/search"
+
+    def __init__(self, query, workers=1, cache=None, sink=None):
         self.headers = {
             "Accept": "application/json, text/plain, */*",
             "Origin": "https://ieeexplore.ieee.org",
@@ -68,13 +128,21 @@ class IEEE:
             "highlight": True,
             "returnFacets": ["ALL"],
             "returnType": "SEARCH",
+            "rowsPerPage": self.rows_per_page,
             "pageNumber": 1
         }
+        self.workers = max(1, workers)
+        self.cache = cache
+        self.retry = default_policy()
         self.page_count = None
         self.links_to_paper = {}
+        self.sink = sink
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=1,
+                                                   pool_maxsize=self.workers))
 
     @staticmethod
-    def post_request(header: dict, json: dict) -> requests.Response:
+    def post_request(header: dict, json: dict, session: requests.Session = None) -> requests.Response:
         """
         send request to IEEE server
 
@@ -86,16 +154,64 @@ class IEEE:
         json: dict
             additional details for filter results from request
 
+        session: requests.Session
+            connection pool to send the request through, if not given
+            a new connection is opened
+
         Returns
         -------
 
         """
-        result = requests.post("https://ieeexplore.ieee.org/rest/search",
-                               headers=header,
-                               json=json)
+        result = (session or requests).post(IEEE.search_url,
+                                            headers=header,
+                                            json=json)
 
         return result
 
+    def fetch_page(self, page_number: int) -> dict:
+        """
+        get the json search results of a single page
+
+        Parameters
+        ----------
+        page_number: int
+            page of the search results to request
+
+        Returns
+        -------
+        search results: dict
+
+        """
+        payload = dict(self.payload, pageNumber=page_number)
+        limiter = limiter_for(self.search_url)
+
+        if self.cache is not None:
+            cached = self.cache.get('IEEE', self.search_url, payload)
+
+            if cached is not None:
+                metrics.count('IEEE', 'search_page', 'cached')
+                return json.loads(cached)
+
+        def attempt():
+            limiter.wait()
+
+            with metrics.timed('IEEE', 'search_page') as event:
+                response = self.post_request(self.headers, payload, self.session)
+                event["outcome"] = 'ok' if response.status_code == 200 else f"http_{response.status_code}"
+
+            limiter.feedback(response.status_code)
+
+            return response
+
+        request = self.retry.run(attempt,
+                                 self.search_url,
+                                 failed=lambda response: response.status_code != 200)
+
+        if self.cache is not None:
+            self.cache.put('IEEE', self.search_url, payload, request.text)
+
+        return request.json()
+
     def check_for_multiple_pages(self) -> bool:
         """
         check weather results has been divide to multiple
@@ -105,8 +221,11 @@ class IEEE:
         -------
 
         """
-        results = self.post_request(self.headers, self.payload).json()
-        self.page_count = results['totalPages']
+        results = self.fetch_page(1)
+        self.page_count = results.get('totalPages', 1)
+
+        # first page is already here, keep its records instead of asking again
+        self.add_records(results)
 
         return True if self.page_count > 1 else False
 
@@ -118,19 +237,83 @@ class IEEE:
         -------
 
         """
-        request = self.post_request(self.headers, self.payload)
-        j = 1
+        self.add_records(self.fetch_page(self.payload["pageNumber"]))
+
+    def add_records(self, results: dict) -> None:
+        """
+        add records of a search results page to the link object
+
+        Parameters
+        ----------
+        results: dict
+            json search results of a single page
+
+        Returns
+        -------
+
+        """
+        for record in results.get('records', []):
+            self.add_link(record['articleNumber'], {"title": strip_highlight(record.get('articleTitle', None)),
+                                                    "link": record.get('documentLink', None),
+                                                    "date": record.get('publicationYear', None),
+                                                    "abstract": strip_highlight(record.get('abstract', None)),
+                                                    "doi": record.get('doi', None)})
+
+    def add_link(self, key: str, record: dict) -> None:
+        """
+        keep a search result, or send it straight to the sink when
+        results are streamed
+
+        Parameters
+        ----------
+        key: str
+            key of the publication
+
+        record: dict
+            listing details of the publication
+
+        Returns
+        -------
+
+        """
+        if self.sink is not None:
+            self.sink.write(key, record)
+
+        else:
+            self.links_to_paper[key] = record
+
+    def pages(self) -> range:
+        """
+        number of every search results page after the first one, which
+        check_for_multiple_pages already read
+
+        Returns
+        -------
+        page numbers: range
+
+        """
+        return range(2, (self.page_count + 1))
 
-        while request.status_code != 200:
-            time.sleep(abs(np.random.normal(0.1, 2)))
-            request = self.post_request(self.headers, self.payload)
+    def read_page(self, page_number: int) -> dict:
+        """
+        get the records of a single search results page without adding
+        them to the link object, pages can be read at the same time
+
+        Parameters
+        ----------
+        page_number: int
+            page of the search results to request
 
-        results = request.json()
+        Returns
+        -------
+        links and additional details of the results in the page: dict
+
+        """
+        page = copy.copy(self)
+        page.links_to_paper, page.sink = {}, None
+        page.add_records(self.fetch_page(page_number))
 
-        for record in results['records']:
-            self.links_to_paper[record['articleNumber']] = {"title": record.get('articleTitle', None),
-                                                            "link": record.get('documentLink', None),
-                                                            "date": record.get('publicationYear', None)}
+        return page.links_to_paper
 
     def get_links_to_papers(self) -> None:
         """
@@ -140,8 +323,13 @@ class IEEE:
         -------
 
         """
-        if self.check_for_multiple_pages():
-            for i in range(1, (self.page_count + 1)):
+        if not self.check_for_multiple_pages():
+            return
+
+        pages = self.pages()
+
+        if self.workers == 1:
+            for i in pages:
                 self.payload["pageNumber"] = i
 
                 self.mine_links()
@@ -149,7 +337,13 @@ class IEEE:
                 print(f'reading page: {i} from {self.page_count}', end='\r')
 
         else:
-            self.mine_links()
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                futures = [executor.submit(self.fetch_page, i) for i in pages]
+
+                for done, future in enumerate(as_completed(futures), start=2):
+                    self.add_records(future.result())
+
+                    print(f'reading page: {done} from {self.page_count}', end='\r')
 
     def to_json(self, path: str) -> None:
         """
@@ -169,22 +363,94 @@ class IEEE:
 
 
 class Paper:
-    options = webdriver.ChromeOptions()
-    config = read_json('./config.json')
+    # read from config.json when first used
+    config = LazyConfig()
 
-    options.add_argument("--headless")
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
-    options.add_experimental_option('useAutomationExtension', False)
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    options.binary_location = config['BINARY_LOCATION']
+    # default or lean, see driver_pool.chrome_options
+    profile = LazyConfig(key='BROWSER_PROFILE', default='default')
 
-    def __init__(self, file_name):
+    # document metadata embedded in the page, has abstract and keywords
+    metadata_pattern = re.compile(r'xplGlobal\.document\.metadata\s*=\s*(\{.*?\});\s*\n', re.S)
+
+    journal_file = './ieee_journal.jsonl'
+
+    # site the document pages are read from, benchmarks use a local server
+    base_url = "https://ieeexplore.ieee.org"
+
+    def __init__(self,
+                 file_name,
+                 pool=None,
+                 use_api=False,
+                 api_workers=4,
+                 cache=None,
+                 checkpoint=True,
+                 resume=False):
         self.driver = None
+        self.pool = pool
+        self.cache = cache
+        self.retry = default_policy()
+        self.waits = waits_for('IEEE')
+        self.use_api = use_api
+        self.api_workers = api_workers
+        self.fetcher = HttpFetcher(pool_size=api_workers, cache=cache, source='IEEE') if use_api else None
         self.failure = []
         self.destination = file_name
+        self.journal = Journal(self.journal_file) if checkpoint else None
+        self.finished = set()
+
+        # records can be given directly, as parallel workers do
+        if isinstance(file_name, dict):
+            self.link_object = file_name
+
+        else:
+            with open(file_name, "r") as file:
+                self.link_object = json.load(file)
+
+        self.restore(resume)
+
+    def restore(self, resume) -> None:
+        """
+        take finished records from the journal of an earlier run, or
+        start over with an empty journal
+
+        Parameters
+        ----------
+        resume: bool
+            skip publications finished by an earlier run
+
+        Returns
+        -------
+
+        """
+        if self.journal is None:
+            return
+
+        if not resume:
+            self.journal.remove()
+            return
+
+        for key, value in self.journal.load().items():
+            if key in self.link_object:
+                self.link_object[key] = value
+                self.finished.add(key)
+
+    def checkpoint(self, key) -> None:
+        """
+        mark publication as finished and append it to the journal
+
+        Parameters
+        ----------
+        key: str
+            key of the publication in the link object
+
+        Returns
+        -------
 
-        with open(file_name, "r") as file:
-            self.link_object = json.load(file)
+        """
+        self.finished.add(key)
+
+        if self.journal is not None:
+            self.journal.append(key, self.link_object[key])
 
     def init_driver(self) -> None:
         """
@@ -194,9 +460,13 @@ class Paper:
         -------
 
         """
-        self.driver = undetected_chromedriver.Chrome(chrome_options=self.options,
-                                                     executable_path=self.config['EXECUTABLE_PATH'])
-        clean_cookies_and_caches(self.driver)
+        if self.pool is not None:
+            self.driver = self.pool.acquire()
+            return
+
+        self.driver = new_driver(self.config['BINARY_LOCATION'],
+                                 self.config['EXECUTABLE_PATH'],
+                                 self.profile)
 
     def close_driver(self) -> None:
         """
@@ -206,6 +476,10 @@ class Paper:
         -------
 
         """
+        if self.pool is not None:
+            self.pool.release(self.driver)
+            return
+
         self.driver.close()
 
     def request_paper(self, page_link) -> None:
@@ -221,28 +495,37 @@ class Paper:
         -------
 
         """
-        stealth(self.driver,
-                languages=["en-US", "en"],
-                vendor="Google Inc.",
-                platform="Win32",
-                webgl_vendor="Intel Inc.",
-                renderer="Intel Iris OpenGL Engine",
-                fix_hairline=True,
-                )
+        hide_automation(self.driver)
 
-        URL = f"https://ieeexplore.ieee.org{page_link}"
+        URL = f"{self.base_url}{page_link}"
 
-        # make request
-        self.driver.delete_all_cookies()
+        # make request, paced by the shared limiter of the host
+        limiter = limiter_for(URL)
 
-        try:
-            self.driver.get(URL)
+        def attempt():
+            limiter.wait()
+            self.driver.delete_all_cookies()
 
-        except:
-            self.fall_back()
-            self.driver.get(URL)
+            with metrics.timed('IEEE', 'paper_page') as event:
+                started = time.monotonic()
+                self.driver.get(URL)
+                page_stats.record(self.driver, self.profile, time.monotonic() - started)
+
+                blocked = is_block_page(self.driver)
+                event["outcome"] = 'blocked' if blocked else 'ok'
 
-        time.sleep(abs(np.random.normal(1, 0.4)))
+            limiter.feedback(blocked=blocked)
+
+            return blocked
+
+        # a browser that errors or lands on a block page is replaced before the next attempt
+        self.retry.run(attempt,
+                       URL,
+                       failed=lambda blocked: blocked,
+                       on_failure=lambda error: self.fall_back())
+
+        if self.pool is not None:
+            self.pool.record_page(self.driver)
 
     def fall_back(self):
         """
@@ -252,8 +535,12 @@ class Paper:
         -------
 
         """
+        if self.pool is not None:
+            self.pool.discard(self.driver)
+            self.driver = self.pool.acquire()
+            return
+
         self.close_driver()
-        time.sleep(1)
         self.init_driver()
 
     def get_abstract_text(self) -> str:
@@ -268,10 +555,15 @@ class Paper:
         return self.driver.find_element(By.CLASS_NAME, 'abstract-text').text.replace('Abstract:\n', '')
 
     def click_kw_section(self) -> None:
-        self.driver.execute_script("arguments[0].scrollIntoView();",
-                                   self.driver.find_element(By.ID, 'keywords'))
-        WebDriverWait(self.driver, 10).until(EC.element_to_be_clickable((By.ID, 'keywords'))).click()
-        time.sleep(1)
+        section = self.waits.clickable(self.driver, By.ID, 'keywords', 'keywords section')
+
+        # some publications have no keywords
+        if section is None:
+            return
+
+        self.driver.execute_script("arguments[0].scrollIntoView();", section)
+        section.click()
+        self.waits.present(self.driver, By.CSS_SELECTOR, "li[class='doc-keywords-list-item']", 'keywords')
 
     def get_keywords(self) -> list:
         """
@@ -287,51 +579,119 @@ class Paper:
                                              "class='doc-keywords-list-item']>ul")
         return [kw.text.replace('\n', '') for kw in kw_types if kw.text != '']
 
-    def update_paper_details(self) -> None:
+    @staticmethod
+    def parse_page(document: str):
         """
-        update the detail object of the publications
+        get abstract and keywords from a saved publication page without
+        a browser
+
+        Parameters
+        ----------
+        document: str
+            html of the publication page
 
         Returns
         -------
+        abstract and keywords: tuple, abstract is None if it is not in the page
 
         """
-        # start driver
-        self.init_driver()
+        abstract = text_by_class(document, 'abstract-text')
 
-        for key, value in self.link_object.items():
-            doc_link = value["link"]
+        if abstract is None:
+            return None, None
 
-            try:
-                self.request_paper(doc_link)
-                self.click_kw_section()
+        tree = html.fromstring(document)
+        kw_types = tree.xpath("//ul[@class='doc-keywords-list stats-keywords-list']"
+                              "/li[@class='doc-keywords-list-item']/ul")
+        kws = [''.join(t.strip() for t in kw.itertext()) for kw in kw_types]
 
-            except exceptions.NoSuchElementException:
-                self.fall_back()
-                self.request_paper(doc_link)
-                self.click_kw_section()
+        return abstract.removeprefix('Abstract:').strip(), [kw for kw in kws if kw != '']
 
-            except:
-                continue
+    def request_keywords(self, article_number: str):
+        """
+        get keywords of a publication from the document api
 
-            time.sleep(abs(np.random.normal(1, 0.4)))
+        Parameters
+        ----------
+        article_number: str
+            IEEE Xplore article number
 
-            try:
-                abstract = self.get_abstract_text()
-                kws = self.get_keywords()
+        Returns
+        -------
+        list of keyword strings, one for each keyword type: list
 
-            except:
-                abstract = np.NAN
-                kws = np.NAN
+        """
+        result = self.fetcher.fetch_json(f"{self.base_url}/rest/document/{article_number}/keywords",
+                                         headers={"Referer": f"{self.base_url}/document/{article_number}"})
 
-            value["abs"] = abstract
-            value["kws"] = kws
+        if result is None or 'keywords' not in result:
+            return None
 
-        # close driver
-        self.close_driver()
+        return [','.join(kw.get('kwd', [])) for kw in result['keywords']]
 
-    def batch_update_details(self, size) -> None:
+    def request_metadata(self, doc_link: str):
         """
-        update the detail object of the publications batch wise
+        get metadata json embedded in the document page, used when the
+        search results did not have the abstract
+
+        Parameters
+        ----------
+        doc_link: str
+            path of the document page
+
+        Returns
+        -------
+        metadata: dict
+
+        """
+        document = self.fetcher.fetch(f"{self.base_url}{doc_link}")
+        found = self.metadata_pattern.search(document) if document else None
+
+        if found is None:
+            return None
+
+        try:
+            return json.loads(found.group(1))
+
+        except ValueError:
+            return None
+
+    def api_details(self, key: str, value: dict):
+        """
+        get abstract and keywords of a publication without a browser
+
+        Parameters
+        ----------
+        key: str
+            IEEE Xplore article number
+
+        value: dict
+            record of the publication from the link object
+
+        Returns
+        -------
+        abstract and keywords: tuple
+
+        """
+        abstract = value.get('abstract')
+        kws = self.request_keywords(key)
+
+        if abstract is None or kws is None:
+            metadata = self.request_metadata(value['link']) or {}
+            abstract = abstract or metadata.get('abstract')
+
+            if kws is None and 'keywords' in metadata:
+                kws = [','.join(kw.get('kwd', [])) for kw in metadata['keywords']]
+
+        metrics.count('IEEE', 'extraction', 'ok' if abstract is not None and kws is not None else 'miss')
+
+        return (abstract if abstract is not None else math.nan,
+                kws if kws is not None else math.nan)
+
+    def api_update_details(self, size) -> None:
+        """
+        update the detail object of the publications from the api, batch
+        wise with concurrent requests
 
         Parameters
         ----------
@@ -342,41 +702,164 @@ class Paper:
         -------
 
         """
-        keys = list(self.link_object.keys())
+        keys = [key for key in self.link_object.keys() if key not in self.finished]
+
+        with ThreadPoolExecutor(max_workers=self.api_workers) as executor:
+            for i in range(0, len(keys), size):
+                batch = keys[i:(i + size)]
+                details = executor.map(self.api_details, batch, [self.link_object[p] for p in batch])
+
+                for p, (abstract, kws) in zip(batch, details):
+                    if self.store_details(self.link_object[p], abstract, kws):
+                        self.checkpoint(p)
+
+                print(f'reading papers: {min(i + size, len(keys))} from {len(keys)}', end='\r')
+
+    @staticmethod
+    def store_details(value: dict, abstract, kws) -> bool:
+        """
+        add abstract and keywords to the record of a publication, a read
+        abstract replaces the one of the search results so it is kept once
+
+        Parameters
+        ----------
+        value: dict
+            record of the publication from the link object
+
+        abstract: str
+            abstract, nan if it could not be read
+
+        kws: list
+            keywords, nan if they could not be read
+
+        Returns
+        -------
+        weather the abstract was read: bool
+
+        """
+        value["abs"] = abstract
+        value["kws"] = kws
 
-        for i in range(size, len(self.link_object), size):
-            batch = keys[(i - size):i]
+        if not isinstance(abstract, str):
+            return False
+
+        value.pop('abstract', None)
+
+        return True
+
+    def update_paper(self, value: dict) -> bool:
+        """
+        add abstract and keywords of a single publication to its record
+
+        Parameters
+        ----------
+        value: dict
+            record of the publication from the link object
+
+        Returns
+        -------
+        weather the abstract was read, records which failed are not
+        checkpointed so a resumed run tries them again: bool
+
+        """
+        doc_link = value["link"]
+        URL = f"{self.base_url}{doc_link}"
+
+        # pages read before are taken from the cache without the browser
+        if self.cache is not None:
+            abstract, kws = self.parse_page(self.cache.get('IEEE', URL) or '')
+
+            if abstract is not None:
+                return self.store_details(value, abstract, kws)
+
+        # streamed records start the browser on the first page
+        if self.driver is None:
             self.init_driver()
 
-            for p in batch:
-                doc_link = self.link_object[p]["link"]
+        try:
+            self.request_paper(doc_link)
+            self.waits.present(self.driver, By.CLASS_NAME, 'abstract-text', 'abstract')
+            self.click_kw_section()
+
+        except exceptions.NoSuchElementException:
+            self.fall_back()
+            self.request_paper(doc_link)
+            self.waits.present(self.driver, By.CLASS_NAME, 'abstract-text', 'abstract')
+            self.click_kw_section()
+
+        except:
+            return False
+
+        started = time.monotonic()
+
+        try:
+            abstract = self.get_abstract_text()
+            kws = self.get_keywords()
+
+        except:
+            abstract = math.nan
+            kws = math.nan
+            metrics.observe('IEEE', 'extraction', time.monotonic() - started, 'miss')
+
+        else:
+            metrics.observe('IEEE', 'extraction', time.monotonic() - started)
+
+            if self.cache is not None:
+                self.cache.put('IEEE', URL, None, self.driver.page_source)
+
+        return self.store_details(value, abstract, kws)
+
+    def update_paper_details(self) -> None:
+        """
+        update the detail object of the publications
+
+        Returns
+        -------
+
+        """
+        if self.use_api:
+            self.api_update_details(25)
+            return
+
+        # start driver
+        self.init_driver()
+
+        for key, value in self.link_object.items():
+            if key in self.finished:
+                continue
+
+            if self.update_paper(value):
+                self.checkpoint(key)
+
+        # close driver
+        self.close_driver()
 
-                try:
-                    self.request_paper(doc_link)
-                    self.click_kw_section()
+    def batch_update_details(self, size) -> None:
+        """
+        update the detail object of the publications batch wise
 
-                except exceptions.NoSuchElementException:
-                    self.fall_back()
-                    self.request_paper(doc_link)
-                    self.click_kw_section()
+        Parameters
+        ----------
+        size: int
+            size of a batch
 
-                except:
-                    continue
+        Returns
+        -------
 
-                try:
-                    abstract = self.get_abstract_text()
-                    kws = self.get_keywords()
+        """
+        if self.use_api:
+            self.api_update_details(size)
+            return
 
-                except:
-                    abstract = np.NAN
-                    kws = np.NAN
+        keys = [key for key in self.link_object.keys() if key not in self.finished]
 
-                self.link_object[p]["abs"] = abstract
-                self.link_object[p]["abs"] = kws
+        for i in range(0, len(keys), size):
+            batch = keys[i:(i + size)]
+            self.init_driver()
 
-            # dump updated link object to json
-            with open('./ieee_temp.json', 'w') as file:
-                json.dump(self.link_object, file)
+            for p in batch:
+                if self.update_paper(self.link_object[p]):
+                    self.checkpoint(p)
 
             # close driver
             self.close_driver()
@@ -394,11 +877,8 @@ class Paper:
         -------
 
         """
-        if os.path.isfile('./ieee_temp.json'):
-            with open('./ieee_temp.json') as file:
-                self.link_object = json.load(file)
+        atomic_write_json(path, self.link_object)
 
-            os.remove('./ieee_temp.json')
-
-        with open(path, 'w') as file:
-            json.dump(self.link_object, file)
+        # results are safe in the output file, journal is not needed anymore
+        if self.journal is not None:
+            self.journal.remove()
@@ -0,0 +1,143 @@
+import re
+
+# fields of a search result, a change in any of them means the
+# publication should be read again
+LISTING_FIELDS = ('title', 'link', 'date', 'type_')
+
+KEY_PATTERNS = {
+    'IEEE': re.compile(r'/document/(\d+)'),
+    'ACM': re.compile(r'/doi/(?:abs/|full/|pdf/)?10\.\d+/([^/?#]+)'),
+    'SCIDIR': re.compile(r'/pii/([A-Z0-9]+)', re.I),
+}
+
+
+def normalized_key(source: str, key: str, record: dict) -> str:
+    """
+    stable key of a publication, IEEE article number, ACM DOI suffix or
+    ScienceDirect PII, taken from the link when possible so files written
+    by older versions still match
+
+    Parameters
+    ----------
+    source: str
+        name of the source, IEEE, ACM or SCIDIR
+
+    key: str
+        key of the record in the link object
+
+    record: dict
+        record of the publication
+
+    Returns
+    -------
+    key: str
+
+    """
+    found = KEY_PATTERNS[source].search(record.get('link') or '')
+
+    if found is not None:
+        return found.group(1).upper() if source == 'SCIDIR' else found.group(1)
+
+    return str(key)
+
+
+def index_records(source: str, records: dict) -> dict:
+    return {normalized_key(source, key, record): (key, record) for key, record in records.items()}
+
+
+def is_changed(old: dict, new: dict) -> bool:
+    """
+    check weather listing fields of a search result changed
+
+    Parameters
+    ----------
+    old: dict
+        record from the earlier run
+
+    new: dict
+        record from the fresh search results
+
+    Returns
+    -------
+
+    """
+    return any(old.get(field) != new.get(field) for field in LISTING_FIELDS if field in new)
+
+
+def plan_refresh(source: str, fresh: dict, previous_links: dict, previous_abs: dict) -> dict:
+    """
+    find search results which need details, those not in the earlier
+    results, those whose abstract could not be read then and those whose
+    listing changed since then
+
+    Parameters
+    ----------
+    source: str
+        name of the source, IEEE, ACM or SCIDIR
+
+    fresh: dict
+        link object of the fresh search
+
+    previous_links: dict
+        link object of the earlier search
+
+    previous_abs: dict
+        publications with details from the earlier run
+
+    Returns
+    -------
+    records to get details for, keyed as in the fresh link object: dict
+
+    """
+    links = index_records(source, previous_links)
+    details = index_records(source, previous_abs)
+    pending = {}
+
+    for norm, (key, record) in index_records(source, fresh).items():
+        # failed reads of the earlier run have a nan abstract
+        if norm not in details or not isinstance(details[norm][1].get('abs'), str):
+            pending[key] = record
+
+        elif is_changed(details[norm][1], record) or (norm in links and is_changed(links[norm][1], record)):
+            pending[key] = record
+
+    return pending
+
+
+def merge_details(source: str, previous_abs: dict, fresh: dict, details: dict) -> dict:
+    """
+    merge newly read publications into the earlier dataset, publications
+    missing from the fresh search are kept. only listing fields of the
+    fresh search are taken into unchanged publications
+
+    Parameters
+    ----------
+    source: str
+        name of the source, IEEE, ACM or SCIDIR
+
+    previous_abs: dict
+        publications with details from the earlier run
+
+    fresh: dict
+        link object of the fresh search
+
+    details: dict
+        publications read in this run
+
+    Returns
+    -------
+    merged dataset: dict
+
+    """
+    merged = index_records(source, previous_abs)
+
+    for norm, (key, record) in index_records(source, fresh).items():
+        if norm in merged:
+            old_key, old_record = merged[norm]
+            merged[norm] = (old_key, dict(old_record, **{field: record[field]
+                                                         for field in LISTING_FIELDS if field in record}))
+
+    for norm, (key, record) in index_records(source, details).items():
+        merged[norm] = (merged[norm][0] if norm in merged else key, record)
+
+    return dict(merged.values())
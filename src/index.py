@@ -0,0 +1,542 @@
+import re
+import math
+import heapq
+import pickle
+import bisect
+
+from array import array
+from src.sinks import read_records
+
+# indexed fields and their weight in the score
+FIELD_WEIGHTS = {'title': 2.0, 'kws': 1.5, 'abs': 1.0}
+
+# field names of the ACM and IEEE Xplore query syntax, lower cased
+FIELD_ALIASES = {
+    'allfield': None, 'all': None, 'all metadata': None, 'all fields': None,
+    'title': ('title',), 'document title': ('title',), 'publication title': ('title',),
+    'abstract': ('abs',), 'abs': ('abs',),
+    'keyword': ('kws',), 'keywords': ('kws',), 'kws': ('kws',), 'author keywords': ('kws',),
+    'index terms': ('kws',), 'ieee terms': ('kws',),
+}
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+QUERY_PATTERN = re.compile(r'"((?:[^"\\]|\\.)*)"(:)?|([()\[\]])|([^\s()\[\]"]+)')
+
+OPERATORS = ('AND', 'OR', 'NOT')
+
+FORMAT_VERSION = 1
+
+
+def tokenize(text) -> list:
+    if isinstance(text, (list, tuple)):
+        text = ' '.join(str(t) for t in text)
+
+    if not isinstance(text, str):
+        return []
+
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def contains(haystack: bytes, needle: bytes, itemsize: int) -> bool:
+    """
+    check weather a term id sequence is in the term ids of a document,
+    matches which do not start at an item boundary are skipped
+
+    Parameters
+    ----------
+    haystack: bytes
+        term ids of the document
+
+    needle: bytes
+        term ids of the phrase
+
+    itemsize: int
+        bytes of a single term id
+
+    Returns
+    -------
+
+    """
+    start = haystack.find(needle)
+
+    while start != -1:
+        if start % itemsize == 0:
+            return True
+
+        start = haystack.find(needle, start + 1)
+
+    return False
+
+
+class QueryError(ValueError):
+    """
+    raise when a screening query can not be parsed
+    """
+
+
+def lex(query: str) -> list:
+    """
+    split a query into (kind, value) tokens, kind is one of word, phrase,
+    field, open, close or op
+
+    Parameters
+    ----------
+    query: str
+
+    Returns
+    -------
+    tokens: list
+
+    """
+    tokens = []
+
+    for phrase, colon, bracket, word in QUERY_PATTERN.findall(query):
+        if bracket:
+            tokens.append(('open' if bracket in '([' else 'close', bracket))
+
+        elif colon:
+            tokens.append(('field', phrase))
+
+        elif word:
+            if word in OPERATORS:
+                tokens.append(('op', word))
+
+            elif ':' in word:
+                # Title:learning and AllField: forms
+                name, _, rest = word.partition(':')
+                tokens.append(('field', name))
+
+                if rest:
+                    tokens.append(('word', rest))
+
+            else:
+                tokens.append(('word', word))
+
+        else:
+            tokens.append(('phrase', phrase))
+
+    return tokens
+
+
+class QueryParser:
+    """
+    recursive descent parser of screening queries, words next to each
+    other are joined with AND
+
+        query  := or
+        or     := and (OR and)*
+        and    := not ([AND] not)*
+        not    := NOT not | atom
+        atom   := ( query ) | field: atom | "phrase" | word | prefix*
+
+    Methods
+    -------
+    parse:
+        syntax tree of the query
+    """
+
+    def __init__(self, query: str):
+        self.query = query
+        self.tokens = lex(query)
+        self.position = 0
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def take(self):
+        token = self.peek()
+        self.position += 1
+
+        return token
+
+    def parse(self):
+        if not self.tokens:
+            raise QueryError("empty query")
+
+        node = self.parse_or(None)
+
+        if self.position < len(self.tokens):
+            raise QueryError(f"unexpected {self.peek()[1]!r} in {self.query!r}")
+
+        return node
+
+    def parse_or(self, fields):
+        nodes = [self.parse_and(fields)]
+
+        while self.peek() == ('op', 'OR'):
+            self.take()
+            nodes.append(self.parse_and(fields))
+
+        return nodes[0] if len(nodes) == 1 else ('or', nodes)
+
+    def parse_and(self, fields):
+        nodes = [self.parse_not(fields)]
+
+        while True:
+            kind, value = self.peek()
+
+            if kind == 'op' and value == 'AND':
+                self.take()
+
+            elif kind is None or kind == 'close' or (kind, value) == ('op', 'OR'):
+                break
+
+            nodes.append(self.parse_not(fields))
+
+        return nodes[0] if len(nodes) == 1 else ('and', nodes)
+
+    def parse_not(self, fields):
+        if self.peek() == ('op', 'NOT'):
+            self.take()
+            return ('not', self.parse_not(fields))
+
+        return self.parse_atom(fields)
+
+    def parse_atom(self, fields):
+        kind, value = self.take()
+
+        if kind == 'open':
+            node = self.parse_or(fields)
+
+            if self.take()[0] != 'close':
+                raise QueryError(f"missing closing bracket in {self.query!r}")
+
+            return node
+
+        if kind == 'field':
+            name = value.strip().lower()
+
+            if name not in FIELD_ALIASES:
+                raise QueryError(f"unknown field {value!r}, use one of {sorted(FIELD_ALIASES)}")
+
+            return self.parse_atom(FIELD_ALIASES[name] or None)
+
+        if kind == 'phrase' or kind == 'word':
+            if kind == 'word' and value.endswith('*') and len(value) > 1:
+                stems = tokenize(value[:-1])
+
+                if len(stems) == 1:
+                    return ('prefix', fields, stems[0])
+
+            terms = tokenize(value)
+
+            if not terms:
+                raise QueryError(f"nothing to search in {value!r}")
+
+            return ('term', fields, terms[0]) if len(terms) == 1 else ('phrase', fields, terms)
+
+        raise QueryError(f"unexpected {value!r} in {self.query!r}")
+
+
+class InvertedIndex:
+    """
+    Parameters
+    ----------
+    k1: float
+        bm25 term frequency saturation
+
+    b: float
+        bm25 length normalization
+
+    Attributes
+    ----------
+    docs: list
+        (source, key, title) of every indexed publication, position in the
+        list is the document id
+
+    terms: dict
+        id of every term
+
+    postings: dict
+        sorted document ids and term frequencies of each term id, per field
+
+    tokens: dict
+        term ids of each document in text order, per field, used to check
+        phrases
+
+    Methods
+    -------
+    add:
+        index a publication
+
+    search:
+        publications matching a query, best bm25 score first
+
+    count:
+        number of publications matching a query
+
+    save:
+        write the index to a file
+
+    load:
+        read an index from a file
+    """
+
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.docs = []
+        self.terms = {}
+        self.postings = {field: {} for field in FIELD_WEIGHTS}
+        self.tokens = {field: [] for field in FIELD_WEIGHTS}
+        self.lengths = {field: array('I') for field in FIELD_WEIGHTS}
+        self.total_length = {field: 0 for field in FIELD_WEIGHTS}
+        self.vocabulary = None
+
+    def __len__(self):
+        return len(self.docs)
+
+    def add(self, source: str, key: str, record: dict) -> None:
+        """
+        index title, abstract and keywords of a publication
+
+        Parameters
+        ----------
+        source: str
+            name of the source
+
+        key: str
+            key of the publication
+
+        record: dict
+            record from an abstract file
+
+        Returns
+        -------
+
+        """
+        doc = len(self.docs)
+        title = record.get('title')
+        self.docs.append((source, str(key), title if isinstance(title, str) else None))
+        self.vocabulary = None
+
+        for field in FIELD_WEIGHTS:
+            ids = array('I', (self.terms.setdefault(t, len(self.terms)) for t in tokenize(record.get(field))))
+            self.tokens[field].append(ids)
+            self.lengths[field].append(len(ids))
+            self.total_length[field] += len(ids)
+
+            counts = {}
+
+            for term in ids:
+                counts[term] = counts.get(term, 0) + 1
+
+            for term, tf in counts.items():
+                docs, tfs = self.postings[field].setdefault(term, (array('I'), array('I')))
+                docs.append(doc)
+                tfs.append(tf)
+
+    def fields_of(self, fields):
+        return fields or tuple(FIELD_WEIGHTS)
+
+    def expand(self, stem: str) -> list:
+        # sorted vocabulary, built once per loaded index
+        if self.vocabulary is None:
+            self.vocabulary = sorted(self.terms)
+
+        start = bisect.bisect_left(self.vocabulary, stem)
+        found = []
+
+        for term in self.vocabulary[start:]:
+            if not term.startswith(stem):
+                break
+
+            found.append(term)
+
+        return found
+
+    def term_docs(self, fields, term: str) -> set:
+        term_id = self.terms.get(term)
+        docs = set()
+
+        if term_id is None:
+            return docs
+
+        for field in self.fields_of(fields):
+            if term_id in self.postings[field]:
+                docs.update(self.postings[field][term_id][0])
+
+        return docs
+
+    def phrase_docs(self, fields, terms: list) -> set:
+        ids = [self.terms.get(t) for t in terms]
+
+        if None in ids:
+            return set()
+
+        found = set()
+
+        for field in self.fields_of(fields):
+            postings = [self.postings[field].get(i) for i in ids]
+
+            if None in postings:
+                continue
+
+            candidates = set(postings[0][0]).intersection(*(p[0] for p in postings[1:]))
+            needle = array('I', ids).tobytes()
+
+            for doc in candidates - found:
+                if contains(self.tokens[field][doc].tobytes(), needle, array('I').itemsize):
+                    found.add(doc)
+
+        return found
+
+    def evaluate(self, node, scoring: list) -> set:
+        kind = node[0]
+
+        if kind == 'term':
+            scoring.append((node[1], node[2]))
+            return self.term_docs(node[1], node[2])
+
+        if kind == 'phrase':
+            scoring.extend((node[1], t) for t in node[2])
+            return self.phrase_docs(node[1], node[2])
+
+        if kind == 'prefix':
+            docs = set()
+
+            for term in self.expand(node[2]):
+                scoring.append((node[1], term))
+                docs |= self.term_docs(node[1], term)
+
+            return docs
+
+        if kind == 'or':
+            return set().union(*(self.evaluate(child, scoring) for child in node[1]))
+
+        if kind == 'and':
+            # negated parts are removed from the others instead of taking
+            # the complement of the whole collection
+            positive = [c for c in node[1] if c[0] != 'not']
+            negative = [c[1] for c in node[1] if c[0] == 'not']
+            sets = sorted((self.evaluate(c, scoring) for c in positive), key=len)
+            docs = sets[0].intersection(*sets[1:]) if sets else set(range(len(self.docs)))
+
+            for child in negative:
+                docs -= self.evaluate(child, [])
+
+            return docs
+
+        # not
+        return set(range(len(self.docs))) - self.evaluate(node[1], [])
+
+    def scores(self, docs: set, scoring: list) -> dict:
+        scores = dict.fromkeys(docs, 0.0)
+        count = max(1, len(self.docs))
+
+        for fields, term in set(scoring):
+            term_id = self.terms.get(term)
+
+            for field in self.fields_of(fields):
+                if term_id not in self.postings[field]:
+                    continue
+
+                ids, tfs = self.postings[field][term_id]
+                idf = math.log(1 + (count - len(ids) + 0.5) / (len(ids) + 0.5))
+                average = self.total_length[field] / count or 1.0
+                lengths = self.lengths[field]
+                weight = FIELD_WEIGHTS[field] * idf * (self.k1 + 1)
+                base, slope = self.k1 * (1 - self.b), self.k1 * self.b / average
+
+                for doc, tf in zip(ids, tfs):
+                    if doc in scores:
+                        scores[doc] += weight * tf / (tf + base + slope * lengths[doc])
+
+        return scores
+
+    def search(self, query: str, limit=20) -> list:
+        """
+        publications matching a query, best bm25 score first
+
+        Parameters
+        ----------
+        query: str
+            boolean query, e.g. AllField:("sign language" OR gesture*) AND NOT Title:survey
+
+        limit: int
+            number of results, all if None
+
+        Returns
+        -------
+        list of dicts with source, key, title and score: list
+
+        """
+        scoring = []
+        docs = self.evaluate(QueryParser(query).parse(), scoring)
+        scores = self.scores(docs, scoring)
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1]) if limit else \
+            sorted(scores.items(), key=lambda item: -item[1])
+
+        return [{"source": self.docs[doc][0],
+                 "key": self.docs[doc][1],
+                 "title": self.docs[doc][2],
+                 "score": round(score, 4)} for doc, score in best]
+
+    def count(self, query: str) -> int:
+        return len(self.evaluate(QueryParser(query).parse(), []))
+
+    def save(self, path: str) -> None:
+        state = dict(self.__dict__, version=FORMAT_VERSION, vocabulary=None)
+
+        with open(path, 'wb') as file:
+            pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path: str):
+        with open(path, 'rb') as file:
+            state = pickle.load(file)
+
+        if state.pop('version', None) != FORMAT_VERSION:
+            raise ValueError(f"{path} was written by another version, build the index again")
+
+        index = cls()
+        index.__dict__.update(state)
+
+        return index
+
+
+def build_index(sources: dict, path=None) -> InvertedIndex:
+    """
+    index the abstract files of the sources, files are read record by record
+
+    Parameters
+    ----------
+    sources: dict
+        json or jsonl abstract file keyed by source name
+
+    path: str
+        file to save the index to, not saved if not given
+
+    Returns
+    -------
+    index: InvertedIndex
+
+    """
+    index = InvertedIndex()
+
+    for source, file in sources.items():
+        for key, record in read_records(file):
+            index.add(source, key, record)
+
+    if path is not None:
+        index.save(path)
+
+    return index
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    if len(sys.argv) < 3:
+        raise SystemExit("usage: python -m src.index <index file> <query> [limit]")
+
+    index = InvertedIndex.load(sys.argv[1])
+    started = time.perf_counter()
+    results = index.search(sys.argv[2], int(sys.argv[3]) if len(sys.argv) > 3 else 20)
+
+    for result in results:
+        print(f"{result['score']:8.3f}  {result['source']:6}  {result['key']:24}  {result['title']}")
+
+    print(f"{len(results)} results in {(time.perf_counter() - started) * 1000:.1f} ms")
@@ -0,0 +1,167 @@
+import os
+import json
+import tempfile
+import threading
+
+
+def atomic_write_json(path: str, obj) -> None:
+    """
+    write json file so readers see either the old or the new file, never
+    a half written one
+
+    Parameters
+    ----------
+    path: str
+        destination file
+
+    obj: object
+        json serializable object
+
+    Returns
+    -------
+
+    """
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, temp = tempfile.mkstemp(dir=folder, prefix='.tmp-', suffix='.json')
+
+    try:
+        with os.fdopen(fd, 'w') as file:
+            json.dump(obj, file)
+            file.flush()
+            os.fsync(file.fileno())
+
+        os.replace(temp, path)
+
+    except BaseException:
+        if os.path.exists(temp):
+            os.remove(temp)
+        raise
+
+
+class Journal:
+    """
+    Parameters
+    ----------
+    path: str
+        jsonl file of the journal
+
+    compact_every: int
+        number of appended records after which the journal is rewritten
+        with a single record per key
+
+    Attributes
+    ----------
+    appended: int
+        records appended since the last compaction
+
+    Methods
+    -------
+    load:
+        get finished records from the journal
+
+    append:
+        add a finished record to the journal
+
+    compact:
+        rewrite the journal with the latest record of each key
+
+    remove:
+        delete the journal
+
+    """
+
+    def __init__(self, path, compact_every=500):
+        self.path = path
+        self.compact_every = compact_every
+        self.appended = 0
+        self.lock = threading.Lock()
+
+    def exists(self) -> bool:
+        return os.path.isfile(self.path)
+
+    def load(self) -> dict:
+        """
+        get finished records from the journal, a line cut by a crash in
+        the middle of a write is ignored
+
+        Returns
+        -------
+        records keyed by publication key: dict
+
+        """
+        records = {}
+
+        if not self.exists():
+            return records
+
+        with open(self.path, 'r') as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+
+                except ValueError:
+                    continue
+
+                records[entry['key']] = entry['value']
+
+        return records
+
+    def append(self, key: str, value: dict) -> None:
+        """
+        add a finished record to the journal
+
+        Parameters
+        ----------
+        key: str
+            key of the publication in the link object
+
+        value: dict
+            record of the publication
+
+        Returns
+        -------
+
+        """
+        line = json.dumps({"key": key, "value": value}) + '\n'
+
+        with self.lock:
+            with open(self.path, 'a') as file:
+                file.write(line)
+                file.flush()
+                os.fsync(file.fileno())
+
+            self.appended += 1
+
+            if self.appended >= self.compact_every:
+                self.compact_locked()
+
+    def compact(self) -> None:
+        """
+        rewrite the journal with the latest record of each key
+
+        Returns
+        -------
+
+        """
+        with self.lock:
+            self.compact_locked()
+
+    def compact_locked(self) -> None:
+        records = self.load()
+        folder = os.path.dirname(os.path.abspath(self.path))
+        fd, temp = tempfile.mkstemp(dir=folder, prefix='.tmp-', suffix='.jsonl')
+
+        with os.fdopen(fd, 'w') as file:
+            for key, value in records.items():
+                file.write(json.dumps({"key": key, "value": value}) + '\n')
+
+            file.flush()
+            os.fsync(file.fileno())
+
+        os.replace(temp, self.path)
+        self.appended = 0
+
+    def remove(self) -> None:
+        with self.lock:
+            if self.exists():
+                os.remove(self.path)
@@ -0,0 +1,373 @@
+import os
+import time
+import json
+import threading
+
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+# upper bounds in seconds of the latency histogram buckets
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# source name of each site, sleeps and retries only know the host
+HOSTS = {
+    'ieeexplore.ieee.org': 'IEEE',
+    'ieeexplore.ieee.org/rest/': 'IEEE',
+    'dl.acm.org': 'ACM',
+    'www.sciencedirect.com': 'SCIDIR',
+}
+
+# metric families in the textfile
+DURATION = 'scrapper_duration_seconds'
+EVENTS = 'scrapper_events_total'
+
+_histograms = {}
+_counters = {}
+_lock = threading.Lock()
+
+
+def source_of(url: str) -> str:
+    """
+    source name of a URL or host, the host itself for unknown sites
+
+    Parameters
+    ----------
+    url: str
+
+    Returns
+    -------
+    source: str
+
+    """
+    host = urlsplit(url).netloc if '//' in url else url
+
+    return HOSTS.get(host, host)
+
+
+def count(source: str, phase: str, outcome='ok', amount=1) -> None:
+    """
+    count an event of a source
+
+    Parameters
+    ----------
+    source: str
+        name of the source, IEEE, ACM or SCIDIR
+
+    phase: str
+        search_page, paper_page, extraction, wait, sleep or retry
+
+    outcome: str
+        ok, error, blocked, timeout, miss ...
+
+    amount: int
+
+    Returns
+    -------
+
+    """
+    with _lock:
+        key = (source, phase, outcome)
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+def observe(source: str, phase: str, seconds: float, outcome='ok') -> None:
+    """
+    add the duration of an event to the histogram of its source and phase,
+    and count the event
+
+    Parameters
+    ----------
+    source: str
+        name of the source, IEEE, ACM or SCIDIR
+
+    phase: str
+        search_page, paper_page, extraction, wait, sleep or retry
+
+    seconds: float
+
+    outcome: str
+        ok, error, blocked, timeout, miss ...
+
+    Returns
+    -------
+
+    """
+    with _lock:
+        histogram = _histograms.setdefault((source, phase), {"buckets": [0] * len(BUCKETS), "sum": 0.0, "count": 0})
+
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                histogram["buckets"][i] += 1
+
+        histogram["sum"] += seconds
+        histogram["count"] += 1
+
+        key = (source, phase, outcome)
+        _counters[key] = _counters.get(key, 0) + 1
+
+
+@contextmanager
+def timed(source: str, phase: str):
+    """
+    time the block as an event of the source, the block can set the
+    outcome in the yielded dict. an exception counts as an error
+
+    Parameters
+    ----------
+    source: str
+        name of the source, IEEE, ACM or SCIDIR
+
+    phase: str
+        search_page, paper_page, extraction ...
+
+    Returns
+    -------
+    event: dict
+
+    """
+    event = {"outcome": 'ok'}
+    started = time.monotonic()
+
+    try:
+        yield event
+
+    except BaseException:
+        event["outcome"] = 'error'
+        raise
+
+    finally:
+        observe(source, phase, time.monotonic() - started, event["outcome"])
+
+
+def snapshot() -> dict:
+    with _lock:
+        return {"histograms": [dict(h, source=s, phase=p) for (s, p), h in _histograms.items()],
+                "counters": [{"source": s, "phase": p, "outcome": o, "value": v}
+                             for (s, p, o), v in _counters.items()]}
+
+
+def merge(into: dict, entry: dict) -> None:
+    for h in entry["histograms"]:
+        merged = into["histograms"].setdefault((h["source"], h["phase"]),
+                                               {"buckets": [0] * len(BUCKETS), "sum": 0.0, "count": 0})
+        merged["buckets"] = [a + b for a, b in zip(merged["buckets"], h["buckets"])]
+        merged["sum"] += h["sum"]
+        merged["count"] += h["count"]
+
+    for c in entry["counters"]:
+        key = (c["source"], c["phase"], c["outcome"])
+        into["counters"][key] = into["counters"].get(key, 0) + c["value"]
+
+
+def save(path='./temp/metrics.jsonl') -> None:
+    """
+    append the metrics of this process to the metrics file and start
+    counting again, parallel workers hand their metrics over this way
+
+    Parameters
+    ----------
+    path: str
+        jsonl file of the metrics
+
+    Returns
+    -------
+
+    """
+    entry = snapshot()
+
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+    if entry["histograms"] or entry["counters"]:
+        with open(path, 'a') as file:
+            file.write(json.dumps(entry) + '\n')
+
+
+def collect(path='./temp/metrics.jsonl') -> dict:
+    """
+    metrics of this process and of every saved process
+
+    Parameters
+    ----------
+    path: str
+        jsonl file of the metrics
+
+    Returns
+    -------
+    histograms keyed by source and phase, counters keyed by source, phase
+    and outcome: dict
+
+    """
+    merged = {"histograms": {}, "counters": {}}
+
+    if os.path.isfile(path):
+        with open(path, 'r') as file:
+            for line in file:
+                try:
+                    merge(merged, json.loads(line))
+
+                except (ValueError, KeyError):
+                    continue
+
+    merge(merged, snapshot())
+
+    return merged
+
+
+def label(**labels) -> str:
+    escaped = {k: str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ') for k, v in labels.items()}
+
+    return ','.join(f'{k}="{v}"' for k, v in escaped.items())
+
+
+def to_prometheus(merged: dict) -> str:
+    """
+    metrics in the prometheus text exposition format
+
+    Parameters
+    ----------
+    merged: dict
+        result of collect
+
+    Returns
+    -------
+    text: str
+
+    """
+    lines = [f"# HELP {DURATION} seconds spent on requests, extraction, waits and sleeps",
+             f"# TYPE {DURATION} histogram"]
+
+    for (source, phase), h in sorted(merged["histograms"].items()):
+        for bound, value in zip(BUCKETS, h["buckets"]):
+            lines.append(f'{DURATION}_bucket{{{label(source=source, phase=phase, le=bound)}}} {value}')
+
+        lines.append(f'{DURATION}_bucket{{{label(source=source, phase=phase, le="+Inf")}}} {h["count"]}')
+        lines.append(f'{DURATION}_sum{{{label(source=source, phase=phase)}}} {round(h["sum"], 6)}')
+        lines.append(f'{DURATION}_count{{{label(source=source, phase=phase)}}} {h["count"]}')
+
+    lines += [f"# HELP {EVENTS} requests, extractions, waits and retries by outcome",
+              f"# TYPE {EVENTS} counter"]
+
+    for (source, phase, outcome), value in sorted(merged["counters"].items()):
+        lines.append(f'{EVENTS}{{{label(source=source, phase=phase, outcome=outcome)}}} {value}')
+
+    return '\n'.join(lines) + '\n'
+
+
+def quantile(h: dict, q: float):
+    """
+    estimate of a quantile from the histogram buckets, linear within the
+    bucket as prometheus histogram_quantile does
+    """
+    if not h["count"]:
+        return None
+
+    rank = q * h["count"]
+    lower, below = 0.0, 0
+
+    for bound, cumulative in zip(BUCKETS, h["buckets"]):
+        if cumulative >= rank:
+            inside = cumulative - below
+
+            return round(lower + (bound - lower) * ((rank - below) / inside if inside else 1.0), 4)
+
+        lower, below = bound, cumulative
+
+    return BUCKETS[-1]
+
+
+def summary(merged: dict) -> dict:
+    """
+    count, total and mean seconds, p50, p95 and outcomes of every source
+    and phase
+
+    Parameters
+    ----------
+    merged: dict
+        result of collect
+
+    Returns
+    -------
+    summary keyed by source and phase: dict
+
+    """
+    result = {}
+
+    for (source, phase), h in merged["histograms"].items():
+        result.setdefault(source, {})[phase] = {"count": h["count"],
+                                                "seconds": round(h["sum"], 3),
+                                                "mean": round(h["sum"] / h["count"], 4) if h["count"] else None,
+                                                "p50": quantile(h, 0.5),
+                                                "p95": quantile(h, 0.95),
+                                                "outcomes": {}}
+
+    for (source, phase, outcome), value in merged["counters"].items():
+        phases = result.setdefault(source, {})
+        phases.setdefault(phase, {"count": 0, "outcomes": {}})["outcomes"][outcome] = value
+
+        if (source, phase) not in merged["histograms"]:
+            phases[phase]["count"] += value
+
+    return result
+
+
+def export(textfile='./temp/metrics.prom', summary_file='./temp/metrics.json', path='./temp/metrics.jsonl') -> dict:
+    """
+    write the metrics of the run as a prometheus textfile and a json
+    summary, the files are replaced at once so a collector never reads
+    half a file. saved metrics of the workers are removed afterwards
+
+    Parameters
+    ----------
+    textfile: str
+        prometheus textfile, e.g. in the node exporter textfile directory
+
+    summary_file: str
+        json summary
+
+    path: str
+        jsonl file of the metrics saved by other processes
+
+    Returns
+    -------
+    summary: dict
+
+    """
+    merged = collect(path)
+    result = summary(merged)
+
+    for file, text in ((textfile, to_prometheus(merged)), (summary_file, json.dumps(result, indent=2))):
+        if file is None:
+            continue
+
+        with open(f"{file}.tmp", 'w') as out:
+            out.write(text)
+
+        os.replace(f"{file}.tmp", file)
+
+    if os.path.isfile(path):
+        os.remove(path)
+
+    return result
+
+
+def reset(path='./temp/metrics.jsonl') -> None:
+    """
+    forget metrics of this process and the ones left by an earlier run
+
+    Parameters
+    ----------
+    path: str
+        jsonl file of the metrics
+
+    Returns
+    -------
+
+    """
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+    if os.path.isfile(path):
+        os.remove(path)
@@ -0,0 +1,555 @@
+import os
+import traceback
+
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from src.incremental import plan_refresh, merge_details
+from src.journal import atomic_write_json
+from src.parallel import DetailJob, parallel_update_details
+from src.sinks import open_sink, read_records, stream_details
+from src.utils import ConfigurationError, read_json
+
+
+def read_json_if_exists(path: str) -> dict:
+    return read_json(path) if os.path.isfile(path) else {}
+
+
+def search_scrapper(name: str, config: dict, cache=None, sink=None):
+    """
+    search scrapper of a source
+
+    Parameters
+    ----------
+    name: str
+        name of the source, IEEE, ACM or SCIDIR
+
+    config: dict
+        full configuration
+
+    cache: ResponseCache
+        cache for search result pages
+
+    sink: RecordSink
+        destination of the search results when they are streamed
+
+    Returns
+    -------
+    scrapper: IEEE, ACM or ScienceDirect
+
+    """
+    options = config[name]
+    current_year = datetime.now().year
+
+    if name == 'IEEE':
+        from src.ieee import IEEE
+
+        return IEEE(options['search_term'], options.get('search_workers', 1), cache, sink)
+
+    elif name == 'ACM':
+        from src.acm import ACM
+
+        return ACM((current_year - 5), current_year, options['search_term'], cache, sink)
+
+    elif name == 'SCIDIR':
+        from src.scidirect import ScienceDirect
+
+        return ScienceDirect((current_year - 5), current_year, options['search_term'], cache, sink)
+
+    raise ConfigurationError(f"wrong scrapper {name}.")
+
+
+def search_source(name: str, config: dict, cache=None, sink=None) -> None:
+    """
+    run search scrapper of a source and dump links to its link file, or
+    write them to the sink as they are found
+
+    Parameters
+    ----------
+    name: str
+        name of the source, IEEE, ACM or SCIDIR
+
+    config: dict
+        full configuration
+
+    cache: ResponseCache
+        cache for search result pages
+
+    sink: RecordSink
+        destination of the search results when they are streamed
+
+    Returns
+    -------
+
+    """
+    scrapper = search_scrapper(name, config, cache, sink)
+
+    # get links to individual search results
+    scrapper.get_links_to_papers()
+
+    # dump links, paper scrapper reads them back from the file
+    if sink is None:
+        scrapper.to_json(config[name]['link_file_save_to'])
+
+
+def paper_options_for(name: str, config: dict) -> dict:
+    """
+    optional arguments of the paper scrapper of a source
+
+    Parameters
+    ----------
+    name: str
+        name of the source, IEEE, ACM or SCIDIR
+
+    config: dict
+        full configuration
+
+    Returns
+    -------
+    keyword arguments: dict
+
+    """
+    options = config[name]
+    paper_options = {'resume': options.get('resume', False)}
+
+    if name in ('ACM', 'SCIDIR'):
+        paper_options['http_first'] = options.get('http_first', False)
+
+    if name == 'IEEE':
+        paper_options['use_api'] = options.get('use_api', False)
+
+    return paper_options
+
+
+def worker_options_for(name: str, config: dict) -> dict:
+    """
+    arguments of the paper scrapper of a source for another process, which
+    builds its own cache, limiters, retry policy and waits from them
+
+    Parameters
+    ----------
+    name: str
+        name of the source, IEEE, ACM or SCIDIR
+
+    config: dict
+        full configuration
+
+    Returns
+    -------
+    keyword arguments: dict
+
+    """
+    paper_options = paper_options_for(name, config)
+
+    # worker processes open their own connection to the cache
+    if config.get('CACHE', False):
+        paper_options['cache'] = config['CACHE']
+
+    if config.get('RATE_LIMITS', False):
+        paper_options['rate_limits'] = config['RATE_LIMITS']
+
+    if config.get('RETRY', False):
+        paper_options['retry'] = config['RETRY']
+
+    if config.get('WAITS', False):
+        paper_options['waits'] = config['WAITS']
+
+    return paper_options
+
+
+def paper_class(name: str):
+    if name == 'IEEE':
+        from src.ieee import Paper
+
+    elif name == 'ACM':
+        from src.acm import Paper
+
+    else:
+        from src.scidirect import Paper
+
+    return Paper
+
+
+def stream_source(name: str, config: dict, pool=None, cache=None) -> None:
+    """
+    search and get details with records streamed through the link and
+    abstract files, no step keeps the whole result set in memory. with
+    jsonl output and resume, records already read into the abstract file
+    are skipped
+
+    Parameters
+    ----------
+    name: str
+        name of the source, IEEE, ACM or SCIDIR
+
+    config: dict
+        full configuration
+
+    pool: DriverPool
+        warm browsers shared between sources
+
+    cache: ResponseCache
+        cache for search result and publication pages
+
+    Returns
+    -------
+
+    """
+    options = config[name]
+    kind = options['stream']
+    link_file = options['link_file_save_to']
+    save_to = options['abs_file_save_to']
+
+    with open_sink(kind, link_file) as sink:
+        search_source(name, config, cache, sink)
+
+    # the abstract file is the checkpoint, no journal is needed. papers
+    # whose abstract could not be read are tried again
+    paper_options = paper_options_for(name, config)
+    resume = paper_options.pop('resume') and kind == 'jsonl' and os.path.isfile(save_to)
+    done = [key for key, value in read_records(save_to, kind) if isinstance(value.get('abs'), str)] if resume else []
+
+    paper = paper_class(name)({}, pool, cache=cache, checkpoint=False, **paper_options)
+
+    try:
+        with open_sink(kind, save_to, append=resume) as sink:
+            stream_details(paper, read_records(link_file, kind), sink, done)
+
+    finally:
+        if paper.driver is not None:
+            paper.close_driver()
+
+
+def detail_source(name: str,
+                  config: dict,
+                  pool=None,
+                  cache=None,
+                  link_file: str = None,
+                  save_to: str = None) -> None:
+    """
+    get abstract of the and every search results of a source
+
+    Parameters
+    ----------
+    name: str
+        name of the source, IEEE, ACM or SCIDIR
+
+    config: dict
+        full configuration
+
+    pool: DriverPool
+        warm browsers shared between sources
+
+    cache: ResponseCache
+        cache for publication pages
+
+    link_file: str
+        links to read, link_file_save_to of the source if not given
+
+    save_to: str
+        file to write results, abs_file_save_to of the source if not given
+
+    Returns
+    -------
+
+    """
+    options = config[name]
+    paper_options = paper_options_for(name, config)
+    link_file = link_file or options['link_file_save_to']
+    save_to = save_to or options['abs_file_save_to']
+
+    if config.get('PARALLEL', False):
+        parallel_update_details([DetailJob(name,
+                                           link_file,
+                                           save_to,
+                                           worker_options_for(name, config))],
+                                **config['PARALLEL'])
+        return
+
+    Paper = paper_class(name)
+    paper = Paper(link_file, pool, cache=cache, **paper_options)
+
+    if options['use_batches']:
+        paper.batch_update_details(options['batch_size'])
+
+    else:
+        paper.update_paper_details()
+
+    paper.to_json(save_to)
+
+
+def refresh_source(name: str, config: dict, previous_links: dict, pool=None, cache=None) -> None:
+    """
+    get details only for new or changed search results and merge them
+    into the results of the earlier run
+
+    Parameters
+    ----------
+    name: str
+        name of the source, IEEE, ACM or SCIDIR
+
+    config: dict
+        full configuration
+
+    previous_links: dict
+        link object of the earlier search
+
+    pool: DriverPool
+        warm browsers shared between sources
+
+    cache: ResponseCache
+        cache for publication pages
+
+    Returns
+    -------
+
+    """
+    options = config[name]
+    previous_abs = read_json_if_exists(options['abs_file_save_to'])
+    fresh = read_json(options['link_file_save_to'])
+    pending = plan_refresh(name, fresh, previous_links, previous_abs)
+    details = {}
+
+    print(f"{name}: {len(pending)} new or changed from {len(fresh)} search results")
+
+    if pending:
+        pending_links = f"{options['link_file_save_to']}.pending.json"
+        pending_abs = f"{options['abs_file_save_to']}.pending.json"
+
+        atomic_write_json(pending_links, pending)
+        detail_source(name, config, pool, cache, pending_links, pending_abs)
+        details = read_json(pending_abs)
+
+        os.remove(pending_links)
+        os.remove(pending_abs)
+
+    atomic_write_json(options['abs_file_save_to'], merge_details(name, previous_abs, fresh, details))
+
+
+def run_source(name: str, config: dict, pool=None, cache=None) -> None:
+    """
+    search and get details of the results of a single source
+
+    Parameters
+    ----------
+    name: str
+        name of the source, IEEE, ACM or SCIDIR
+
+    config: dict
+        full configuration
+
+    pool: DriverPool
+        warm browsers shared between sources
+
+    cache: ResponseCache
+        cache for search result and publication pages
+
+    Returns
+    -------
+
+    """
+    options = config[name]
+
+    if options.get('stream', False):
+        stream_source(name, config, pool, cache)
+
+    elif options.get('incremental', False):
+        # links of the earlier run are overwritten by the search
+        previous_links = read_json_if_exists(options['link_file_save_to'])
+        search_source(name, config, cache)
+        refresh_source(name, config, previous_links, pool, cache)
+
+    else:
+        search_source(name, config, cache)
+        detail_source(name, config, pool, cache)
+
+    if not config[name]['keep_link_file']:
+        os.remove(config[name]['link_file_save_to'])
+
+
+def check_output_paths(config: dict, sources: list) -> None:
+    """
+    make sure sources does not write into the same files, which is
+    required when they run at the same time
+
+    Parameters
+    ----------
+    config: dict
+        full configuration
+
+    sources: list
+        names of the sources to run
+
+    Returns
+    -------
+
+    """
+    seen = {}
+
+    for name in sources:
+        for key in ('link_file_save_to', 'abs_file_save_to'):
+            path = os.path.abspath(config[name][key])
+
+            if path in seen:
+                raise ConfigurationError(f"{name} {key} is already used by {seen[path]}.")
+
+            seen[path] = name
+
+
+def run_each(step, sources: list, concurrent: bool, errors: dict) -> None:
+    """
+    run a step for each source, a failed source is recorded in errors and
+    does not stop the others
+
+    Parameters
+    ----------
+    step: callable
+        takes the source name
+
+    sources: list
+        names of the sources
+
+    concurrent: bool
+        run sources at the same time
+
+    errors: dict
+        traceback of the failed sources, keyed by source name
+
+    Returns
+    -------
+
+    """
+    def run(name):
+        try:
+            step(name)
+
+        except Exception:
+            errors[name] = traceback.format_exc()
+
+    if concurrent and len(sources) > 1:
+        with ThreadPoolExecutor(max_workers=len(sources)) as executor:
+            list(executor.map(run, sources))
+
+    else:
+        for name in sources:
+            run(name)
+
+
+def run_deduplicated(config: dict, sources: list, concurrent: bool, pool, cache, errors: dict) -> None:
+    """
+    search every source first, then read details once per publication,
+    from the most preferred source it was found in. clusters of search
+    results which are the same publication are saved to a json file
+
+    Parameters
+    ----------
+    config: dict
+        full configuration, with DEDUP options
+
+    sources: list
+        names of the sources to run
+
+    concurrent: bool
+        run sources at the same time
+
+    pool: DriverPool
+        warm browsers shared between sources
+
+    cache: ResponseCache
+        cache for search result and publication pages
+
+    errors: dict
+        traceback of the failed sources, keyed by source name
+
+    Returns
+    -------
+
+    """
+    # numpy is only loaded for deduplicated runs
+    from src.dedup import deduplicate, DEFAULT_PREFERENCE
+
+    options = config['DEDUP'] if isinstance(config['DEDUP'], dict) else {}
+
+    run_each(lambda name: search_source(name, config, cache), sources, concurrent, errors)
+
+    searched = [name for name in sources if name not in errors]
+    links = {name: read_json(config[name]['link_file_save_to']) for name in searched}
+    unique, clusters = deduplicate(links,
+                                   options.get('prefer', DEFAULT_PREFERENCE),
+                                   options.get('threshold', 0.8),
+                                   options.get('num_perm', 64),
+                                   options.get('bands', 16))
+
+    atomic_write_json(options.get('save_to', './abs/clusters.json'), clusters)
+
+    for name in searched:
+        print(f"{name}: {len(unique[name])} unique from {len(links[name])} search results")
+
+    def details(name):
+        link_file = f"{config[name]['link_file_save_to']}.unique.json"
+        atomic_write_json(link_file, unique[name])
+
+        detail_source(name, config, pool, cache, link_file)
+        os.remove(link_file)
+
+        if not config[name]['keep_link_file']:
+            os.remove(config[name]['link_file_save_to'])
+
+    run_each(details, searched, concurrent, errors)
+
+
+def run_sources(config: dict, sources: list, concurrent: bool = False, pool=None, cache=None) -> dict:
+    """
+    run scrappers of the given sources, one after the other or all at the
+    same time. failure of a source does not stop the others
+
+    Parameters
+    ----------
+    config: dict
+        full configuration
+
+    sources: list
+        names of the sources to run
+
+    concurrent: bool
+        run sources at the same time
+
+    pool: DriverPool
+        warm browsers shared between sources
+
+    cache: ResponseCache
+        cache for search result and publication pages
+
+    Returns
+    -------
+    errors: dict
+        traceback of the failed sources, keyed by source name
+
+    """
+    check_output_paths(config, sources)
+    errors = {}
+
+    if config.get('DISTRIBUTED', False):
+        # details are read by workers which lease chunks of the link files
+        from src.distributed import run_distributed
+
+        run_distributed(config, sources, concurrent, cache, errors)
+
+    elif config.get('SCHEDULER', False):
+        # search and publication pages of every source share one work queue
+        from src.scheduler import run_scheduled
+
+        run_scheduled(config, sources, pool, cache, errors)
+
+    elif config.get('DEDUP', False):
+        run_deduplicated(config, sources, concurrent, pool, cache, errors)
+
+    else:
+        run_each(lambda name: run_source(name, config, pool, cache), sources, concurrent, errors)
+
+    for name in sources:
+        print(f"{name}: {'failed' if name in errors else 'done'}")
+
+        if name in errors:
+            print(errors[name])
+
+    return errors
@@ -0,0 +1,129 @@
+import os
+import json
+import threading
+
+# bytes of the page and everything it loaded, as reported by the browser
+TRANSFER_SIZE_SCRIPT = """
+const entries = performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'));
+return entries.reduce((total, entry) => total + (entry.transferSize || 0), 0);
+"""
+
+_totals = {}
+_lock = threading.Lock()
+
+
+def transfer_size(driver) -> int:
+    """
+    bytes downloaded for the current page, responses of other origins
+    which hide their timing count as zero
+
+    Parameters
+    ----------
+    driver: undetected_chromedriver.Chrome
+
+    Returns
+    -------
+    bytes: int
+
+    """
+    try:
+        return int(driver.execute_script(TRANSFER_SIZE_SCRIPT) or 0)
+
+    except Exception:
+        return 0
+
+
+def record(driver, profile: str, seconds: float) -> None:
+    """
+    count a page load against the browser profile
+
+    Parameters
+    ----------
+    driver: undetected_chromedriver.Chrome
+        browser which just loaded the page
+
+    profile: str
+        browser profile, default or lean
+
+    seconds: float
+        time the page load took
+
+    Returns
+    -------
+
+    """
+    size = transfer_size(driver)
+
+    with _lock:
+        totals = _totals.setdefault(profile, {"pages": 0, "bytes": 0, "seconds": 0.0})
+        totals["pages"] += 1
+        totals["bytes"] += size
+        totals["seconds"] += seconds
+
+
+def save(path='./temp/page_stats.jsonl') -> None:
+    """
+    append page load totals of this process to the stats file and start
+    counting again, so runs with different profiles can be compared
+
+    Parameters
+    ----------
+    path: str
+        jsonl file of the stats
+
+    Returns
+    -------
+
+    """
+    with _lock:
+        lines = [json.dumps(dict(totals, profile=profile)) + '\n' for profile, totals in _totals.items()]
+        _totals.clear()
+
+    if lines:
+        with open(path, 'a') as file:
+            file.writelines(lines)
+
+
+def report(path='./temp/page_stats.jsonl') -> dict:
+    """
+    average bytes and seconds per page of each profile over all saved
+    runs, and what the lean profile saves per page compared to the default
+
+    Parameters
+    ----------
+    path: str
+        jsonl file of the stats
+
+    Returns
+    -------
+    report: dict
+
+    """
+    totals = {}
+
+    if os.path.isfile(path):
+        with open(path, 'r') as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+
+                except ValueError:
+                    continue
+
+                summed = totals.setdefault(entry['profile'], {"pages": 0, "bytes": 0, "seconds": 0.0})
+
+                for field in summed:
+                    summed[field] += entry[field]
+
+    result = {profile: {"pages": t["pages"],
+                        "kb_per_page": round(t["bytes"] / t["pages"] / 1024, 1),
+                        "seconds_per_page": round(t["seconds"] / t["pages"], 3)}
+              for profile, t in totals.items() if t["pages"]}
+
+    if 'default' in result and 'lean' in result:
+        result["lean_saves"] = {
+            "kb_per_page": round(result['default']['kb_per_page'] - result['lean']['kb_per_page'], 1),
+            "seconds_per_page": round(result['default']['seconds_per_page'] - result['lean']['seconds_per_page'], 3)
+        }
+
+    return result
@@ -0,0 +1,255 @@
+import json
+import importlib
+import itertools
+import traceback
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from src.cache import open_cache
+from src import metrics, page_stats, rate_limit, retry, waits
+from src.journal import Journal, atomic_write_json
+
+# module of the paper scrapper and the host it reads from, for each source
+SOURCES = {
+    'IEEE': ('src.ieee', 'ieeexplore.ieee.org'),
+    'ACM': ('src.acm', 'dl.acm.org'),
+    'SCIDIR': ('src.scidirect', 'www.sciencedirect.com'),
+}
+
+
+def fetch_chunk(source: str, records: dict, paper_options: dict) -> dict:
+    """
+    update details of a chunk of publications in a worker process,
+    each worker runs its own browser
+
+    Parameters
+    ----------
+    source: str
+        name of the source, one of SOURCES
+
+    records: dict
+        part of the link object to update
+
+    paper_options: dict
+        extra arguments for the paper scrapper
+
+    Returns
+    -------
+    updated records: dict
+
+    """
+    module = importlib.import_module(SOURCES[source][0])
+
+    # cache configuration is sent instead of the cache, connections can not be shared
+    if 'cache' in paper_options:
+        paper_options = dict(paper_options, cache=open_cache(paper_options['cache']))
+
+    # limiters live in each process, start them from the configured rates
+    paper_options = dict(paper_options)
+    rate_limit.configure(paper_options.pop('rate_limits', None))
+    retry.configure(paper_options.pop('retry', None))
+    waits.configure(paper_options.pop('waits', None))
+
+    # checkpoints are kept by the job in the main process
+    paper = module.Paper(records, checkpoint=False, **paper_options)
+    paper.update_paper_details()
+    page_stats.save()
+    metrics.save()
+
+    return paper.link_object
+
+
+def split_records(records: dict, size: int) -> list:
+    """
+    split link object into chunks of given size
+
+    Parameters
+    ----------
+    records: dict
+        link object
+
+    size: int
+        number of records in a chunk
+
+    Returns
+    -------
+    chunks: list
+
+    """
+    items = iter(records.items())
+    chunks = []
+
+    while True:
+        chunk = dict(itertools.islice(items, size))
+
+        if not chunk:
+            return chunks
+
+        chunks.append(chunk)
+
+
+class DetailJob:
+    """
+    Parameters
+    ----------
+    source: str
+        name of the source, one of SOURCES
+
+    link_file: str
+        json file created by the search scrapper
+
+    save_to: str
+        json file to write updated records into
+
+    paper_options: dict
+        extra arguments for the paper scrapper, such as http_first. with
+        resume, publications finished by an earlier run are skipped
+
+    Attributes
+    ----------
+    records: dict
+        merged results of the job
+
+    journal: Journal
+        finished publications, appended as chunks complete
+
+    finished: set
+        keys of the finished publications
+
+    errors: list
+        tracebacks of chunks which failed, records of those
+        chunks are saved without details
+
+    """
+
+    def __init__(self, source, link_file, save_to, paper_options=None):
+        if source not in SOURCES:
+            raise KeyError(f"unknown source {source}")
+
+        self.source = source
+        self.link_file = link_file
+        self.save_to = save_to
+        self.paper_options = dict(paper_options or {})
+        self.errors = []
+        self.journal = Journal(f"{save_to}.journal.jsonl")
+        self.finished = set()
+
+        with open(link_file, "r") as file:
+            self.records = json.load(file)
+
+        if not self.paper_options.pop('resume', False):
+            self.journal.remove()
+            return
+
+        for key, value in self.journal.load().items():
+            if key in self.records:
+                self.records[key] = value
+                self.finished.add(key)
+
+    def pending(self) -> dict:
+        return {key: value for key, value in self.records.items() if key not in self.finished}
+
+    def merge(self, results: dict) -> None:
+        for key, value in results.items():
+            self.records[key] = value
+
+            # records without an abstract are read again by a resumed run
+            if isinstance(value.get("abs"), str):
+                self.finished.add(key)
+                self.journal.append(key, value)
+
+    @property
+    def host(self) -> str:
+        return SOURCES[self.source][1]
+
+    def to_json(self) -> None:
+        atomic_write_json(self.save_to, self.records)
+        self.journal.remove()
+
+
+def parallel_update_details(jobs: list,
+                            workers: int = 4,
+                            host_limits: dict = None,
+                            chunk_size: int = 50) -> list:
+    """
+    update details of publications with a pool of worker processes and
+    write results of each job into one json file
+
+    Parameters
+    ----------
+    jobs: list
+        list of DetailJob
+
+    workers: int
+        number of worker processes
+
+    host_limits: dict
+        maximum number of workers can work on a single source at once,
+        keyed by source name. sources not in it can use all workers
+
+    chunk_size: int
+        number of publications a worker handle in one go
+
+    Returns
+    -------
+    jobs: list
+
+    """
+    host_limits = host_limits or {}
+    pending = {}
+    running = {}
+
+    for job in jobs:
+        chunks = pending.setdefault(job.host, deque())
+        chunks.extend((job, chunk) for chunk in split_records(job.pending(), chunk_size))
+        running.setdefault(job.host, 0)
+
+    limits = {job.host: host_limits.get(job.source, workers) for job in jobs}
+    hosts = itertools.cycle(list(pending))
+    in_flight = {}
+
+    def next_chunk():
+        # round robin over hosts which have work and a free slot
+        for _ in range(len(pending)):
+            host = next(hosts)
+
+            if pending[host] and running[host] < limits[host]:
+                running[host] += 1
+                return host, pending[host].popleft()
+
+        return None
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while True:
+            while len(in_flight) < workers:
+                task = next_chunk()
+
+                if task is None:
+                    break
+
+                host, (job, chunk) = task
+                future = executor.submit(fetch_chunk, job.source, chunk, job.paper_options)
+                in_flight[future] = (host, job)
+
+            if not in_flight:
+                break
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                host, job = in_flight.pop(future)
+                running[host] -= 1
+
+                try:
+                    job.merge(future.result())
+
+                except Exception:
+                    job.errors.append(traceback.format_exc())
+
+    for job in jobs:
+        if job.errors:
+            print(f"{job.source}: {len(job.errors)} chunks failed, saved without details")
+
+        job.to_json()
+
+    return jobs
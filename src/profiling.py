@@ -0,0 +1,348 @@
+import os
+import sys
+import time
+import json
+import pstats
+import cProfile
+import importlib
+import threading
+import tracemalloc
+
+from contextlib import contextmanager
+
+# methods and functions timed as spans while profiling, the label is
+# formatted with the first argument when it is a source name
+TARGETS = (
+    ('src.orchestrator', 'search_source', 'search {0}'),
+    ('src.orchestrator', 'detail_source', 'details {0}'),
+    ('src.orchestrator', 'stream_source', 'stream {0}'),
+    ('src.orchestrator', 'refresh_source', 'refresh {0}'),
+    ('src.ieee', 'IEEE.fetch_page', 'search page'),
+    ('src.ieee', 'IEEE.to_json', 'json dump'),
+    ('src.ieee', 'Paper.init_driver', 'init_driver'),
+    ('src.ieee', 'Paper.request_paper', 'request_paper'),
+    ('src.ieee', 'Paper.api_details', 'api_details'),
+    ('src.ieee', 'Paper.click_kw_section', 'keywords section'),
+    ('src.ieee', 'Paper.to_json', 'json dump'),
+    ('src.ieee', 'hide_automation', 'stealth'),
+    ('src.acm', 'ACM.init_driver', 'init_driver'),
+    ('src.acm', 'ACM.post_request', 'search page'),
+    ('src.acm', 'ACM.mine_links', 'mine_links'),
+    ('src.acm', 'ACM.to_json', 'json dump'),
+    ('src.acm', 'Paper.init_driver', 'init_driver'),
+    ('src.acm', 'Paper.request_paper', 'request_paper'),
+    ('src.acm', 'Paper.to_json', 'json dump'),
+    ('src.acm', 'hide_automation', 'stealth'),
+    ('src.scidirect', 'ScienceDirect.init_driver', 'init_driver'),
+    ('src.scidirect', 'ScienceDirect.post_request', 'search page'),
+    ('src.scidirect', 'ScienceDirect.mine_links', 'mine_links'),
+    ('src.scidirect', 'ScienceDirect.to_json', 'json dump'),
+    ('src.scidirect', 'Paper.init_driver', 'init_driver'),
+    ('src.scidirect', 'Paper.request_paper', 'request_paper'),
+    ('src.scidirect', 'Paper.to_json', 'json dump'),
+    ('src.scidirect', 'hide_automation', 'stealth'),
+    ('src.scheduler', 'ScheduledSource.search_page', 'search page'),
+    ('src.scheduler', 'ScheduledSource.detail', 'scheduled details'),
+    ('src.fast_fetch', 'HttpFetcher.fetch', 'http fetch'),
+    ('src.fast_fetch', 'HttpFetcher.fetch_json', 'http fetch'),
+    ('src.waits', 'PageWaits.until', 'element wait'),
+    ('src.journal', 'atomic_write_json', 'json dump'),
+    ('src.columnar', 'write_parquet', 'parquet'),
+    ('src.index', 'build_index', 'index'),
+    ('src.screening', 'screen', 'screening'),
+    ('selenium.webdriver.remote.webdriver', 'WebDriver.get', 'driver.get'),
+    ('selenium.webdriver.remote.webdriver', 'WebDriver.find_element', 'element lookup'),
+    ('selenium.webdriver.remote.webdriver', 'WebDriver.find_elements', 'element lookup'),
+    ('undetected_chromedriver', 'Chrome.get', 'driver.get'),
+    ('time', 'sleep', 'sleep'),
+)
+
+_local = threading.local()
+_lock = threading.Lock()
+_spans = {}
+_patched = []
+_state = {"enabled": False, "cpu": None, "memory": False, "sampler": None, "save_to": None, "started": None}
+
+
+@contextmanager
+def span(name: str):
+    """
+    time the block as a phase nested in the spans around it, does nothing
+    unless profiling is started
+
+    Parameters
+    ----------
+    name: str
+        name of the phase
+
+    Returns
+    -------
+
+    """
+    if not _state["enabled"]:
+        yield
+        return
+
+    stack = getattr(_local, 'stack', None)
+
+    if stack is None:
+        stack = _local.stack = [threading.current_thread().name]
+
+    stack.append(name)
+    path = tuple(stack)
+    wall, cpu = time.perf_counter(), time.thread_time()
+
+    try:
+        yield
+
+    finally:
+        wall, cpu = time.perf_counter() - wall, time.thread_time() - cpu
+        stack.pop()
+
+        with _lock:
+            totals = _spans.setdefault(path, [0, 0.0, 0.0])
+            totals[0] += 1
+            totals[1] += wall
+            totals[2] += cpu
+
+
+def spanned(function, label: str):
+    """
+    wrap a function so every call is a span
+    """
+    def wrapper(*args, **kwargs):
+        # methods get the instance first, the source name comes after it
+        names = [a for a in args[:2] if isinstance(a, str)]
+
+        with span(label.format(names[0] if names else '')):
+            return function(*args, **kwargs)
+
+    wrapper.__wrapped__ = function
+
+    return wrapper
+
+
+def instrument() -> None:
+    """
+    wrap the TARGETS which can be imported, missing ones are skipped
+    """
+    for module_name, attribute, label in TARGETS:
+        try:
+            owner = importlib.import_module(module_name)
+
+        except ImportError:
+            continue
+
+        *parents, name = attribute.split('.')
+
+        for parent in parents:
+            owner = getattr(owner, parent, None)
+
+        # only functions defined on the owner, inherited ones are wrapped on their base
+        if owner is None or name not in vars(owner):
+            continue
+
+        original = vars(owner)[name]
+
+        if isinstance(original, (staticmethod, classmethod)) or not callable(original):
+            continue
+
+        setattr(owner, name, spanned(original, label))
+        _patched.append((owner, name, original))
+
+
+def restore() -> None:
+    while _patched:
+        owner, name, original = _patched.pop()
+        setattr(owner, name, original)
+
+
+class StackSampler(threading.Thread):
+    """
+    Parameters
+    ----------
+    interval: float
+        seconds between two samples of the python stacks of every thread
+
+    Attributes
+    ----------
+    stacks: dict
+        number of samples of each stack, frames joined with ;
+
+    Methods
+    -------
+    run:
+        sample until stopped
+
+    stop:
+        end sampling
+    """
+
+    def __init__(self, interval=0.005):
+        super().__init__(name='stack-sampler', daemon=True)
+        self.interval = interval
+        self.stacks = {}
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        names = {}
+
+        while not self.stopped.wait(self.interval):
+            for thread in threading.enumerate():
+                names[thread.ident] = thread.name
+
+            for ident, frame in sys._current_frames().items():
+                if ident == self.ident:
+                    continue
+
+                frames = []
+
+                while frame is not None:
+                    code = frame.f_code
+                    frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+
+                stack = ';'.join([names.get(ident, str(ident))] + frames[::-1])
+                self.stacks[stack] = self.stacks.get(stack, 0) + 1
+
+    def stop(self) -> None:
+        self.stopped.set()
+        self.join()
+
+
+def start(cpu=False, memory=False, save_to='./temp/profile', interval=0.005) -> None:
+    """
+    start profiling the run, phases are timed as spans and the python
+    stacks are sampled
+
+    Parameters
+    ----------
+    cpu: bool
+        also run cProfile, which slows down python code
+
+    memory: bool
+        also trace allocations with tracemalloc, which slows down more
+
+    save_to: str
+        folder of the profile files
+
+    interval: float
+        seconds between stack samples
+
+    Returns
+    -------
+
+    """
+    with _lock:
+        _spans.clear()
+
+    _state.update(enabled=True, memory=memory, save_to=save_to, started=time.perf_counter())
+    instrument()
+
+    if memory:
+        tracemalloc.start(25)
+
+    if cpu:
+        _state["cpu"] = cProfile.Profile()
+        _state["cpu"].enable()
+
+    _state["sampler"] = StackSampler(interval)
+    _state["sampler"].start()
+
+
+def breakdown() -> list:
+    """
+    count, total, self and cpu seconds of every span path, largest self
+    time first
+
+    Returns
+    -------
+    phases: list
+
+    """
+    with _lock:
+        spans = {path: list(totals) for path, totals in _spans.items()}
+
+    children = {}
+
+    for path, totals in spans.items():
+        children[path[:-1]] = children.get(path[:-1], 0.0) + totals[1]
+
+    total = (time.perf_counter() - _state["started"]) if _state["started"] else 0.0
+    phases = [{"path": ';'.join(path),
+               "count": count,
+               "seconds": round(wall, 4),
+               "self_seconds": round(max(0.0, wall - children.get(path, 0.0)), 4),
+               "cpu_seconds": round(cpu, 4),
+               "share": round(wall / total, 4) if total else None}
+              for path, (count, wall, cpu) in spans.items()]
+
+    return sorted(phases, key=lambda p: p["self_seconds"], reverse=True)
+
+
+def write_folded(path: str, stacks: dict) -> None:
+    with open(path, 'w') as file:
+        for stack, value in sorted(stacks.items()):
+            if value > 0:
+                file.write(f"{stack} {value}\n")
+
+
+def stop() -> list:
+    """
+    stop profiling and write the profile files into the save_to folder
+
+    - spans.json, per phase breakdown
+    - spans.folded, self time of the span stacks in microseconds
+    - stacks.folded, sampled python stacks
+    - cpu.pstats and cpu.txt, with cpu profiling
+    - memory.txt, largest allocation sites, with memory profiling
+
+    the folded files are the input of flamegraph.pl, speedscope or inferno
+
+    Returns
+    -------
+    phases, largest self time first: list
+
+    """
+    if not _state["enabled"]:
+        return []
+
+    save_to = _state["save_to"]
+    os.makedirs(save_to, exist_ok=True)
+
+    _state["sampler"].stop()
+
+    if _state["cpu"] is not None:
+        _state["cpu"].disable()
+        _state["cpu"].dump_stats(os.path.join(save_to, 'cpu.pstats'))
+
+        with open(os.path.join(save_to, 'cpu.txt'), 'w') as file:
+            pstats.Stats(_state["cpu"], stream=file).sort_stats('cumulative').print_stats(50)
+
+    if _state["memory"]:
+        current, peak = tracemalloc.get_traced_memory()
+        top = tracemalloc.take_snapshot().statistics('traceback')[:30]
+        tracemalloc.stop()
+
+        with open(os.path.join(save_to, 'memory.txt'), 'w') as file:
+            file.write(f"current {current / 2 ** 20:.1f} MiB, peak {peak / 2 ** 20:.1f} MiB\n\n")
+
+            for stat in top:
+                file.write(f"{stat.size / 2 ** 10:.1f} KiB in {stat.count} blocks\n")
+                file.write('\n'.join(f"    {line}" for line in stat.traceback.format()) + '\n')
+
+    _state["enabled"] = False
+    restore()
+
+    phases = breakdown()
+
+    with open(os.path.join(save_to, 'spans.json'), 'w') as file:
+        json.dump(phases, file, indent=2)
+
+    write_folded(os.path.join(save_to, 'spans.folded'),
+                 {p["path"]: int(p["self_seconds"] * 1e6) for p in phases})
+    write_folded(os.path.join(save_to, 'stacks.folded'), _state["sampler"].stacks)
+
+    _state.update(cpu=None, sampler=None, started=None)
+
+    return phases
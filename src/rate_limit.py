@@ -0,0 +1,292 @@
+import time
+import random
+import threading
+
+from urllib.parse import urlsplit
+from src import metrics
+
+# words in the page title of block, captcha and throttling pages
+BLOCK_PAGE_MARKERS = ('access denied', 'just a moment', 'captcha', 'are you a robot',
+                      'too many requests', 'service unavailable', 'request rejected')
+
+# status codes a host answers with when it wants us to slow down
+THROTTLE_STATUS = (403, 429, 503)
+
+# json apis paced apart from the pages of their host, keyed by host and path prefix
+API_PATHS = {
+    'ieeexplore.ieee.org': '/rest/',
+}
+
+# the browser scraped pages keep the conservative HostRateLimiter defaults,
+# the json api was not paced at all before and takes concurrent requests
+DEFAULTS = {
+    'ieeexplore.ieee.org/rest/': {"rate": 10.0, "min_rate": 0.5, "max_rate": 20.0, "burst": 4, "jitter": 0.0},
+}
+
+
+class HostRateLimiter:
+    """
+    Parameters
+    ----------
+    host: str
+        host name the limiter paces requests for
+
+    rate: float
+        starting number of requests per second
+
+    min_rate: float
+        rate never goes below this
+
+    max_rate: float
+        rate never goes above this
+
+    increase: float
+        requests per second added after each healthy response
+
+    decrease: float
+        rate is multiplied by this when the host throttles us
+
+    jitter: float
+        random extra wait as a fraction of the request interval, so
+        requests do not arrive like clockwork
+
+    burst: int
+        requests can be send back to back after an idle time, e.g. by
+        concurrent workers
+
+    Attributes
+    ----------
+    tokens: float
+        requests can be send without waiting
+
+    waited: float
+        total seconds spent waiting for this host
+
+    Methods
+    -------
+    wait:
+        block until a request can be send to the host
+
+    ready_in:
+        seconds until a request can be send without waiting
+
+    success:
+        speed up after a healthy response
+
+    throttled:
+        back off after a throttling response or block page
+
+    feedback:
+        speed up or back off from a response status code
+
+    """
+
+    def __init__(self,
+                 host,
+                 rate=0.5,
+                 min_rate=0.05,
+                 max_rate=2.0,
+                 increase=0.02,
+                 decrease=0.5,
+                 jitter=0.2,
+                 burst=1):
+        self.host = host
+        self.current = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.jitter = jitter
+        self.burst = burst
+        self.tokens = float(burst)
+        self.waited = 0.0
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        return self.current
+
+    def refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(float(self.burst), self.tokens + (now - self.updated) * self.current)
+        self.updated = now
+
+    def wait(self) -> float:
+        """
+        block until a request can be send to the host
+
+        Returns
+        -------
+        seconds waited: float
+
+        """
+        with self.lock:
+            self.refill()
+            self.tokens -= 1.0
+            delay = -self.tokens / self.current if self.tokens < 0 else 0.0
+            delay += random.uniform(0, self.jitter / self.current)
+            self.waited += delay
+
+        if delay > 0:
+            time.sleep(delay)
+
+        metrics.observe(metrics.source_of(self.host), 'sleep', delay)
+
+        return delay
+
+    def ready_in(self) -> float:
+        """
+        seconds until a request can be send without waiting, no turn is
+        taken so a scheduler can look before it hands out work
+
+        Returns
+        -------
+        seconds: float
+
+        """
+        with self.lock:
+            self.refill()
+
+            return (1.0 - self.tokens) / self.current if self.tokens < 1.0 else 0.0
+
+    def success(self) -> None:
+        with self.lock:
+            self.current = min(self.max_rate, self.current + self.increase)
+
+    def throttled(self) -> None:
+        with self.lock:
+            self.current = max(self.min_rate, self.current * self.decrease)
+            # requests already granted should not go out at the old rate
+            self.tokens = min(self.tokens, 0.0)
+
+    def feedback(self, status_code=200, blocked=False) -> None:
+        """
+        speed up or back off from a response
+
+        Parameters
+        ----------
+        status_code: int
+            http status code of the response
+
+        blocked: bool
+            response was a block or captcha page
+
+        Returns
+        -------
+
+        """
+        if blocked or status_code in THROTTLE_STATUS:
+            self.throttled()
+
+        elif status_code < 400:
+            self.success()
+
+
+_limiters = {}
+_settings = {}
+_lock = threading.Lock()
+
+
+def configure(settings: dict) -> None:
+    """
+    set starting rate and bounds of hosts, limiters already created
+    are not changed
+
+    Parameters
+    ----------
+    settings: dict
+        keyword arguments of HostRateLimiter keyed by host name, or host
+        and path prefix for the API_PATHS, they replace the DEFAULTS
+
+    Returns
+    -------
+
+    """
+    with _lock:
+        _settings.update(settings or {})
+
+
+def limiter_key(url: str) -> str:
+    """
+    host of a URL, with the path prefix for requests to one of the
+    API_PATHS
+
+    Parameters
+    ----------
+    url: str
+        URL or host name
+
+    Returns
+    -------
+    key: str
+
+    """
+    if '//' not in url:
+        return url
+
+    parts = urlsplit(url)
+    prefix = API_PATHS.get(parts.netloc)
+
+    if prefix is not None and parts.path.startswith(prefix):
+        return f"{parts.netloc}{prefix}"
+
+    return parts.netloc
+
+
+def limiter_for(url: str) -> HostRateLimiter:
+    """
+    get the shared limiter of the host of a URL, json api requests of a
+    host have a limiter of their own
+
+    Parameters
+    ----------
+    url: str
+        URL or host name
+
+    Returns
+    -------
+    limiter: HostRateLimiter
+
+    """
+    key = limiter_key(url)
+
+    with _lock:
+        if key not in _limiters:
+            _limiters[key] = HostRateLimiter(key, **_settings.get(key, DEFAULTS.get(key, {})))
+
+        return _limiters[key]
+
+
+def current_rates() -> dict:
+    """
+    current requests per second of every host
+
+    Returns
+    -------
+    rates: dict
+
+    """
+    with _lock:
+        return {host: round(limiter.rate, 3) for host, limiter in _limiters.items()}
+
+
+def is_block_page(driver) -> bool:
+    """
+    check weather the browser landed on a block, captcha or throttling page
+
+    Parameters
+    ----------
+    driver: undetected_chromedriver.Chrome
+
+    Returns
+    -------
+
+    """
+    try:
+        title = (driver.title or '').lower()
+
+    except Exception:
+        return False
+
+    return any(marker in title for marker in BLOCK_PAGE_MARKERS)
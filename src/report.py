@@ -0,0 +1,157 @@
+import math
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.styles import Font
+from src.sinks import read_records
+
+# columns which come first when a sheet has them, the rest follow in
+# the order they are found
+PREFERRED_COLUMNS = ('title', 'link', 'date', 'type_', 'abstract', 'abs', 'kws')
+
+# IEEE Xplore links are relative to the site
+IEEE_ORIGIN = "https://ieeexplore.ieee.org"
+
+# longest text an excel cell can hold
+MAX_CELL_LENGTH = 32767
+
+
+def cell_value(value):
+    """
+    convert a record field to something excel can store, keyword lists
+    are joined and text is cleaned and cut to the cell limit
+
+    Parameters
+    ----------
+    value: object
+        field of a record
+
+    Returns
+    -------
+    cell value
+
+    """
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+
+    if isinstance(value, (list, tuple)):
+        value = '; '.join(str(v) for v in value)
+
+    if isinstance(value, str):
+        return ILLEGAL_CHARACTERS_RE.sub('', value)[:MAX_CELL_LENGTH]
+
+    if isinstance(value, (int, float, bool)):
+        return value
+
+    return str(value)
+
+
+def sheet_columns(records) -> list:
+    """
+    find the columns of a sheet, fields of every record in a stable order
+
+    Parameters
+    ----------
+    records: iterable
+        key and record tuples
+
+    Returns
+    -------
+    columns: list
+
+    """
+    found = {}
+
+    for _, record in records:
+        for field in record:
+            found.setdefault(field, None)
+
+    return [c for c in PREFERRED_COLUMNS if c in found] + [c for c in found if c not in PREFERRED_COLUMNS]
+
+
+def link_cell(sheet, link: str, font: Font) -> WriteOnlyCell:
+    url = f"{IEEE_ORIGIN}{link}" if link.startswith('/') else link
+    cell = WriteOnlyCell(sheet, value=cell_value(link))
+    cell.hyperlink = url
+    cell.font = font
+
+    return cell
+
+
+def write_workbook(sheets: dict, path: str, hyperlink=False) -> dict:
+    """
+    write records into an excel workbook one row at a time, with
+    openpyxl write only mode memory does not grow with the rows
+
+    Parameters
+    ----------
+    sheets: dict
+        callable returning key and record tuples keyed by sheet name, it
+        is called twice, once to find the columns and once to write
+
+    path: str
+        excel file
+
+    hyperlink: bool
+        make link cells clickable
+
+    Returns
+    -------
+    number of rows written to each sheet: dict
+
+    """
+    workbook = Workbook(write_only=True)
+    font = Font(color='0563C1', underline='single')
+    written = {}
+
+    for name, records in sheets.items():
+        columns = sheet_columns(records())
+        sheet = workbook.create_sheet(title=str(name)[:31])
+        sheet.append(['key'] + columns)
+        written[name] = 0
+
+        for key, record in records():
+            row = [cell_value(key)]
+
+            for column in columns:
+                value = record.get(column)
+
+                if hyperlink and column == 'link' and isinstance(value, str) and value:
+                    row.append(link_cell(sheet, value, font))
+
+                else:
+                    row.append(cell_value(value))
+
+            sheet.append(row)
+            written[name] += 1
+
+    workbook.save(path)
+
+    return written
+
+
+def write_report(sheets: dict, path='./SLR.xlsx', hyperlink=False) -> dict:
+    """
+    write result files into an excel workbook with a sheet per file, the
+    files are read record by record
+
+    Parameters
+    ----------
+    sheets: dict
+        json or jsonl result file keyed by sheet name
+
+    path: str
+        excel file
+
+    hyperlink: bool
+        make link cells clickable
+
+    Returns
+    -------
+    number of rows written to each sheet: dict
+
+    """
+    return write_workbook({name: (lambda file=file: read_records(file)) for name, file in sheets.items()},
+                          path,
+                          hyperlink)
@@ -0,0 +1,293 @@
+import time
+import random
+import threading
+
+from urllib.parse import urlsplit
+from src import metrics
+
+
+class RetryError(Exception):
+    """
+    raise when a request still fails after all attempts or the retry
+    budget is spent
+    """
+
+    def __init__(self, host, attempts, last=None):
+        super().__init__(f"{host} failed after {attempts} attempts, last result: {last!r}")
+        self.host = host
+        self.attempts = attempts
+        self.last = last
+
+
+class CircuitOpenError(RetryError):
+    """
+    raise when the host keeps failing and its circuit stays open longer
+    than the retry budget
+    """
+
+
+class CircuitBreaker:
+    """
+    Parameters
+    ----------
+    host: str
+        host name the breaker watches
+
+    failure_threshold: int
+        consecutive failures after which the circuit opens
+
+    reset_after: float
+        seconds the circuit stays open before a trial request is let through
+
+    Attributes
+    ----------
+    state: str
+        closed, open or half_open
+
+    failures: int
+        consecutive failures
+
+    Methods
+    -------
+    remaining:
+        seconds until a request may go to the host
+
+    record_success:
+        close the circuit
+
+    record_failure:
+        count a failure, open the circuit above the threshold
+
+    """
+
+    def __init__(self, host, failure_threshold=5, reset_after=60.0):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.state = 'closed'
+        self.failures = 0
+        self.opened = 0.0
+        self.lock = threading.Lock()
+
+    def remaining(self) -> float:
+        """
+        seconds until a request may go to the host, an open circuit turns
+        half open once reset_after is over
+
+        Returns
+        -------
+        seconds: float
+
+        """
+        with self.lock:
+            if self.state != 'open':
+                return 0.0
+
+            left = self.opened + self.reset_after - time.monotonic()
+
+            if left <= 0:
+                self.state = 'half_open'
+                return 0.0
+
+            return left
+
+    def record_success(self) -> None:
+        with self.lock:
+            self.state = 'closed'
+            self.failures = 0
+
+    def record_failure(self) -> None:
+        with self.lock:
+            self.failures += 1
+
+            # a failed trial opens the circuit again right away
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                if self.state != 'open':
+                    print(f"{self.host} keeps failing, pausing for {self.reset_after}s")
+
+                self.state = 'open'
+                self.opened = time.monotonic()
+
+
+class RetryPolicy:
+    """
+    Parameters
+    ----------
+    attempts: int
+        maximum number of attempts, the first one included
+
+    base_delay: float
+        delay before the first retry, doubled on every retry
+
+    max_delay: float
+        a single delay never goes above this
+
+    budget: float
+        seconds one call may spend on attempts and delays, no retry is made
+        once the next delay would go past it
+
+    retry_on: tuple
+        exception types counted as failed attempts, others are raised
+
+    Methods
+    -------
+    delay:
+        backoff before a retry
+
+    run:
+        call a function until it succeeds
+    """
+
+    def __init__(self,
+                 attempts=5,
+                 base_delay=1.0,
+                 max_delay=30.0,
+                 budget=120.0,
+                 retry_on=(Exception,)):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+        self.retry_on = retry_on
+
+    def delay(self, retry: int) -> float:
+        """
+        capped exponential backoff with full jitter
+
+        Parameters
+        ----------
+        retry: int
+            number of the retry, starting from 0
+
+        Returns
+        -------
+        seconds: float
+
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** retry))
+
+    def run(self, func, url: str, failed=None, on_failure=None):
+        """
+        call a function until it succeeds, the attempts count for the
+        circuit breaker of the host of the URL
+
+        Parameters
+        ----------
+        func: callable
+            makes a single attempt, takes no arguments
+
+        url: str
+            URL or host name the attempt goes to
+
+        failed: callable
+            takes the result of an attempt and tells weather it failed
+
+        on_failure: callable
+            takes the exception (or None for a failed result), called
+            before the next attempt e.g. to restart the browser
+
+        Returns
+        -------
+        result of the successful attempt
+
+        """
+        breaker = breaker_for(url)
+        source = metrics.source_of(url)
+        started = time.monotonic()
+        last = None
+
+        for attempt in range(self.attempts):
+            # a paused host is waited out while the budget allows it
+            paused = breaker.remaining()
+
+            if paused > 0:
+                if time.monotonic() - started + paused > self.budget:
+                    metrics.count(source, 'retry', 'circuit_open')
+                    raise CircuitOpenError(breaker.host, attempt, last)
+
+                time.sleep(paused)
+
+            error = None
+
+            try:
+                last = func()
+
+            except self.retry_on as e:
+                error = last = e
+
+            if error is None and (failed is None or not failed(last)):
+                breaker.record_success()
+                return last
+
+            breaker.record_failure()
+
+            if attempt + 1 == self.attempts:
+                break
+
+            delay = self.delay(attempt)
+
+            if time.monotonic() - started + delay > self.budget:
+                break
+
+            if on_failure is not None:
+                on_failure(error)
+
+            metrics.count(source, 'retry', 'retried')
+            time.sleep(delay)
+
+        metrics.count(source, 'retry', 'gave_up')
+        raise RetryError(breaker.host, attempt + 1, last)
+
+
+_breakers = {}
+_settings = {}
+_lock = threading.Lock()
+
+
+def configure(options: dict) -> None:
+    """
+    set retry and circuit breaker options from the RETRY configuration,
+    breakers already created are not changed
+
+    Parameters
+    ----------
+    options: dict
+        attempts, base_delay, max_delay, budget, failure_threshold and
+        reset_after
+
+    Returns
+    -------
+
+    """
+    with _lock:
+        _settings.update(options or {})
+
+
+def default_policy() -> RetryPolicy:
+    keys = ('attempts', 'base_delay', 'max_delay', 'budget')
+
+    return RetryPolicy(**{k: v for k, v in _settings.items() if k in keys})
+
+
+def breaker_for(url: str) -> CircuitBreaker:
+    """
+    get the shared circuit breaker of the host of a URL
+
+    Parameters
+    ----------
+    url: str
+        URL or host name
+
+    Returns
+    -------
+    breaker: CircuitBreaker
+
+    """
+    host = urlsplit(url).netloc if '//' in url else url
+    keys = ('failure_threshold', 'reset_after')
+
+    with _lock:
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker(host, **{k: v for k, v in _settings.items() if k in keys})
+
+        return _breakers[host]
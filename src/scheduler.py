@@ -0,0 +1,568 @@
+import os
+import time
+import heapq
+import itertools
+import threading
+import traceback
+
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
+from src import metrics
+from src.journal import Journal, atomic_write_json
+from src.rate_limit import limiter_for
+from src.retry import breaker_for, default_policy
+from src.orchestrator import search_scrapper, paper_class, paper_options_for
+
+# task kinds, smaller ones are handed out first
+SEARCH = 0
+DETAIL = 1
+
+
+class Task:
+    """
+    Parameters
+    ----------
+    run: callable
+        does the work, takes no arguments
+
+    source: str
+        name of the source, host_limits are keyed by it
+
+    url: str
+        URL or host name the task sends requests to
+
+    kind: int
+        SEARCH or DETAIL
+
+    query: str
+        queries share workers fairly, the source name if not given
+
+    done: callable
+        called once the task succeeded (with None) or gave up (with the
+        traceback), may submit more tasks
+
+    Attributes
+    ----------
+    host: str
+        host name of the url, tasks of a host share its limit
+
+    attempts: int
+        attempts made so far
+
+    not_before: float
+        monotonic time a retried task may run again
+
+    """
+
+    def __init__(self, run, source, url, kind=DETAIL, query=None, done=None):
+        self.run = run
+        self.source = source
+        self.url = url
+        self.host = urlsplit(url).netloc if '//' in url else url
+        self.kind = kind
+        self.query = query or source
+        self.done = done
+        self.attempts = 0
+        self.not_before = 0.0
+
+
+class Scheduler:
+    """
+    Parameters
+    ----------
+    workers: int
+        number of tasks running at once, over all hosts
+
+    host_limits: dict
+        maximum number of tasks of a source running at once, keyed by
+        source name. sources not in it can use all workers
+
+    policy: RetryPolicy
+        attempts of a task and the backoff before a retry, the RETRY
+        configuration if not given
+
+    Attributes
+    ----------
+    queues: dict
+        heap of waiting tasks of every host
+
+    running: dict
+        number of running tasks of every host
+
+    stats: dict
+        finished, retried and failed tasks of every source
+
+    Methods
+    -------
+    submit:
+        add a task to the queue
+
+    next_task:
+        take the best task which can run now
+
+    run:
+        run tasks until the queue is empty
+
+    Notes
+    -----
+    waiting tasks are ordered by kind (search pages first), then new
+    tasks before retried ones, then by a start tag of their query. each
+    query's tags go up by one per task, starting from the tag of the last
+    task handed out, so queries with many tasks take turns with the
+    others instead of going first. a host is skipped while it is at its
+    limit, its circuit is open or its rate limiter has no turn left, so
+    workers go to other hosts instead of sleeping
+    """
+
+    def __init__(self, workers=4, host_limits=None, policy=None):
+        self.workers = max(1, workers)
+        self.host_limits = host_limits or {}
+        self.policy = policy or default_policy()
+        self.queues = {}
+        self.running = {}
+        self.limits = {}
+        self.tags = {}
+        self.clock = 0
+        self.in_flight = 0
+        self.outstanding = 0
+        self.stats = {}
+        self.order = itertools.count()
+        self.condition = threading.Condition()
+
+    def push(self, task: Task) -> None:
+        # start tag of the query, never behind the task handed out last
+        tag = max(self.clock, self.tags.get(task.query, 0))
+        self.tags[task.query] = tag + 1
+
+        self.queues.setdefault(task.host, [])
+        self.running.setdefault(task.host, 0)
+        self.limits.setdefault(task.host, self.host_limits.get(task.source, self.workers))
+
+        heapq.heappush(self.queues[task.host], (task.kind, task.attempts > 0, tag, next(self.order), task))
+
+    def submit(self, task: Task) -> None:
+        """
+        add a task to the queue, tasks can submit others while they run
+
+        Parameters
+        ----------
+        task: Task
+
+        Returns
+        -------
+
+        """
+        with self.condition:
+            self.push(task)
+            self.outstanding += 1
+            self.condition.notify_all()
+
+    def next_task(self):
+        """
+        take the best task which can run now
+
+        Returns
+        -------
+        task or None and seconds until a waiting task may be ready: tuple,
+        None seconds when only a finishing task can free one
+
+        """
+        if self.in_flight >= self.workers:
+            return None, None
+
+        now = time.monotonic()
+        best, ready_in = None, None
+
+        for host, queue in self.queues.items():
+            if not queue or self.running[host] >= self.limits[host]:
+                continue
+
+            task = queue[0][-1]
+            wait = max(task.not_before - now, breaker_for(host).remaining(), limiter_for(task.url).ready_in())
+
+            if wait > 0:
+                ready_in = wait if ready_in is None else min(ready_in, wait)
+                continue
+
+            if best is None or queue[0][:4] < self.queues[best][0][:4]:
+                best = host
+
+        if best is None:
+            return None, ready_in
+
+        kind, retried, tag, _, task = heapq.heappop(self.queues[best])
+        self.clock = max(self.clock, tag)
+
+        return task, None
+
+    def count(self, task: Task, outcome: str) -> None:
+        stats = self.stats.setdefault(task.source, {"done": 0, "retried": 0, "failed": 0})
+        stats[outcome] += 1
+
+    def execute(self, task: Task) -> None:
+        error = None
+
+        try:
+            task.run()
+
+        except Exception:
+            error = traceback.format_exc()
+
+        task.attempts += 1
+        again = error is not None and task.attempts < self.policy.attempts
+
+        with self.condition:
+            if again:
+                task.not_before = time.monotonic() + self.policy.delay(task.attempts - 1)
+                self.push(task)
+
+            self.count(task, 'retried' if again else 'failed' if error else 'done')
+
+        metrics.count(task.source, 'task', 'retried' if again else 'gave_up' if error else 'ok')
+
+        try:
+            if not again and task.done is not None:
+                task.done(error)
+
+        finally:
+            with self.condition:
+                self.running[task.host] -= 1
+                self.in_flight -= 1
+                self.outstanding -= not again
+                self.condition.notify_all()
+
+    def run(self) -> dict:
+        """
+        hand out tasks to the workers until every task and the tasks they
+        submitted are finished
+
+        Returns
+        -------
+        stats: dict
+
+        """
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            with self.condition:
+                while self.outstanding:
+                    task, ready_in = self.next_task()
+
+                    if task is None:
+                        self.condition.wait(ready_in)
+                        continue
+
+                    self.running[task.host] += 1
+                    self.in_flight += 1
+                    executor.submit(self.execute, task)
+
+        return self.stats
+
+
+class ScheduledSource:
+    """
+    search and details of a source as tasks of a shared scheduler, instead
+    of the loops of its scrappers
+
+    Parameters
+    ----------
+    name: str
+        name of the source, IEEE, ACM or SCIDIR
+
+    config: dict
+        full configuration
+
+    scheduler: Scheduler
+
+    pool: DriverPool
+        warm browsers shared between sources
+
+    cache: ResponseCache
+        cache for search result and publication pages
+
+    Attributes
+    ----------
+    scrapper: object
+        search scrapper of the source, search pages are merged into it
+
+    records: dict
+        link object the details are written into
+
+    journal: Journal
+        finished publications, with resume they are skipped
+
+    error: str
+        traceback of a search page which could not be read, the source
+        fails without details
+
+    failed: int
+        publications saved without details
+
+    Methods
+    -------
+    start:
+        submit the first search page
+
+    paper:
+        paper scrapper of the current worker thread
+
+    close:
+        close browsers of the paper scrappers
+    """
+
+    def __init__(self, name, config, scheduler, pool=None, cache=None):
+        self.name = name
+        self.options = config[name]
+        self.scheduler = scheduler
+        self.pool = pool
+        self.cache = cache
+        self.scrapper = search_scrapper(name, config, cache)
+        self.paper_options = paper_options_for(name, config)
+        self.resume = self.paper_options.pop('resume')
+        self.journal = Journal(f"{self.options['abs_file_save_to']}.journal.jsonl")
+        self.records = {}
+        self.finished = set()
+        self.searching = 0
+        self.detailing = 0
+        self.error = None
+        self.failed = 0
+        self.papers = []
+        self.local = threading.local()
+        self.lock = threading.Lock()
+
+        # search pages of the IEEE api, the sites themselves for the others
+        self.search_url = self.scrapper.search_url if name == 'IEEE' else self.scrapper.base_url
+        self.paper_url = paper_class(name).base_url if name == 'IEEE' else self.search_url
+
+        # api details are paced by the limiter of the document api
+        if self.paper_options.get('use_api', False):
+            self.paper_url = f"{self.paper_url}/rest/document"
+
+    def start(self) -> None:
+        self.scheduler.submit(Task(self.first_page, self.name, self.search_url, SEARCH, done=self.searched))
+
+    def first_page(self) -> None:
+        self.scrapper.check_for_multiple_pages()
+
+        # IEEE keeps the records of the first page, the others only count results
+        pages = self.scrapper.pages()
+
+        with self.lock:
+            self.searching += len(pages)
+
+        for number in pages:
+            self.scheduler.submit(Task(lambda number=number: self.search_page(number),
+                                       self.name, self.search_url, SEARCH, done=self.searched))
+
+    def search_page(self, number: int) -> None:
+        records = self.scrapper.read_page(number)
+
+        with self.lock:
+            for key, record in records.items():
+                self.scrapper.add_link(key, record)
+
+    def searched(self, error) -> None:
+        """
+        called as each search page finishes, details are submitted once
+        the last one is done
+        """
+        with self.lock:
+            if error is not None and self.error is None:
+                self.error = error
+
+            self.searching -= 1
+
+            # the first page counts itself once it has submitted the others
+            if self.searching >= 0:
+                return
+
+        if self.error is not None:
+            return
+
+        try:
+            self.submit_details()
+
+        except Exception:
+            self.error = traceback.format_exc()
+
+    def submit_details(self) -> None:
+        self.scrapper.to_json(self.options['link_file_save_to'])
+        self.records = self.scrapper.links_to_paper
+
+        if not self.resume:
+            self.journal.remove()
+
+        else:
+            for key, value in self.journal.load().items():
+                if key in self.records:
+                    self.records[key] = value
+                    self.finished.add(key)
+
+        keys = [key for key in self.records if key not in self.finished]
+
+        with self.lock:
+            self.detailing = len(keys)
+
+        if not keys:
+            self.save()
+
+        for key in keys:
+            self.scheduler.submit(Task(lambda key=key: self.detail(key),
+                                       self.name, self.paper_url, DETAIL,
+                                       done=lambda error, key=key: self.detailed(key, error)))
+
+    def paper(self):
+        """
+        paper scrapper of the current worker thread, each has its own browser
+
+        Returns
+        -------
+        paper scrapper
+
+        """
+        paper = getattr(self.local, 'paper', None)
+
+        if paper is None:
+            paper = self.local.paper = paper_class(self.name)({}, self.pool, cache=self.cache,
+                                                                 checkpoint=False, **self.paper_options)
+
+            with self.lock:
+                self.papers.append(paper)
+
+        return paper
+
+    def discard(self) -> None:
+        """
+        drop the paper scrapper of the current worker thread after a failed
+        task, its browser may be broken
+        """
+        paper = getattr(self.local, 'paper', None)
+        self.local.paper = None
+
+        if paper is None:
+            return
+
+        with self.lock:
+            self.papers.remove(paper)
+
+        try:
+            if paper.driver is not None:
+                paper.close_driver()
+
+        except Exception:
+            pass
+
+    def detail(self, key: str) -> None:
+        paper = self.paper()
+        value = self.records[key]
+
+        try:
+            if self.name == 'IEEE' and paper.use_api:
+                read = paper.store_details(value, *paper.api_details(key, value))
+
+            else:
+                read = paper.update_paper(value)
+
+        except Exception:
+            self.discard()
+            raise
+
+        # a missing abstract is retried and never journaled as finished
+        if not read:
+            raise RuntimeError(f"{self.name}: no abstract for {key}")
+
+    def detailed(self, key: str, error) -> None:
+        try:
+            if error is None:
+                self.finished.add(key)
+                self.journal.append(key, self.records[key])
+
+        except Exception:
+            self.error = traceback.format_exc()
+
+        # the last detail saves the source, also when journaling failed
+        finally:
+            with self.lock:
+                self.failed += error is not None
+                self.detailing -= 1
+                last = self.detailing == 0
+
+        if not last:
+            return
+
+        try:
+            self.save()
+
+        except Exception:
+            self.error = traceback.format_exc()
+
+    def save(self) -> None:
+        if self.failed:
+            print(f"{self.name}: {self.failed} publications failed, saved without details")
+
+        atomic_write_json(self.options['abs_file_save_to'], self.records)
+        self.journal.remove()
+
+        if not self.options['keep_link_file']:
+            os.remove(self.options['link_file_save_to'])
+
+    def close(self) -> None:
+        for paper in self.papers:
+            if paper.driver is not None:
+                paper.close_driver()
+
+        self.papers.clear()
+
+
+def run_scheduled(config: dict, sources: list, pool=None, cache=None, errors: dict = None) -> dict:
+    """
+    run every source through a single scheduler, so workers are shared by
+    the search and publication pages of all of them
+
+    Parameters
+    ----------
+    config: dict
+        full configuration, with SCHEDULER options
+
+    sources: list
+        names of the sources to run
+
+    pool: DriverPool
+        warm browsers shared between sources
+
+    cache: ResponseCache
+        cache for search result and publication pages
+
+    errors: dict
+        traceback of the failed sources, keyed by source name
+
+    Returns
+    -------
+    errors: dict
+
+    """
+    options = config['SCHEDULER'] if isinstance(config['SCHEDULER'], dict) else {}
+    errors = {} if errors is None else errors
+    scheduler = Scheduler(options.get('workers', 4), options.get('host_limits', None))
+    scheduled = []
+
+    for name in sources:
+        try:
+            scheduled.append(ScheduledSource(name, config, scheduler, pool, cache))
+
+        except Exception:
+            errors[name] = traceback.format_exc()
+
+    for source in scheduled:
+        source.start()
+
+    try:
+        print(f"tasks: {scheduler.run()}")
+
+    finally:
+        for source in scheduled:
+            source.close()
+
+    for source in scheduled:
+        if source.error is not None:
+            errors[source.name] = source.error
+
+    return errors
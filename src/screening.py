@@ -0,0 +1,282 @@
+import re
+import json
+import contextlib
+import numpy as np
+import pandas as pd
+
+from src.sinks import open_sink, read_records
+
+# columns of the screening frame, kws are joined into a single string
+COLUMNS = ('title', 'link', 'date', 'type_', 'abs', 'kws')
+
+YEAR_PATTERN = r'((?:19|20)\d{2})'
+
+
+def keyword_pattern(terms: list) -> str:
+    """
+    single regex of a keyword list, whole words only, spaces in a phrase
+    match any white space and a trailing * matches any word ending
+
+    Parameters
+    ----------
+    terms: list
+
+    Returns
+    -------
+    pattern: str
+
+    """
+    parts = []
+
+    for term in terms:
+        escaped = r'\s+'.join(re.escape(word) for word in str(term).split())
+
+        if escaped.endswith(r'\*'):
+            escaped = escaped[:-2] + r'\w*'
+
+        parts.append(escaped)
+
+    return r'\b(?:' + '|'.join(parts) + r')\b'
+
+
+def text_of(frame: pd.DataFrame, fields: list) -> pd.Series:
+    text = frame[fields[0]]
+
+    for field in fields[1:]:
+        text = text + ' ' + frame[field]
+
+    return text
+
+
+def keyword_rule(rule: dict):
+    """
+    records which contain any of `any`, all of `all` and none of `none`
+    in the given fields (title and abs by default)
+    """
+    fields = rule.get('fields', ['title', 'abs'])
+
+    def apply(frame):
+        text = text_of(frame, fields)
+        mask = np.ones(len(frame), dtype=bool)
+
+        if rule.get('any'):
+            mask &= text.str.contains(keyword_pattern(rule['any']), case=False, regex=True).to_numpy()
+
+        for term in rule.get('all', []):
+            mask &= text.str.contains(keyword_pattern([term]), case=False, regex=True).to_numpy()
+
+        if rule.get('none'):
+            mask &= ~text.str.contains(keyword_pattern(rule['none']), case=False, regex=True).to_numpy()
+
+        return mask
+
+    return apply
+
+
+def year_rule(rule: dict):
+    """
+    records published from `min` to `max` year, both included, records
+    without a year are kept only when `keep_missing` is set
+    """
+    low, high = rule.get('min', -np.inf), rule.get('max', np.inf)
+
+    def apply(frame):
+        years = pd.to_numeric(frame['date'].str.extract(YEAR_PATTERN, expand=False), errors='coerce').to_numpy()
+        mask = (years >= low) & (years <= high)
+
+        return mask | (np.isnan(years) & rule.get('keep_missing', False))
+
+    return apply
+
+
+def type_rule(rule: dict):
+    """
+    records whose type_ is in `include` and not in `exclude`, compared
+    without case
+    """
+    include = {t.lower() for t in rule.get('include', [])}
+    exclude = {t.lower() for t in rule.get('exclude', [])}
+
+    def apply(frame):
+        types = frame['type_'].str.strip().str.lower()
+        mask = np.ones(len(frame), dtype=bool)
+
+        if include:
+            mask &= types.isin(include).to_numpy()
+
+        if exclude:
+            mask &= ~types.isin(exclude).to_numpy()
+
+        return mask
+
+    return apply
+
+
+def abstract_length_rule(rule: dict):
+    """
+    records whose abstract has from `min_words` to `max_words` words
+    """
+    low, high = rule.get('min_words', 0), rule.get('max_words', np.inf)
+
+    def apply(frame):
+        words = frame['abs'].str.count(r'\S+').to_numpy()
+
+        return (words >= low) & (words <= high)
+
+    return apply
+
+
+def present_rule(rule: dict):
+    """
+    records which have every field in `fields`
+    """
+    fields = rule.get('fields', ['abs'])
+
+    def apply(frame):
+        return np.logical_and.reduce([frame[f].str.strip().ne('').to_numpy() for f in fields])
+
+    return apply
+
+
+RULES = {
+    'keywords': keyword_rule,
+    'year': year_rule,
+    'type': type_rule,
+    'abstract_length': abstract_length_rule,
+    'present': present_rule,
+}
+
+
+def compile_rules(spec: list) -> list:
+    """
+    turn rule definitions into (name, mask function) pairs
+
+    Parameters
+    ----------
+    spec: list
+        rule definitions, dicts with name, kind and the options of the kind
+
+    Returns
+    -------
+    compiled rules: list
+
+    """
+    compiled = []
+
+    for i, rule in enumerate(spec):
+        if rule.get('kind') not in RULES:
+            raise ValueError(f"rule {i} has unknown kind {rule.get('kind')!r}, use one of {sorted(RULES)}")
+
+        compiled.append((rule.get('name', f"{rule['kind']}_{i}"), RULES[rule['kind']](rule)))
+
+    return compiled
+
+
+def load_rules(path: str) -> list:
+    """
+    read rule definitions from a yaml or json file with a `rules` list
+
+    Parameters
+    ----------
+    path: str
+
+    Returns
+    -------
+    compiled rules: list
+
+    """
+    with open(path, 'r') as file:
+        if path.endswith('.json'):
+            spec = json.load(file)
+
+        else:
+            import yaml
+
+            spec = yaml.safe_load(file)
+
+    return compile_rules(spec['rules'] if isinstance(spec, dict) else spec)
+
+
+def frame_of(rows: list) -> pd.DataFrame:
+    """
+    screening frame of a chunk of records, missing values become empty
+    strings so string operations need no null checks
+    """
+    frame = pd.DataFrame.from_records(rows, columns=['source', 'key', 'record'] + list(COLUMNS))
+
+    for column in COLUMNS:
+        frame[column] = frame[column].fillna('').astype(str)
+
+    return frame
+
+
+def chunks(sources: dict, chunk_size: int):
+    rows = []
+
+    for source, path in sources.items():
+        for key, record in read_records(path):
+            kws = record.get('kws')
+
+            rows.append((source, key, record) + tuple(
+                '; '.join(map(str, kws)) if c == 'kws' and isinstance(kws, list) else record.get(c)
+                for c in COLUMNS))
+
+            if len(rows) == chunk_size:
+                yield frame_of(rows)
+                rows = []
+
+    if rows:
+        yield frame_of(rows)
+
+
+def screen(sources: dict, rules: list, save_to=None, kind='json', chunk_size=100000) -> dict:
+    """
+    apply every rule to the records of the sources chunk by chunk, a
+    record is kept when it passes all the rules
+
+    Parameters
+    ----------
+    sources: dict
+        json or jsonl abstract file keyed by source name
+
+    rules: list
+        compiled rules, see compile_rules and load_rules
+
+    save_to: str
+        file for the kept records keyed by source:key, not written if None
+
+    kind: str
+        output backend, json or jsonl
+
+    chunk_size: int
+        number of records screened at once
+
+    Returns
+    -------
+    number of records, kept records and per rule passed and excluded
+    counts: dict
+
+    """
+    report = {"total": 0, "kept": 0, "rules": {name: {"passed": 0, "excluded": 0} for name, _ in rules}}
+
+    # an error drops the partial output instead of publishing it over save_to
+    output = open_sink(kind, save_to) if save_to is not None else contextlib.nullcontext()
+
+    with output as sink:
+        for frame in chunks(sources, chunk_size):
+            keep = np.ones(len(frame), dtype=bool)
+
+            for name, apply in rules:
+                mask = np.asarray(apply(frame), dtype=bool)
+                report["rules"][name]["passed"] += int(mask.sum())
+                report["rules"][name]["excluded"] += int(len(mask) - mask.sum())
+                keep &= mask
+
+            report["total"] += len(frame)
+            report["kept"] += int(keep.sum())
+
+            if sink is not None:
+                for source, key, record in frame.loc[keep, ['source', 'key', 'record']].itertuples(index=False):
+                    sink.write(f"{source}:{key}", dict(record, source=source))
+
+    return report
@@ -0,0 +1,369 @@
+import os
+import abc
+import json
+import tempfile
+import threading
+
+
+class RecordSink(abc.ABC):
+    """
+    destination of records written one by one, backends must implement
+    write and can override close
+
+    Methods
+    -------
+    write:
+        add a single record
+
+    close:
+        finish the output
+
+    abort:
+        stop after an error, by default the output is finished as it is
+    """
+
+    @abc.abstractmethod
+    def write(self, key: str, record: dict) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def abort(self) -> None:
+        self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None:
+            self.abort()
+
+        else:
+            self.close()
+
+
+class JsonlSink(RecordSink):
+    """
+    Parameters
+    ----------
+    path: str
+        jsonl file, one {"key": ..., "value": ...} line per record, same
+        lines as the journal
+
+    append: bool
+        keep records of an earlier run and add after them
+
+    fsync_every: int
+        number of records after which the file is synced to disk
+
+    Attributes
+    ----------
+    written: int
+        records written by this sink
+    """
+
+    def __init__(self, path, append=False, fsync_every=50):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.written = 0
+        self.lock = threading.Lock()
+        self.file = open(path, 'a' if append else 'w')
+
+    def write(self, key: str, record: dict) -> None:
+        line = json.dumps({"key": key, "value": record}) + '\n'
+
+        with self.lock:
+            self.file.write(line)
+            self.file.flush()
+            self.written += 1
+
+            if self.written % self.fsync_every == 0:
+                os.fsync(self.file.fileno())
+
+    def close(self) -> None:
+        with self.lock:
+            if self.file.closed:
+                return
+
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.file.close()
+
+
+class JsonSink(RecordSink):
+    """
+    Parameters
+    ----------
+    path: str
+        json file with records keyed by publication key, the format the
+        scrappers always wrote. records are streamed into a temporary file
+        which replaces the destination on close, after an error the
+        temporary file is dropped and an earlier file is left as it was
+
+    Attributes
+    ----------
+    written: int
+        records written by this sink
+    """
+
+    def __init__(self, path, append=False):
+        if append:
+            raise ValueError("json output can not be appended to, use jsonl")
+
+        self.path = path
+        self.written = 0
+        self.lock = threading.Lock()
+
+        folder = os.path.dirname(os.path.abspath(path))
+        fd, self.temp = tempfile.mkstemp(dir=folder, prefix='.tmp-', suffix='.json')
+        self.file = os.fdopen(fd, 'w')
+        self.file.write('{')
+
+    def write(self, key: str, record: dict) -> None:
+        item = json.dumps(str(key)) + ': ' + json.dumps(record)
+
+        with self.lock:
+            self.file.write((', ' if self.written else '') + item)
+            self.written += 1
+
+    def close(self) -> None:
+        with self.lock:
+            if self.file.closed:
+                return
+
+            self.file.write('}')
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.file.close()
+
+            os.replace(self.temp, self.path)
+
+    def abort(self) -> None:
+        with self.lock:
+            if self.file.closed:
+                return
+
+            self.file.close()
+            os.remove(self.temp)
+
+
+SINKS = {
+    'jsonl': JsonlSink,
+    'json': JsonSink,
+}
+
+
+def register_sink(kind: str, factory) -> None:
+    """
+    add an output backend
+
+    Parameters
+    ----------
+    kind: str
+        name used in the configuration
+
+    factory: callable
+        takes the path and append keyword, returns a RecordSink
+
+    Returns
+    -------
+
+    """
+    SINKS[kind] = factory
+
+
+def open_sink(kind: str, path: str, append=False) -> RecordSink:
+    """
+    create the sink of an output backend
+
+    Parameters
+    ----------
+    kind: str
+        name of the backend, one of SINKS
+
+    path: str
+        destination file
+
+    append: bool
+        keep records of an earlier run
+
+    Returns
+    -------
+    sink: RecordSink
+
+    """
+    if kind not in SINKS:
+        raise ValueError(f"unknown output {kind}, use one of {sorted(SINKS)}")
+
+    return SINKS[kind](path, append=append)
+
+
+def iter_json_object(file, chunk_size=1 << 16):
+    """
+    read the items of a top level json object one by one, only a chunk
+    of the file and the current item are kept in memory
+
+    Parameters
+    ----------
+    file: io.TextIOBase
+        open json file
+
+    chunk_size: int
+        number of characters read at once
+
+    Returns
+    -------
+    generator of key and value tuples
+
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    finished = False
+
+    def fill():
+        nonlocal buffer, position, finished
+        chunk = file.read(chunk_size)
+        finished = not chunk
+        buffer = buffer[position:] + chunk
+        position = 0
+
+    def skip(characters):
+        # move past whitespace and the given separators, reading as needed
+        nonlocal position
+
+        while True:
+            while position < len(buffer) and (buffer[position].isspace() or buffer[position] in characters):
+                position += 1
+
+            if position < len(buffer) or finished:
+                return
+
+            fill()
+
+    def decode():
+        # a value is complete once the decoder stops before the buffer end
+        nonlocal position
+
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, position)
+
+                if end < len(buffer) or finished:
+                    position = end
+                    return value
+
+            except json.JSONDecodeError:
+                if finished:
+                    raise
+
+            fill()
+
+    skip('')
+
+    if buffer[position:position + 1] != '{':
+        raise ValueError(f"{file.name} is not a json object")
+
+    position += 1
+
+    while True:
+        skip(',')
+
+        if buffer[position:position + 1] == '}' or (finished and position >= len(buffer)):
+            return
+
+        key = decode()
+        skip(':')
+
+        yield key, decode()
+
+
+def read_records(path: str, kind: str = None):
+    """
+    read records back from a jsonl or json file one by one, jsonl lines
+    cut by a crash are ignored
+
+    Parameters
+    ----------
+    path: str
+        jsonl or json file
+
+    kind: str
+        json or jsonl, the sink which wrote the file. taken from the file
+        extension if not given
+
+    Returns
+    -------
+    generator of key and record tuples
+
+    """
+    if kind is None:
+        kind = 'jsonl' if path.endswith('.jsonl') else 'json'
+
+    if kind not in ('json', 'jsonl'):
+        raise ValueError(f"records of {kind} output can not be read back, use json or jsonl")
+
+    if kind == 'json':
+        with open(path, 'r') as file:
+            yield from iter_json_object(file)
+
+        return
+
+    with open(path, 'r') as file:
+        for line in file:
+            try:
+                entry = json.loads(line)
+
+            except ValueError:
+                continue
+
+            yield entry['key'], entry['value']
+
+
+def stream_details(paper, records, sink: RecordSink, done=()) -> int:
+    """
+    get details of the records one by one and write each to the sink as
+    soon as it is finished
+
+    Parameters
+    ----------
+    paper: Paper
+        paper scrapper of the source
+
+    records: iterable
+        key and record tuples of the search results
+
+    sink: RecordSink
+        destination of the finished records
+
+    done: iterable
+        keys which are already in the output
+
+    Returns
+    -------
+    number of records written: int
+
+    """
+    seen = set(done)
+    written = 0
+
+    for key, value in records:
+        # search results can list the same publication twice
+        if key in seen:
+            continue
+
+        seen.add(key)
+
+        if getattr(paper, 'use_api', False):
+            paper.store_details(value, *paper.api_details(key, value))
+
+        else:
+            paper.update_paper(value)
+
+        sink.write(key, value)
+        written += 1
+
+        print(f'reading papers: {written}', end='\r')
+
+    return written
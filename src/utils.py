@@ -1,7 +1,9 @@
+import os
 import json
-import pandas as pd
 
-from selenium.webdriver.support.ui import WebDriverWait
+CONFIG_FILE = './config.json'
+
+_configs = {}
 
 
 def clean_cookies_and_caches(driver):
@@ -22,12 +24,64 @@ def read_json(file_path):
         return json.load(f)
 
 
-def to_excel(sheets: dict):
-    dfs = {key: pd.read_json(filename) for key, filename in sheets.items()}
+def load_config(path=CONFIG_FILE) -> dict:
+    """
+    read a configuration file once, later calls get the same object
+
+    Parameters
+    ----------
+    path: str
+        json configuration file
+
+    Returns
+    -------
+    configuration: dict
+
+    """
+    key = os.path.abspath(path)
+
+    if key not in _configs:
+        _configs[key] = read_json(path)
+
+    return _configs[key]
+
 
-    with pd.ExcelWriter('./SLR_chris.xlsx') as writer:
-        for sheet, df in dfs.items():
-            df.T.to_excel(writer, sheet_name=sheet)
+class LazyConfig:
+    """
+    class attribute read from the configuration file on first use, not
+    when the class is defined, so modules import without a config file.
+    assigning config on an instance gives it its own configuration
+
+    Parameters
+    ----------
+    path: str
+        json configuration file
+
+    key: str
+        single setting to get instead of the whole configuration
+
+    default: object
+        value of the setting when the configuration does not have it
+    """
+
+    def __init__(self, path=CONFIG_FILE, key=None, default=None):
+        self.path = path
+        self.key = key
+        self.default = default
+
+    def __get__(self, instance, owner):
+        config = vars(instance).get('config') if instance is not None else None
+
+        if config is None:
+            config = load_config(self.path)
+
+        return config if self.key is None else config.get(self.key, self.default)
+
+
+def to_excel(sheets: dict, path='./SLR_chris.xlsx', hyperlink=False):
+    from src.report import write_report
+
+    return write_report(sheets, path, hyperlink)
 
 
 def validate(obj: dict):
@@ -55,8 +109,13 @@ def validate_scrapper_keys(obj: dict, detected: set):
     expected_keys = ['search_term', 'link_file_save_to',
                      'abs_file_save_to', 'use_batches',
                      'batch_size', 'keep_link_file']
+    optional_keys = ['search_workers', 'http_first', 'use_api', 'resume', 'incremental', 'stream']
+
     for s in detected:
-        if list(obj[s].keys()) != expected_keys:
+        missing = [k for k in expected_keys if k not in obj[s]]
+        unknown = [k for k in obj[s] if k not in expected_keys + optional_keys]
+
+        if missing or unknown:
             raise ConfigurationError(expected_keys)
 
 
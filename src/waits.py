@@ -0,0 +1,181 @@
+import time
+import threading
+
+from selenium.common import exceptions
+from src import metrics
+
+
+class PageWaits:
+    """
+    Parameters
+    ----------
+    source: str
+        name of the source, IEEE, ACM or SCIDIR
+
+    timeout: float
+        seconds to wait for an element before giving up
+
+    poll: float
+        seconds between two checks of the condition
+
+    Attributes
+    ----------
+    durations: dict
+        seconds each wait took, keyed by what was waited for
+
+    timeouts: dict
+        number of waits which ran out of time, keyed by what was waited for
+
+    Methods
+    -------
+    until:
+        wait for a condition and record how long it took
+
+    present:
+        wait until an element is in the page
+
+    clickable:
+        wait until an element can be clicked
+
+    stats:
+        count, timeouts and latency percentiles of the waits
+
+    """
+
+    def __init__(self, source, timeout=10.0, poll=0.1):
+        self.source = source
+        self.timeout = timeout
+        self.poll = poll
+        self.durations = {}
+        self.timeouts = {}
+        self.lock = threading.Lock()
+
+    def until(self, driver, condition, name: str):
+        """
+        wait for a condition and record how long it took
+
+        Parameters
+        ----------
+        driver: undetected_chromedriver.Chrome
+
+        condition: callable
+            expected condition, takes the driver
+
+        name: str
+            what is waited for, waits are grouped by it in the stats
+
+        Returns
+        -------
+        result of the condition or None if it ran out of time
+
+        """
+        # selenium support modules are slow to import, only load them for a browser
+        from selenium.webdriver.support.wait import WebDriverWait
+
+        started = time.monotonic()
+        result = None
+
+        try:
+            result = WebDriverWait(driver, self.timeout, poll_frequency=self.poll).until(condition)
+
+        except exceptions.TimeoutException:
+            with self.lock:
+                self.timeouts[name] = self.timeouts.get(name, 0) + 1
+
+        with self.lock:
+            self.durations.setdefault(name, []).append(time.monotonic() - started)
+
+        metrics.observe(self.source, 'wait', time.monotonic() - started, 'ok' if result is not None else 'timeout')
+
+        return result
+
+    def present(self, driver, by, value, name=None):
+        from selenium.webdriver.support import expected_conditions as EC
+
+        return self.until(driver, EC.presence_of_element_located((by, value)), name or value)
+
+    def clickable(self, driver, by, value, name=None):
+        from selenium.webdriver.support import expected_conditions as EC
+
+        return self.until(driver, EC.element_to_be_clickable((by, value)), name or value)
+
+    def stats(self) -> dict:
+        """
+        count, timeouts and latency percentiles of the waits
+
+        Returns
+        -------
+        stats keyed by what was waited for: dict
+
+        """
+        with self.lock:
+            durations = {name: sorted(values) for name, values in self.durations.items()}
+            timeouts = dict(self.timeouts)
+
+        return {name: {"count": len(values),
+                       "timeouts": timeouts.get(name, 0),
+                       "mean": round(sum(values) / len(values), 3),
+                       "p50": round(values[len(values) // 2], 3),
+                       "p95": round(values[min(len(values) - 1, int(len(values) * 0.95))], 3),
+                       "max": round(values[-1], 3)}
+                for name, values in durations.items()}
+
+
+_waits = {}
+_settings = {}
+_lock = threading.Lock()
+
+
+def configure(options: dict) -> None:
+    """
+    set wait timeouts from the WAITS configuration, waits already created
+    are not changed
+
+    Parameters
+    ----------
+    options: dict
+        timeouts keyed by source name, default_timeout and poll
+
+    Returns
+    -------
+
+    """
+    with _lock:
+        _settings.update(options or {})
+
+
+def waits_for(source: str) -> PageWaits:
+    """
+    get the shared waits of a source
+
+    Parameters
+    ----------
+    source: str
+        name of the source, IEEE, ACM or SCIDIR
+
+    Returns
+    -------
+    waits: PageWaits
+
+    """
+    with _lock:
+        if source not in _waits:
+            timeout = _settings.get('timeouts', {}).get(source, _settings.get('default_timeout', 10.0))
+            _waits[source] = PageWaits(source, timeout, _settings.get('poll', 0.1))
+
+        return _waits[source]
+
+
+def summary() -> dict:
+    """
+    wait stats of every source
+
+    Returns
+    -------
+    stats keyed by source name: dict
+
+    """
+    with _lock:
+        waits = list(_waits.values())
+
+    return {w.source: w.stats() for w in waits if w.durations}
@@ -0,0 +1,78 @@
+import pytest
+import argparse
+import requests
+
+from urllib.parse import urlsplit
+
+from benchmarks.mock_servers import MockServers, acm_links, scidir_links
+from src import rate_limit, retry
+
+
+@pytest.fixture(scope='module')
+def urls():
+    with MockServers(papers=120, latency=0.0) as servers:
+        rate_limit.configure({urlsplit(url).netloc: {"rate": 1000.0, "max_rate": 1000.0, "jitter": 0.0}
+                              for url in servers.urls.values()})
+
+        yield servers.urls
+
+
+def test_ieee_scrapper_reads_mock_api(urls, monkeypatch):
+    from src.ieee import IEEE, Paper
+
+    monkeypatch.setattr(IEEE, "search_url", f"{urls['IEEE']}/rest/search")
+    monkeypatch.setattr(Paper, "base_url", urls['IEEE'])
+
+    scrapper = IEEE("sign language", workers=2)
+    scrapper.get_links_to_papers()
+
+    assert scrapper.page_count == 2
+    assert len(scrapper.links_to_paper) == 120
+
+    # every tenth result has no abstract and is read from the document page
+    paper = Paper(dict(list(scrapper.links_to_paper.items())[:11]), use_api=True, checkpoint=False)
+    paper.api_update_details(25)
+
+    assert all(isinstance(v["abs"], str) and len(v["kws"]) == 2 for v in paper.link_object.values())
+
+
+@pytest.mark.parametrize("source", ["ACM", "SCIDIR"])
+def test_paper_scrapper_reads_mock_pages(urls, source):
+    if source == 'ACM':
+        from src.acm import Paper
+
+        links = acm_links(urls[source], 3)
+
+    else:
+        from src.scidirect import Paper
+
+        links = scidir_links(urls[source], 3)
+
+    paper = Paper(links, http_first=True, checkpoint=False)
+
+    for value in links.values():
+        paper.update_paper(value)
+
+    assert paper.fetcher.hits == 3
+    assert all(len(v["abs"].split()) >= 120 for v in links.values())
+
+
+def test_run_puts_patched_attributes_back():
+    from src.ieee import IEEE, Paper
+    from benchmarks import run
+
+    send, search_url, base_url = requests.Session.send, IEEE.search_url, Paper.base_url
+    args = argparse.Namespace(papers=30, latency=0.0, jitter=0.0, error_rate=0.0, block_rate=0.0, rate=1000.0,
+                              min_rate=50.0, retry_delay=0.01, workers=2, query='sign language', sources=['IEEE'])
+
+    try:
+        results = run.run(args)
+
+    finally:
+        rate_limit.configure(None)
+        retry.configure(None)
+
+    assert [r["phase"] for r in results] == ['IEEE search', 'IEEE details']
+    assert results[1]["papers"] == 30 and results[0]["pages"] == 1
+    assert requests.Session.send is send
+    assert (IEEE.search_url, Paper.base_url) == (search_url, base_url)
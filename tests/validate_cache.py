@@ -0,0 +1,74 @@
+import time
+import pytest
+
+from src.cache import ResponseCache, make_key, open_cache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"), max_mb=1, ttl_hours={"ACM": 1})
+    yield cache
+    cache.close()
+
+
+def test_key_is_normalized():
+    assert make_key("HTTPS://dl.ACM.org/doSearch?b=2&a=1#top") == make_key("https://dl.acm.org/doSearch?a=1&b=2")
+    assert make_key("https://x.org/s", {"a": 1, "b": 2}) == make_key("https://x.org/s", {"b": 2, "a": 1})
+    assert make_key("https://x.org/s", {"pageNumber": 1}) != make_key("https://x.org/s", {"pageNumber": 2})
+
+
+def test_hit_and_miss_counters(cache):
+    assert cache.get("ACM", "https://dl.acm.org/doi/1") is None
+
+    cache.put("ACM", "https://dl.acm.org/doi/1", None, "<html>paper</html>")
+
+    assert cache.get("ACM", "https://dl.acm.org/doi/1") == "<html>paper</html>"
+    assert cache.stats()["hits"] == {"ACM": 1}
+    assert cache.stats()["misses"] == {"ACM": 1}
+
+
+def test_expired_response_is_a_miss(cache, monkeypatch):
+    cache.put("ACM", "https://dl.acm.org/doi/1", None, "old")
+
+    later = time.time() + 2 * 3600
+    monkeypatch.setattr(time, "time", lambda: later)
+
+    assert cache.get("ACM", "https://dl.acm.org/doi/1") is None
+
+
+def test_least_recently_used_evicted(cache):
+    import os
+
+    page = os.urandom(350 * 1024).hex()
+
+    cache.put("IEEE", "https://x.org/1", None, page)
+    cache.put("IEEE", "https://x.org/2", None, page)
+    cache.get("IEEE", "https://x.org/1")
+    cache.put("IEEE", "https://x.org/3", None, page)
+
+    assert cache.size() <= cache.max_bytes
+    assert cache.get("IEEE", "https://x.org/1") is not None
+    assert cache.get("IEEE", "https://x.org/2") is None
+
+
+def test_running_size_matches_table(cache):
+    cache.put("ACM", "https://dl.acm.org/doi/1", None, "first" * 100)
+    cache.put("ACM", "https://dl.acm.org/doi/2", None, "second" * 100)
+    cache.put("ACM", "https://dl.acm.org/doi/1", None, "replaced")
+
+    assert cache.total == cache.size()
+
+    reopened = ResponseCache(cache.path)
+
+    assert reopened.total == cache.size()
+    reopened.close()
+
+
+def test_cache_true_uses_defaults(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "temp").mkdir()
+
+    cache = open_cache(True)
+
+    assert cache.path == './temp/cache.sqlite' and cache.max_bytes == 512 * 2 ** 20
+    cache.close()
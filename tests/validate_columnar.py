@@ -0,0 +1,71 @@
+import json
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from src.columnar import write_parquet, load_frame, to_csv, to_excel, to_row
+
+
+@pytest.fixture
+def results(tmp_path):
+    ieee = tmp_path / "ieee.json"
+    acm = tmp_path / "acm.json"
+
+    ieee.write_text(json.dumps({"1": {"title": "a", "link": "/document/1/", "date": "2021",
+                                      "abs": "x", "kws": ["k1", "k2"]},
+                                "2": {"title": "b", "link": "/document/2/", "date": "2022",
+                                      "abs": float("nan"), "kws": float("nan")}}))
+    acm.write_text(json.dumps({"3": {"title": "c", "link": "https://dl.acm.org/doi/10.1/3",
+                                     "date": "March 2022", "type_": "research-article", "abs": "y"}}))
+
+    return {"IEEE": str(ieee), "ACM": str(acm)}
+
+
+def test_partitioned_by_source_and_year(tmp_path, results):
+    root = tmp_path / "parquet"
+    write_parquet(results, str(root), batch_size=1)
+
+    assert (root / "source=IEEE" / "year=2021").is_dir()
+    assert (root / "source=ACM" / "year=2022").is_dir()
+
+    df = load_frame(str(root), sources=["IEEE"]).sort_values("key")
+
+    assert list(df["key"]) == ["1", "2"]
+    assert list(df.loc[df["key"] == "1", "kws"].iloc[0]) == ["k1", "k2"]
+    assert df.loc[df["key"] == "2", "abs"].isna().all()
+
+
+def test_rewrite_replaces_partition(tmp_path, results):
+    root = str(tmp_path / "parquet")
+    write_parquet(results, root)
+    write_parquet(results, root)
+
+    assert len(load_frame(root)) == 3
+
+
+def test_csv_report(tmp_path, results):
+    root = str(tmp_path / "parquet")
+    write_parquet(results, root)
+    to_csv(root, str(tmp_path / "out.csv"))
+
+    assert "k1; k2" in (tmp_path / "out.csv").read_text()
+
+
+def test_type_and_year_mapped():
+    row = to_row("ACM", "3", {"type_": "research-article", "date": "March 2022"})
+
+    assert row["type"] == "research-article"
+    assert row["year"] == 2022
+
+
+def test_excel_sheet_per_source(tmp_path, results):
+    import pandas as pd
+
+    root = str(tmp_path / "parquet")
+    write_parquet(results, root)
+    to_excel(root, str(tmp_path / "out.xlsx"))
+
+    sheets = pd.read_excel(str(tmp_path / "out.xlsx"), sheet_name=None)
+
+    assert sorted(sheets) == ["ACM", "IEEE"]
+    assert len(sheets["IEEE"]) == 2
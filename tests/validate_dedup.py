@@ -0,0 +1,91 @@
+import json
+
+from src import orchestrator
+from src.dedup import deduplicate, normalize_title, extract_doi
+
+
+def test_title_and_doi_normalized():
+    assert normalize_title("Sign-Language  Recognition: A Survey!") == "sign language recognition a survey"
+    assert normalize_title("Über Gestures") == "uber gestures"
+    assert extract_doi({"link": "https://dl.acm.org/doi/abs/10.1145/3491102.3501886"}) == "10.1145/3491102.3501886"
+    assert extract_doi({"link": "/document/123/"}) is None
+
+
+def test_clusters_by_doi_and_title():
+    links = {
+        "IEEE": {"1": {"title": "Deep learning for sign language recognition", "doi": "10.1109/ABC.2022.1"},
+                 "2": {"title": "A completely different paper about robots"}},
+        "ACM": {"10.1109/abc.2022.1": {"title": "Renamed in the ACM listing",
+                                       "link": "https://dl.acm.org/doi/10.1109/abc.2022.1"}},
+        "SCIDIR": {"S1": {"title": "Deep Learning for Sign-Language Recognition."},
+                   "S2": {"title": "Transformers for gesture translation"}},
+    }
+
+    unique, clusters = deduplicate(links)
+
+    assert list(unique["IEEE"]) == ["1", "2"]
+    assert unique["ACM"] == {}
+    assert list(unique["SCIDIR"]) == ["S2"]
+    assert unique["IEEE"]["1"]["cluster"] == "IEEE:1"
+    assert sorted(clusters["IEEE:1"]) == ["ACM:10.1109/abc.2022.1", "IEEE:1", "SCIDIR:S1"]
+    assert unique["SCIDIR"]["S2"]["duplicates"] == []
+
+
+def test_preferred_source_kept():
+    links = {"IEEE": {"1": {"title": "Same title of a paper"}},
+             "ACM": {"a": {"title": "Same title of a paper"}}}
+
+    unique, _ = deduplicate(links, prefer=["ACM", "IEEE"])
+
+    assert list(unique["ACM"]) == ["a"] and unique["IEEE"] == {}
+
+
+def test_different_dois_not_merged_by_title():
+    links = {"IEEE": {"1": {"title": "Sign language recognition: a survey", "doi": "10.1109/ABC.2021.1"}},
+             "ACM": {"a": {"title": "Sign language recognition: a survey",
+                           "link": "https://dl.acm.org/doi/10.1145/999.2"}},
+             "SCIDIR": {"S1": {"title": "Sign language recognition - a survey"}}}
+
+    unique, clusters = deduplicate(links)
+
+    assert list(unique["IEEE"]) == ["1"] and list(unique["ACM"]) == ["a"]
+    assert len(clusters) == 1
+    assert sum(len(members) for members in clusters.values()) == 2
+
+
+def test_same_source_not_merged_by_title():
+    links = {"IEEE": {"1": {"title": "Editorial"}, "2": {"title": "Editorial"}},
+             "ACM": {"a": {"title": "Editorial"}}}
+
+    unique, clusters = deduplicate(links)
+
+    assert list(unique["IEEE"]) == ["1", "2"]
+    assert unique["ACM"] == {}
+    assert list(clusters.values()) == [["IEEE:1", "ACM:a"]]
+
+
+def test_details_read_once_per_paper(monkeypatch, tmp_path):
+    config = {s: {"link_file_save_to": str(tmp_path / f"{s}.json"),
+                  "abs_file_save_to": str(tmp_path / f"{s}_abs.json"),
+                  "keep_link_file": True} for s in ("IEEE", "ACM")}
+    config["DEDUP"] = {"save_to": str(tmp_path / "clusters.json")}
+    listings = {"IEEE": {"1": {"title": "Shared paper title here"}},
+                "ACM": {"a": {"title": "Shared paper title here"}, "b": {"title": "Only in the ACM results"}}}
+    read = {}
+
+    def search_source(name, config, cache=None):
+        with open(config[name]["link_file_save_to"], "w") as file:
+            json.dump(listings[name], file)
+
+    def detail_source(name, config, pool=None, cache=None, link_file=None, save_to=None):
+        with open(link_file) as file:
+            read[name] = sorted(json.load(file))
+
+    monkeypatch.setattr(orchestrator, "search_source", search_source)
+    monkeypatch.setattr(orchestrator, "detail_source", detail_source)
+
+    assert orchestrator.run_sources(config, ["ACM", "IEEE"]) == {}
+    assert read == {"IEEE": ["1"], "ACM": ["b"]}
+
+    with open(config["DEDUP"]["save_to"]) as file:
+        assert json.load(file) == {"IEEE:1": ["IEEE:1", "ACM:a"]}
@@ -0,0 +1,104 @@
+import json
+import time
+import threading
+
+from src.distributed import LeaseQueue, work, save_results
+
+
+def link_file(tmp_path, count=10):
+    path = tmp_path / "links.json"
+
+    with open(path, 'w') as file:
+        json.dump({f"p{i}": {"link": f"https://dl.acm.org/doi/{i}"} for i in range(count)}, file)
+
+    return str(path)
+
+
+def test_tasks_leased_once(tmp_path):
+    queue = LeaseQueue(str(tmp_path / "queue.sqlite"))
+
+    assert queue.add_job('ACM', 'ACM', link_file(tmp_path), str(tmp_path / "abs.json"), {"http_first": True}, 4) == 3
+
+    first, second = queue.lease('a'), queue.lease('b')
+
+    assert first["id"] != second["id"]
+    assert first["options"] == {"http_first": True}
+    assert len(first["records"]) == 4
+    assert queue.complete(first["id"], 'a', {"p0": {"abs": "x"}})
+    assert not queue.complete(second["id"], 'a', {})
+    assert queue.progress() == {'done': 1, 'leased': 1, 'pending': 1}
+
+
+def test_expired_lease_reassigned(tmp_path):
+    queue = LeaseQueue(str(tmp_path / "queue.sqlite"), lease_seconds=0.05)
+    queue.add_job('ACM', 'ACM', link_file(tmp_path, 2), str(tmp_path / "abs.json"), chunk_size=2)
+
+    task = queue.lease('dead')
+    assert queue.lease('b') is None
+
+    time.sleep(0.1)
+    again = queue.lease('b')
+
+    assert again["id"] == task["id"] and again["attempts"] == 2
+    assert not queue.complete(task["id"], 'dead', {})
+    assert queue.complete(again["id"], 'b', {})
+
+
+def test_failed_task_given_up(tmp_path):
+    queue = LeaseQueue(str(tmp_path / "queue.sqlite"), max_attempts=2)
+    queue.add_job('IEEE', 'IEEE', link_file(tmp_path, 1), str(tmp_path / "abs.json"))
+
+    for _ in range(2):
+        task = queue.lease('a')
+        queue.fail(task["id"], 'a', 'blocked')
+
+    assert queue.lease('a') is None
+    assert queue.errors('IEEE') == ['blocked']
+    assert queue.drained()
+
+
+def test_workers_share_a_job(tmp_path):
+    path = str(tmp_path / "queue.sqlite")
+    links = link_file(tmp_path, 25)
+    queue = LeaseQueue(path)
+    queue.add_job('SCIDIR', 'SCIDIR', links, str(tmp_path / "abs.json"), chunk_size=3)
+    done = {}
+
+    def fetch(source, records, options):
+        time.sleep(0.01)
+
+        return {key: dict(value, abs=f"{source} {key}") for key, value in records.items()}
+
+    def worker(name):
+        done[name] = work(path, name, poll=0.01, fetch=fetch)
+
+    threads = [threading.Thread(target=worker, args=(f"w{i}",)) for i in range(3)]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    assert sum(done.values()) == 9
+    assert save_results(queue, 'SCIDIR', links, str(tmp_path / "abs.json")) == 0
+
+    with open(tmp_path / "abs.json") as file:
+        records = json.load(file)
+
+    assert len(records) == 25
+    assert records["p7"]["abs"] == "SCIDIR p7"
+
+
+def test_kept_job_gets_new_links(tmp_path):
+    queue = LeaseQueue(str(tmp_path / "queue.sqlite"))
+    save_to = str(tmp_path / "abs.json")
+    queue.add_job('ACM', 'ACM', link_file(tmp_path, 4), save_to, chunk_size=4)
+    task = queue.lease('a')
+    queue.complete(task["id"], 'a', {key: dict(value, abs="x") for key, value in task["records"].items()})
+
+    links = link_file(tmp_path, 6)
+
+    assert queue.add_job('ACM', 'ACM', links, save_to, chunk_size=4, keep=True) == 1
+    assert sorted(queue.lease('a')["records"]) == ["p4", "p5"]
+    assert save_results(queue, 'ACM', links, save_to) == 2
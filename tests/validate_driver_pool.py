@@ -0,0 +1,74 @@
+import pytest
+
+import src.driver_pool
+from src.driver_pool import DriverPool
+
+
+class FakeDriver:
+    def __init__(self):
+        self.closed = False
+
+    def quit(self):
+        self.closed = True
+
+
+@pytest.fixture
+def started(monkeypatch):
+    drivers = []
+
+    def new_driver(binary_location, executable_path, profile='default'):
+        drivers.append(FakeDriver())
+        return drivers[-1]
+
+    monkeypatch.setattr(src.driver_pool, "new_driver", new_driver)
+
+    return drivers
+
+
+def test_browser_replaced_after_max_pages(started):
+    pool = DriverPool("chrome", "driver", size=1, max_pages=2)
+    driver = pool.acquire()
+
+    pool.record_page(driver)
+    pool.release(driver)
+
+    assert pool.acquire() is driver
+
+    pool.record_page(driver)
+    pool.release(driver)
+
+    assert driver.closed and pool.started == 0
+    assert pool.acquire() is not driver
+    assert len(started) == 2
+
+
+def test_memory_limit_needs_psutil(monkeypatch):
+    monkeypatch.setattr(src.driver_pool, "psutil", None)
+
+    with pytest.raises(ImportError):
+        DriverPool("chrome", "driver", max_memory_mb=100)
+
+
+def test_browser_over_memory_limit_discarded(started, monkeypatch):
+    monkeypatch.setattr(src.driver_pool, "psutil", object())
+    pool = DriverPool("chrome", "driver", size=2, max_pages=None, max_memory_mb=100)
+    light, heavy = pool.acquire(), pool.acquire()
+    monkeypatch.setattr(pool, "memory_mb", lambda driver: 500.0 if driver is heavy else 50.0)
+
+    pool.release(light)
+    pool.release(heavy)
+
+    assert heavy.closed and not light.closed
+    assert pool.started == 1 and pool.acquire() is light
+
+
+def test_close_quits_idle_browsers(started):
+    pool = DriverPool("chrome", "driver", size=3)
+    pool.warm()
+
+    assert len(started) == 3 and pool.started == 3
+
+    pool.close()
+
+    assert all(driver.closed for driver in started)
+    assert pool.started == 0 and pool.pages == {}
@@ -0,0 +1,106 @@
+import json
+import pytest
+
+import src.fast_fetch
+from src import metrics
+from src.acm import Paper
+from src.cache import ResponseCache
+from src.fast_fetch import HttpFetcher
+from src.rate_limit import HostRateLimiter
+
+PAGE = '<html><body><div class="abstractInFull"><p>An  abstract</p></div></body></html>'
+
+
+@pytest.fixture(autouse=True)
+def no_pacing(monkeypatch, tmp_path):
+    monkeypatch.setattr(src.fast_fetch, "limiter_for", lambda url: HostRateLimiter(url, rate=1000.0, jitter=0.0))
+    metrics.reset(str(tmp_path / "metrics.jsonl"))
+    yield
+    metrics.reset(str(tmp_path / "metrics.jsonl"))
+
+
+class FakeResponse:
+    def __init__(self, text, status_code=200):
+        self.text = text
+        self.status_code = status_code
+
+    def json(self):
+        return json.loads(self.text)
+
+
+def served(monkeypatch, fetcher, pages):
+    requested = []
+
+    def get(link, headers=None, timeout=None):
+        requested.append(link)
+        return FakeResponse(pages.get(link, ''), 200 if link in pages else 404)
+
+    monkeypatch.setattr(fetcher.session, "get", get)
+
+    return requested
+
+
+def counters():
+    return {(c["source"], c["phase"], c["outcome"]): c["value"] for c in metrics.snapshot()["counters"]}
+
+
+def test_text_read_over_http(monkeypatch):
+    fetcher = HttpFetcher(source='ACM')
+    served(monkeypatch, fetcher, {"https://dl.acm.org/doi/1": PAGE})
+
+    assert fetcher.get_text("https://dl.acm.org/doi/1", 'abstractInFull') == "An abstract"
+    assert fetcher.get_text("https://dl.acm.org/doi/2", 'abstractInFull') is None
+    assert (fetcher.hits, fetcher.misses) == (1, 1)
+
+
+def test_browser_used_when_text_missing(monkeypatch):
+    records = {"1": {"link": "https://dl.acm.org/doi/1"}, "2": {"link": "https://dl.acm.org/doi/2"}}
+    paper = Paper(records, http_first=True, checkpoint=False)
+    served(monkeypatch, paper.fetcher, {"https://dl.acm.org/doi/1": PAGE,
+                                        "https://dl.acm.org/doi/2": "<html>javascript only</html>"})
+    browsed = []
+
+    monkeypatch.setattr(paper, "init_driver", lambda: None)
+    monkeypatch.setattr(paper, "request_paper", browsed.append)
+    monkeypatch.setattr(paper.waits, "present", lambda *args: None)
+    monkeypatch.setattr(paper, "get_abstract_text", lambda: "from the browser")
+
+    assert paper.update_paper(records["1"]) and records["1"]["abs"] == "An abstract"
+    assert paper.update_paper(records["2"]) and records["2"]["abs"] == "from the browser"
+    assert browsed == ["https://dl.acm.org/doi/2"]
+
+
+def test_cache_hits_counted(monkeypatch, tmp_path):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+    fetcher = HttpFetcher(cache=cache, source='IEEE')
+    pages = {"https://ieeexplore.ieee.org/document/1/": PAGE,
+             "https://ieeexplore.ieee.org/rest/document/1/keywords": '{"keywords": []}'}
+    requested = served(monkeypatch, fetcher, pages)
+
+    for _ in range(2):
+        assert fetcher.fetch("https://ieeexplore.ieee.org/document/1/") == PAGE
+        assert fetcher.fetch_json("https://ieeexplore.ieee.org/rest/document/1/keywords") == {"keywords": []}
+
+    assert len(requested) == 2
+    assert counters()[('IEEE', 'paper_page', 'cached')] == 2
+    assert counters()[('IEEE', 'paper_page', 'ok')] == 2
+    cache.close()
+
+
+@pytest.mark.parametrize("source", ["ACM", "SCIDIR"])
+def test_empty_static_abstract_left_to_browser(monkeypatch, source):
+    if source == 'ACM':
+        from src.acm import Paper as SourcePaper
+
+    else:
+        from src.scidirect import Paper as SourcePaper
+
+    records = {"1": {"link": "https://x.test/1"}}
+    paper = SourcePaper(records, http_first=True, checkpoint=False)
+    monkeypatch.setattr(paper.fetcher, "get_text", lambda link, class_name: "Abstract " if source == 'SCIDIR' else " ")
+    monkeypatch.setattr(paper, "init_driver", lambda: None)
+    monkeypatch.setattr(paper, "request_paper", lambda link: None)
+    monkeypatch.setattr(paper.waits, "present", lambda *args: None)
+    monkeypatch.setattr(paper, "get_abstract_text", lambda: "from the browser")
+
+    assert paper.update_paper(records["1"]) and records["1"]["abs"] == "from the browser"
@@ -0,0 +1,70 @@
+import math
+
+from src.ieee import Paper
+
+
+class FakeFetcher:
+    def __init__(self, keywords, pages=None):
+        self.keywords = keywords
+        self.pages = pages or {}
+        self.requested = []
+
+    def fetch_json(self, link, headers=None):
+        self.requested.append(link)
+        number = link.split('/')[-2]
+
+        if number not in self.keywords:
+            return None
+
+        return {"keywords": [{"type": "IEEE Keywords", "kwd": self.keywords[number]}]}
+
+    def fetch(self, link):
+        self.requested.append(link)
+
+        return self.pages.get(link)
+
+
+def api_paper(records, fetcher):
+    paper = Paper(records, use_api=True, checkpoint=False)
+    paper.fetcher = fetcher
+    paper.checkpoint = paper.finished.add
+
+    return paper
+
+
+def test_abstract_from_search_and_keywords_from_api():
+    records = {"1": {"link": "/document/1/", "abstract": "searched abstract", "doi": "10.1109/x.1"}}
+    fetcher = FakeFetcher({"1": ["sign", "language"]})
+    paper = api_paper(records, fetcher)
+
+    paper.update_paper_details()
+
+    assert records["1"]["abs"] == "searched abstract"
+    assert records["1"]["kws"] == ["sign,language"]
+    assert "abstract" not in records["1"]
+    assert fetcher.requested == ["https://ieeexplore.ieee.org/rest/document/1/keywords"]
+    assert paper.finished == {"1"}
+
+
+def test_metadata_page_fills_missing_abstract():
+    page = 'xplGlobal.document.metadata={"abstract": "page abstract", "keywords": [{"kwd": ["a", "b"]}]};\n'
+    records = {"2": {"link": "/document/2/"}}
+    fetcher = FakeFetcher({}, {"https://ieeexplore.ieee.org/document/2/": page})
+    paper = api_paper(records, fetcher)
+
+    paper.update_paper_details()
+
+    assert records["2"]["abs"] == "page abstract"
+    assert records["2"]["kws"] == ["a,b"]
+    assert paper.finished == {"2"}
+
+
+def test_unread_abstract_not_checkpointed():
+    records = {"3": {"link": "/document/3/"}}
+    paper = api_paper(records, FakeFetcher({"3": ["x"]}))
+
+    paper.update_paper_details()
+
+    assert math.isnan(records["3"]["abs"])
+    assert records["3"]["kws"] == ["x"]
+    assert paper.finished == set()
@@ -0,0 +1,57 @@
+import pytest
+
+import src.ieee
+from src.ieee import IEEE
+from src.rate_limit import HostRateLimiter
+
+
+@pytest.fixture(autouse=True)
+def no_pacing(monkeypatch):
+    monkeypatch.setattr(src.ieee, "limiter_for", lambda url: HostRateLimiter(url, rate=1000.0, jitter=0.0))
+
+
+class FakeResponse:
+    def __init__(self, page, total_pages):
+        self.status_code = 200
+        self.page = page
+        self.total_pages = total_pages
+
+    def json(self):
+        return {"totalPages": self.total_pages,
+                "records": [{"articleNumber": f"{self.page}-{i}",
+                             "articleTitle": f"title {self.page}-{i}",
+                             "documentLink": f"/document/{self.page}{i}/",
+                             "publicationYear": "2022"} for i in range(3)]}
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_every_page_fetched_once(monkeypatch, workers):
+    requested = []
+
+    def post_request(header, json, session=None):
+        requested.append(json["pageNumber"])
+        return FakeResponse(json["pageNumber"], 7)
+
+    monkeypatch.setattr(IEEE, "post_request", staticmethod(post_request))
+
+    ieee = IEEE("sign language", workers=workers)
+    ieee.get_links_to_papers()
+
+    assert sorted(requested) == list(range(1, 8))
+    assert len(ieee.links_to_paper) == 7 * 3
+
+
+def test_single_page_results(monkeypatch):
+    requested = []
+
+    def post_request(header, json, session=None):
+        requested.append(json["pageNumber"])
+        return FakeResponse(json["pageNumber"], 1)
+
+    monkeypatch.setattr(IEEE, "post_request", staticmethod(post_request))
+
+    ieee = IEEE("sign language")
+    ieee.get_links_to_papers()
+
+    assert requested == [1]
+    assert ieee.payload["rowsPerPage"] == IEEE.rows_per_page
@@ -0,0 +1,53 @@
+from src.incremental import plan_refresh, merge_details
+
+
+def test_only_new_and_changed_results_are_pending():
+    previous_abs = {"3411764.3445123": {"title": "old paper", "link": "https://dl.acm.org/doi/10.1145/3411764.3445123",
+                                        "date": "May 2021", "abs": "kept"},
+                    "3313831.3376101": {"title": "retitled", "link": "https://dl.acm.org/doi/10.1145/3313831.3376101",
+                                        "date": "April 2020", "abs": "stale"}}
+    fresh = {"3411764.3445123": {"title": "old paper", "link": "https://dl.acm.org/doi/10.1145/3411764.3445123",
+                                 "date": "May 2021"},
+             "3313831.3376101": {"title": "retitled paper", "link": "https://dl.acm.org/doi/10.1145/3313831.3376101",
+                                 "date": "April 2020"},
+             "3544548.3580001": {"title": "new paper", "link": "https://dl.acm.org/doi/10.1145/3544548.3580001",
+                                 "date": "April 2023"}}
+
+    pending = plan_refresh('ACM', fresh, {}, previous_abs)
+
+    assert sorted(pending) == ["3313831.3376101", "3544548.3580001"]
+
+    details = {key: dict(value, abs="fresh") for key, value in pending.items()}
+    merged = merge_details('ACM', previous_abs, fresh, details)
+
+    assert merged["3411764.3445123"]["abs"] == "kept"
+    assert merged["3313831.3376101"] == {"title": "retitled paper", "date": "April 2020", "abs": "fresh",
+                                         "link": "https://dl.acm.org/doi/10.1145/3313831.3376101"}
+    assert merged["3544548.3580001"]["abs"] == "fresh"
+
+
+def test_keys_matched_from_links():
+    previous_abs = {"title-S0957417421000001": {"title": "a", "abs": "kept", "type_": "Research article",
+                                                "link": "https://www.sciencedirect.com/science/article/pii/S0957417421000001"}}
+    fresh = {"S0957417421000001": {"title": "a", "type_": "Research article",
+                                   "link": "https://www.sciencedirect.com/science/article/pii/S0957417421000001"}}
+
+    assert plan_refresh('SCIDIR', fresh, {}, previous_abs) == {}
+    assert merge_details('SCIDIR', previous_abs, fresh, {}) == {"title-S0957417421000001": dict(previous_abs["title-S0957417421000001"])}
+
+
+def test_failed_reads_are_pending_again():
+    previous_abs = {"1": {"title": "a", "link": "/document/1/", "abs": float('nan'), "kws": float('nan')},
+                    "2": {"title": "b", "link": "/document/2/", "abs": "A", "kws": ["k"]}}
+    fresh = {"1": {"title": "a", "link": "/document/1/", "abstract": "x", "doi": "10.1109/x.1"},
+             "2": {"title": "b", "link": "/document/2/", "abstract": "y", "doi": "10.1109/x.2"}}
+
+    assert list(plan_refresh('IEEE', fresh, {}, previous_abs)) == ["1"]
+
+
+def test_unchanged_records_keep_listing_fields_only():
+    previous_abs = {"2": {"title": "b", "link": "/document/2/", "abs": "A", "kws": ["k"]}}
+    fresh = {"2": {"title": "b", "link": "/document/2/", "date": "2023", "abstract": "y", "doi": "10.1109/x.2"}}
+
+    assert merge_details('IEEE', previous_abs, fresh, {}) == {"2": {"title": "b", "link": "/document/2/",
+                                                                   "date": "2023", "abs": "A", "kws": ["k"]}}
@@ -0,0 +1,50 @@
+import pytest
+
+from src.index import InvertedIndex, QueryParser, QueryError
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = InvertedIndex()
+    index.add("IEEE", "1", {"title": "Sign language recognition with deep learning",
+                            "abs": "We recognize sign language gestures.", "kws": ["gesture", "CNN"]})
+    index.add("ACM", "2", {"title": "A survey of gesture interfaces",
+                           "abs": "Language models and sign detection.", "kws": float("nan")})
+    index.add("SCIDIR", "3", {"title": "Robot arms", "abs": "Control of robot arms.", "kws": None})
+
+    path = str(tmp_path / "index.pkl")
+    index.save(path)
+
+    return InvertedIndex.load(path)
+
+
+def keys(results):
+    return [r["key"] for r in results]
+
+
+def test_boolean_and_phrase(index):
+    assert keys(index.search('"sign language"')) == ["1"]
+    assert sorted(keys(index.search("sign AND language"))) == ["1", "2"]
+    assert keys(index.search("robot OR survey NOT gesture")) == ["3"]
+    assert sorted(keys(index.search("gesture* OR robot"))) == ["1", "2", "3"]
+
+
+def test_fields(index):
+    assert keys(index.search("Title:survey")) == ["2"]
+    assert keys(index.search('Abstract:(sign AND NOT "sign language")')) == ["2"]
+    assert keys(index.search('("Author Keywords":cnn) AND ("All Metadata":learning)')) == ["1"]
+    assert keys(index.search("[[Keyword: gesture] AND [Title: deep]]")) == ["1"]
+
+
+def test_title_match_ranked_first(index):
+    assert keys(index.search("AllField:gesture")) == ["2", "1"]
+    assert index.search("sign language")[0]["key"] == "1"
+    assert index.count("NOT robot") == 2
+
+
+def test_bad_queries():
+    with pytest.raises(QueryError):
+        QueryParser("(sign AND").parse()
+
+    with pytest.raises(QueryError):
+        QueryParser("Author:smith").parse()
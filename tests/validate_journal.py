@@ -0,0 +1,116 @@
+import json
+import pytest
+
+from src.journal import Journal, atomic_write_json
+from src.acm import Paper
+
+
+def test_truncated_line_ignored(tmp_path):
+    journal = Journal(str(tmp_path / "j.jsonl"))
+    journal.append("a", {"abs": "first"})
+    journal.append("b", {"abs": "second"})
+
+    with open(journal.path, "a") as file:
+        file.write('{"key": "c", "val')
+
+    assert journal.load() == {"a": {"abs": "first"}, "b": {"abs": "second"}}
+
+
+def test_compaction_keeps_latest_record(tmp_path):
+    journal = Journal(str(tmp_path / "j.jsonl"), compact_every=3)
+
+    for i in range(3):
+        journal.append("a", {"abs": i})
+
+    with open(journal.path) as file:
+        assert len(file.readlines()) == 1
+
+    assert journal.load() == {"a": {"abs": 2}}
+
+
+def test_atomic_write(tmp_path):
+    path = str(tmp_path / "out.json")
+    atomic_write_json(path, {"a": 1})
+
+    with open(path) as file:
+        assert json.load(file) == {"a": 1}
+
+    assert [p.name for p in tmp_path.iterdir()] == ["out.json"]
+
+
+def test_resume_skips_finished_papers(tmp_path, monkeypatch):
+    monkeypatch.setattr(Paper, "journal_file", str(tmp_path / "acm_journal.jsonl"))
+    monkeypatch.setattr(Paper, "init_driver", lambda self: None)
+
+    def update_paper(self, value):
+        if value["link"] == "c":
+            raise RuntimeError("browser crashed")
+
+        value["abs"] = f"abstract of {value['link']}"
+
+        return True
+
+    monkeypatch.setattr(Paper, "update_paper", update_paper)
+
+    links = {k: {"link": k} for k in "abcd"}
+    paper = Paper(json.loads(json.dumps(links)))
+
+    with pytest.raises(RuntimeError):
+        paper.batch_update_details(2)
+
+    monkeypatch.setattr(Paper, "update_paper", lambda self, value: value.update(abs="retried") or True)
+
+    paper = Paper(json.loads(json.dumps(links)), resume=True)
+    paper.batch_update_details(2)
+    paper.to_json(str(tmp_path / "abs.json"))
+
+    with open(tmp_path / "abs.json") as file:
+        result = json.load(file)
+
+    assert result["a"]["abs"] == "abstract of a"
+    assert result["b"]["abs"] == "abstract of b"
+    assert result["c"]["abs"] == "retried"
+    assert not (tmp_path / "acm_journal.jsonl").exists()
+
+
+def test_failed_paper_read_again_on_resume(tmp_path, monkeypatch):
+    monkeypatch.setattr(Paper, "journal_file", str(tmp_path / "acm_journal.jsonl"))
+    monkeypatch.setattr(Paper, "init_driver", lambda self: setattr(self, "driver", object()))
+    monkeypatch.setattr(Paper, "close_driver", lambda self: setattr(self, "driver", None))
+    monkeypatch.setattr(Paper, "request_paper", lambda self, link: None)
+    failing = {"b"}
+
+    def get_abstract_text(self):
+        if self.current in failing:
+            failing.remove(self.current)
+            raise RuntimeError("abstract not on the page")
+
+        return f"abstract of {self.current}"
+
+    monkeypatch.setattr(Paper, "get_abstract_text", get_abstract_text)
+    links = {k: {"link": k} for k in "abc"}
+
+    def run(resume):
+        paper = Paper(json.loads(json.dumps(links)), resume=resume)
+        paper.waits = type("Waits", (), {"present": lambda *args: None})()
+        read = []
+
+        def update(value):
+            paper.current = value["link"]
+            read.append(value["link"])
+            return Paper.update_paper(paper, value)
+
+        paper.update_paper = update
+        paper.update_paper_details()
+
+        return paper, read
+
+    paper, read = run(False)
+
+    assert read == ["a", "b", "c"]
+    assert sorted(paper.journal.load()) == ["a", "c"]
+
+    paper, read = run(True)
+
+    assert read == ["b"]
+    assert paper.link_object["b"]["abs"] == "abstract of b"
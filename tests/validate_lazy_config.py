@@ -0,0 +1,35 @@
+import json
+
+import pytest
+
+from benchmarks.import_time import import_time
+from src.utils import LazyConfig
+
+
+class Scrapper:
+    config = LazyConfig()
+    profile = LazyConfig(key='BROWSER_PROFILE', default='default')
+
+
+def test_config_read_on_first_use(tmp_path, monkeypatch):
+    (tmp_path / "config.json").write_text(json.dumps({"BINARY_LOCATION": "chrome", "BROWSER_PROFILE": "lean"}))
+    monkeypatch.chdir(tmp_path)
+
+    assert Scrapper.config["BINARY_LOCATION"] == "chrome"
+    assert Scrapper().profile == "lean"
+
+
+def test_instance_config():
+    scrapper = Scrapper()
+    scrapper.config = {"BINARY_LOCATION": "other"}
+
+    assert scrapper.config["BINARY_LOCATION"] == "other"
+    assert scrapper.profile == "default"
+
+
+@pytest.mark.parametrize("module", ["src.acm", "src.ieee", "src.scidirect", "src.utils"])
+def test_imports_without_config_or_browser(module):
+    result = import_time(module, repeat=1)
+
+    assert "error" not in result
+    assert not {'undetected_chromedriver', 'selenium_stealth', 'numpy', 'pandas'} & set(result["heavy"])
@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from src import metrics
+
+
+@pytest.fixture(autouse=True)
+def clean(tmp_path):
+    metrics.reset(str(tmp_path / "metrics.jsonl"))
+    yield
+    metrics.reset(str(tmp_path / "metrics.jsonl"))
+
+
+def test_timed_outcomes():
+    with metrics.timed('IEEE', 'search_page'):
+        pass
+
+    with metrics.timed('IEEE', 'search_page') as event:
+        event["outcome"] = 'http_503'
+
+    with pytest.raises(KeyError):
+        with metrics.timed('IEEE', 'search_page'):
+            raise KeyError
+
+    merged = metrics.collect('missing.jsonl')
+
+    assert merged["histograms"][('IEEE', 'search_page')]["count"] == 3
+    assert merged["counters"][('IEEE', 'search_page', 'ok')] == 1
+    assert merged["counters"][('IEEE', 'search_page', 'http_503')] == 1
+    assert merged["counters"][('IEEE', 'search_page', 'error')] == 1
+
+
+def test_saved_processes_are_merged(tmp_path):
+    path = str(tmp_path / "metrics.jsonl")
+
+    # a worker process saves its metrics and starts over
+    metrics.observe('ACM', 'paper_page', 0.2)
+    metrics.count('ACM', 'extraction', 'miss')
+    metrics.save(path)
+
+    metrics.observe('ACM', 'paper_page', 3.0, 'blocked')
+
+    result = metrics.export(str(tmp_path / "m.prom"), str(tmp_path / "m.json"), path)
+    text = (tmp_path / "m.prom").read_text()
+
+    assert result["ACM"]["paper_page"]["count"] == 2
+    assert result["ACM"]["paper_page"]["outcomes"] == {"ok": 1, "blocked": 1}
+    assert result["ACM"]["extraction"]["outcomes"] == {"miss": 1}
+    assert json.loads((tmp_path / "m.json").read_text()) == result
+    assert 'scrapper_duration_seconds_bucket{source="ACM",phase="paper_page",le="0.25"} 1' in text
+    assert 'scrapper_duration_seconds_bucket{source="ACM",phase="paper_page",le="+Inf"} 2' in text
+    assert 'scrapper_events_total{source="ACM",phase="extraction",outcome="miss"} 1' in text
+    assert not (tmp_path / "metrics.jsonl").exists()
+
+
+def test_quantile_from_buckets():
+    histogram = {"buckets": [0] * len(metrics.BUCKETS), "sum": 0.0, "count": 0}
+
+    for i, bound in enumerate(metrics.BUCKETS):
+        histogram["buckets"][i] = 0 if bound < 0.1 else 10
+
+    histogram["count"] = 10
+
+    assert 0.05 < metrics.quantile(histogram, 0.5) <= 0.1
+    assert metrics.source_of("https://dl.acm.org/doi/1") == 'ACM'
@@ -0,0 +1,40 @@
+import pytest
+
+from src import orchestrator
+from src.utils import *
+
+
+def config_for(sources):
+    return {s: {"search_term": "",
+                "link_file_save_to": f"./temp/{s}.json",
+                "abs_file_save_to": f"./abs/{s}.json",
+                "use_batches": False,
+                "batch_size": 8,
+                "keep_link_file": True} for s in sources}
+
+
+@pytest.mark.parametrize("concurrent", [False, True])
+def test_failed_source_does_not_stop_others(monkeypatch, concurrent):
+    finished = []
+
+    def run_source(name, config, pool=None, cache=None):
+        if name == 'ACM':
+            raise RuntimeError("blocked")
+
+        finished.append(name)
+
+    monkeypatch.setattr(orchestrator, "run_source", run_source)
+
+    sources = ['ACM', 'IEEE', 'SCIDIR']
+    errors = orchestrator.run_sources(config_for(sources), sources, concurrent)
+
+    assert list(errors) == ['ACM']
+    assert sorted(finished) == ['IEEE', 'SCIDIR']
+
+
+def test_shared_output_path_rejected():
+    config = config_for(['ACM', 'IEEE'])
+    config['IEEE']['abs_file_save_to'] = config['ACM']['abs_file_save_to']
+
+    with pytest.raises(ConfigurationError):
+        orchestrator.run_sources(config, ['ACM', 'IEEE'], True)
@@ -0,0 +1,36 @@
+import pytest
+
+from src import page_stats
+from src.driver_pool import chrome_options
+
+
+class FakeDriver:
+    def __init__(self, size):
+        self.size = size
+
+    def execute_script(self, script):
+        return self.size
+
+
+def test_lean_saving_reported(tmp_path):
+    path = str(tmp_path / "stats.jsonl")
+
+    page_stats.record(FakeDriver(4096), 'default', 2.0)
+    page_stats.record(FakeDriver(2048), 'default', 1.0)
+    page_stats.save(path)
+
+    page_stats.record(FakeDriver(1024), 'lean', 0.5)
+    page_stats.save(path)
+
+    report = page_stats.report(path)
+
+    assert report['default'] == {"pages": 2, "kb_per_page": 3.0, "seconds_per_page": 1.5}
+    assert report['lean_saves'] == {"kb_per_page": 2.0, "seconds_per_page": 1.0}
+
+
+def test_lean_profile_options():
+    assert chrome_options('chrome', 'lean').page_load_strategy == 'eager'
+    assert chrome_options('chrome').page_load_strategy == 'normal'
+
+    with pytest.raises(ValueError):
+        chrome_options('chrome', 'tiny')
@@ -0,0 +1,74 @@
+import json
+import time
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+from src import parallel
+from src.parallel import DetailJob, parallel_update_details
+
+
+def link_file(tmp_path, name, count):
+    path = tmp_path / f"{name}.json"
+
+    with open(path, 'w') as file:
+        json.dump({f"{name}{i}": {"link": f"/{name}/{i}"} for i in range(count)}, file)
+
+    return str(path)
+
+
+def in_threads(monkeypatch, fetch):
+    # workers run as threads, fakes can not be sent to other processes
+    monkeypatch.setattr(parallel, "ProcessPoolExecutor", ThreadPoolExecutor)
+    monkeypatch.setattr(parallel, "fetch_chunk", fetch)
+
+
+def test_host_limit_respected(tmp_path, monkeypatch):
+    lock = threading.Lock()
+    running = {}
+    peak = {}
+
+    def fetch(source, records, options):
+        with lock:
+            running[source] = running.get(source, 0) + 1
+            peak[source] = max(peak.get(source, 0), running[source])
+
+        time.sleep(0.02)
+
+        with lock:
+            running[source] -= 1
+
+        return {key: dict(value, abs="x") for key, value in records.items()}
+
+    in_threads(monkeypatch, fetch)
+    jobs = [DetailJob(name, link_file(tmp_path, name, 8), str(tmp_path / f"{name}_abs.json"))
+            for name in ("ACM", "SCIDIR")]
+
+    parallel_update_details(jobs, workers=4, host_limits={"ACM": 1}, chunk_size=2)
+
+    assert peak["ACM"] == 1 and peak["SCIDIR"] > 1
+    assert all(len(job.finished) == 8 for job in jobs)
+
+
+def test_failed_chunk_not_journaled(tmp_path, monkeypatch):
+    journaled = []
+
+    def fetch(source, records, options):
+        if "ACM2" in records:
+            raise RuntimeError("browser crashed")
+
+        return {key: dict(value, abs="x") for key, value in records.items()}
+
+    in_threads(monkeypatch, fetch)
+    job = DetailJob("ACM", link_file(tmp_path, "ACM", 6), str(tmp_path / "abs.json"))
+    monkeypatch.setattr(job.journal, "append", lambda key, value: journaled.append(key))
+
+    parallel_update_details([job], workers=2, chunk_size=2)
+
+    assert sorted(journaled) == ["ACM0", "ACM1", "ACM4", "ACM5"]
+    assert len(job.errors) == 1 and "browser crashed" in job.errors[0]
+
+    with open(tmp_path / "abs.json") as file:
+        records = json.load(file)
+
+    assert len(records) == 6 and "abs" not in records["ACM2"]
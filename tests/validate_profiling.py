@@ -0,0 +1,42 @@
+import json
+import time
+
+from src import profiling
+
+
+def work():
+    with profiling.span('outer'):
+        with profiling.span('inner'):
+            time.sleep(0.05)
+
+        sum(i * i for i in range(10000))
+
+
+def test_spans_and_stack_dumps(tmp_path):
+    sleep = time.sleep
+
+    profiling.start(cpu=True, memory=True, save_to=str(tmp_path), interval=0.002)
+    work()
+    phases = profiling.stop()
+
+    paths = {p["path"].split(';', 1)[1]: p for p in phases}
+
+    assert paths["outer;inner"]["count"] == 1
+    assert paths["outer;inner;sleep"]["seconds"] >= 0.05
+    assert paths["outer"]["seconds"] >= paths["outer;inner"]["seconds"] >= paths["outer;inner;sleep"]["seconds"]
+    assert paths["outer"]["self_seconds"] < paths["outer"]["seconds"]
+
+    assert json.loads((tmp_path / "spans.json").read_text()) == phases
+    assert all(line.rsplit(' ', 1)[1].isdigit() for line in (tmp_path / "spans.folded").read_text().splitlines())
+    assert 'work (validate_profiling.py' in (tmp_path / "stacks.folded").read_text()
+    assert (tmp_path / "cpu.pstats").exists() and (tmp_path / "memory.txt").exists()
+
+    # wrapped functions are put back
+    assert time.sleep is sleep
+
+
+def test_span_does_nothing_when_not_started():
+    with profiling.span('idle'):
+        pass
+
+    assert profiling.stop() == []
@@ -0,0 +1,52 @@
+from src.rate_limit import HostRateLimiter, limiter_for
+
+
+def test_backs_off_and_recovers():
+    limiter = HostRateLimiter('example.org', rate=1.0, min_rate=0.1, max_rate=1.2, increase=0.1)
+
+    limiter.feedback(429)
+    assert limiter.rate == 0.5
+
+    limiter.feedback(200, blocked=True)
+    limiter.feedback(200, blocked=True)
+    limiter.feedback(503)
+    assert limiter.rate == 0.1
+
+    for _ in range(20):
+        limiter.feedback(200)
+
+    assert limiter.rate == 1.2
+
+
+def test_other_errors_keep_rate():
+    limiter = HostRateLimiter('example.org', rate=1.0)
+    limiter.feedback(404)
+
+    assert limiter.rate == 1.0
+
+
+def test_first_request_does_not_wait():
+    limiter = HostRateLimiter('example.org', rate=100.0, jitter=0.0)
+
+    assert limiter.wait() == 0.0
+    assert limiter.wait() > 0.0
+
+
+def test_limiter_shared_by_host():
+    assert limiter_for('https://dl.acm.org/doi/10.1/x') is limiter_for('dl.acm.org')
+
+
+def test_json_api_paced_apart_from_pages():
+    api = limiter_for('https://ieeexplore.ieee.org/rest/search')
+
+    assert api is limiter_for('https://ieeexplore.ieee.org/rest/document/1/keywords')
+    assert api is not limiter_for('https://ieeexplore.ieee.org/document/1')
+    assert api.rate == 10.0 and api.burst == 4
+    assert limiter_for('https://ieeexplore.ieee.org/document/1').rate == 0.5
+
+
+def test_burst_of_requests_without_waiting():
+    limiter = HostRateLimiter('example.org', rate=10.0, burst=3, jitter=0.0)
+
+    assert [limiter.wait() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.ready_in() > 0.0
@@ -0,0 +1,34 @@
+import json
+
+from openpyxl import load_workbook
+
+from src.sinks import open_sink
+from src.utils import to_excel
+
+
+def test_sheets_from_json_and_jsonl(tmp_path):
+    ieee = tmp_path / "ieee.json"
+    ieee.write_text(json.dumps({"1": {"title": "a", "link": "/document/1/", "abs": float("nan"),
+                                      "kws": ["k1", "k2"]}}))
+
+    with open_sink("jsonl", str(tmp_path / "acm.jsonl")) as sink:
+        sink.write("10.1/2", {"title": "b", "link": "https://dl.acm.org/doi/10.1/2", "type_": "article",
+                              "abs": "text\x01"})
+        sink.write("10.1/3", {"title": "c", "extra": 1})
+
+    path = str(tmp_path / "report.xlsx")
+    written = to_excel({"ieee": str(ieee), "acm": str(tmp_path / "acm.jsonl")}, path, hyperlink=True)
+
+    assert written == {"ieee": 1, "acm": 2}
+
+    workbook = load_workbook(path)
+    ieee_rows = list(workbook["ieee"].values)
+    acm_rows = list(workbook["acm"].values)
+
+    assert ieee_rows[0] == ("key", "title", "link", "abs", "kws")
+    assert ieee_rows[1] == ("1", "a", "/document/1/", None, "k1; k2")
+    assert workbook["ieee"]["C2"].hyperlink.target == "https://ieeexplore.ieee.org/document/1/"
+
+    assert acm_rows[0] == ("key", "title", "link", "type_", "abs", "extra")
+    assert acm_rows[1][4] == "text"
+    assert acm_rows[2] == ("10.1/3", "c", None, None, None, 1)
@@ -0,0 +1,60 @@
+import pytest
+
+from src.retry import RetryPolicy, RetryError, CircuitOpenError, CircuitBreaker, breaker_for
+
+
+def test_retries_until_success():
+    results = iter([500, 503, 200])
+    policy = RetryPolicy(attempts=5, base_delay=0.0)
+
+    assert policy.run(lambda: next(results), 'retry-success.org', failed=lambda code: code != 200) == 200
+    assert breaker_for('retry-success.org').state == 'closed'
+
+
+def test_gives_up_after_attempts():
+    calls = []
+    policy = RetryPolicy(attempts=3, base_delay=0.0)
+
+    def attempt():
+        calls.append(1)
+        raise ConnectionError()
+
+    with pytest.raises(RetryError):
+        policy.run(attempt, 'retry-attempts.org', on_failure=lambda error: calls.append(0))
+
+    # the recovery callback runs between attempts only
+    assert calls == [1, 0, 1, 0, 1]
+
+
+def test_budget_stops_retries():
+    calls = []
+    policy = RetryPolicy(attempts=100, base_delay=10.0, budget=1.0)
+
+    with pytest.raises(RetryError):
+        policy.run(lambda: calls.append(1), 'retry-budget.org', failed=lambda result: True)
+
+    assert len(calls) < 100
+
+
+def test_open_circuit_longer_than_budget():
+    breaker = breaker_for('retry-open.org')
+    breaker.reset_after = 60.0
+
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+
+    with pytest.raises(CircuitOpenError):
+        RetryPolicy(budget=1.0).run(lambda: 200, 'https://retry-open.org/search')
+
+
+def test_half_open_trial():
+    breaker = CircuitBreaker('example.org', failure_threshold=2, reset_after=0.0)
+    breaker.record_failure()
+    breaker.record_failure()
+
+    assert breaker.state == 'open'
+    assert breaker.remaining() == 0.0
+    assert breaker.state == 'half_open'
+
+    breaker.record_failure()
+    assert breaker.state == 'open'
@@ -0,0 +1,201 @@
+import json
+import time
+import threading
+
+from src import scheduler
+from src.ieee import Paper
+from src.journal import Journal
+from src.retry import RetryPolicy
+from src.scheduler import Scheduler, Task, SEARCH, DETAIL
+
+
+def recorder(order, name, fail_first=False):
+    def run():
+        order.append(name)
+
+        if fail_first and order.count(name) == 1:
+            raise RuntimeError("503")
+
+    return run
+
+
+def test_search_before_detail():
+    order = []
+    queue = Scheduler(workers=1, policy=RetryPolicy(attempts=1))
+
+    for name, kind in (('d1', DETAIL), ('d2', DETAIL), ('s1', SEARCH)):
+        queue.submit(Task(recorder(order, name), 'IEEE', 'a.test', kind))
+
+    queue.run()
+
+    assert order == ['s1', 'd1', 'd2']
+
+
+def test_new_before_retried():
+    order = []
+    queue = Scheduler(workers=1, policy=RetryPolicy(attempts=2, base_delay=0.0))
+    queue.submit(Task(recorder(order, 'a', fail_first=True), 'IEEE', 'a.test'))
+    queue.submit(Task(recorder(order, 'b'), 'IEEE', 'a.test'))
+
+    assert queue.run() == {'IEEE': {'done': 2, 'retried': 1, 'failed': 0}}
+    assert order == ['a', 'b', 'a']
+
+
+def test_gives_up_after_attempts():
+    errors = []
+    queue = Scheduler(workers=2, policy=RetryPolicy(attempts=2, base_delay=0.0))
+    queue.submit(Task(lambda: 1 / 0, 'ACM', 'a.test', done=errors.append))
+
+    assert queue.run() == {'ACM': {'done': 0, 'retried': 1, 'failed': 1}}
+    assert 'ZeroDivisionError' in errors[0]
+
+
+def test_queries_share_workers():
+    order = []
+    queue = Scheduler(workers=1, policy=RetryPolicy(attempts=1))
+
+    for i in range(4):
+        queue.submit(Task(recorder(order, f'q1-{i}'), 'IEEE', 'a.test', query='q1'))
+
+    for i in range(2):
+        queue.submit(Task(recorder(order, f'q2-{i}'), 'IEEE', 'a.test', query='q2'))
+
+    queue.run()
+
+    assert order == ['q1-0', 'q2-0', 'q1-1', 'q2-1', 'q1-2', 'q1-3']
+
+
+def test_host_limit():
+    lock = threading.Lock()
+    running = {"now": 0, "peak": 0}
+
+    def run():
+        with lock:
+            running["now"] += 1
+            running["peak"] = max(running["peak"], running["now"])
+
+        time.sleep(0.02)
+
+        with lock:
+            running["now"] -= 1
+
+    queue = Scheduler(workers=4, host_limits={'SCIDIR': 2}, policy=RetryPolicy(attempts=1))
+
+    for _ in range(8):
+        queue.submit(Task(run, 'SCIDIR', 'https://b.test/x'))
+
+    queue.run()
+
+    assert running["peak"] == 2
+
+
+class FakeSearch:
+    base_url = "https://c.test"
+
+    def __init__(self):
+        self.page_count = None
+        self.links_to_paper = {}
+
+    def check_for_multiple_pages(self):
+        self.page_count = 3
+
+        return True
+
+    def pages(self):
+        return range(self.page_count)
+
+    def read_page(self, number):
+        return {f"{number}-{i}": {"link": f"{self.base_url}/{number}/{i}"} for i in range(2)}
+
+    def add_link(self, key, record):
+        self.links_to_paper[key] = record
+
+    def to_json(self, path):
+        with open(path, 'w') as file:
+            json.dump(self.links_to_paper, file)
+
+
+class FakePaper:
+    def __init__(self, link_object, pool=None, cache=None, checkpoint=True, **options):
+        self.driver = None
+
+    def update_paper(self, value):
+        value["abs"] = f"abstract of {value['link']}"
+
+        return True
+
+
+def test_sources_run_through_the_queue(monkeypatch, tmp_path):
+    monkeypatch.setattr(scheduler, 'search_scrapper', lambda name, config, cache=None: FakeSearch())
+    monkeypatch.setattr(scheduler, 'paper_class', lambda name: FakePaper)
+
+    config = {"SCHEDULER": {"workers": 3},
+              "ACM": {"search_term": "",
+                      "link_file_save_to": str(tmp_path / "links.json"),
+                      "abs_file_save_to": str(tmp_path / "abs.json"),
+                      "keep_link_file": False}}
+
+    assert scheduler.run_scheduled(config, ['ACM']) == {}
+
+    with open(tmp_path / "abs.json") as file:
+        records = json.load(file)
+
+    assert len(records) == 6
+    assert records["2-1"]["abs"] == "abstract of https://c.test/2/1"
+    assert not (tmp_path / "links.json").exists()
+
+
+def test_failed_journal_still_saves(monkeypatch, tmp_path):
+    def append(self, key, value):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(scheduler, 'search_scrapper', lambda name, config, cache=None: FakeSearch())
+    monkeypatch.setattr(scheduler, 'paper_class', lambda name: FakePaper)
+    monkeypatch.setattr(Journal, 'append', append)
+
+    config = {"SCHEDULER": {"workers": 2},
+              "ACM": {"search_term": "",
+                      "link_file_save_to": str(tmp_path / "links.json"),
+                      "abs_file_save_to": str(tmp_path / "abs.json"),
+                      "keep_link_file": True}}
+
+    errors = scheduler.run_scheduled(config, ['ACM'])
+
+    assert 'disk full' in errors['ACM']
+
+    with open(tmp_path / "abs.json") as file:
+        assert len(json.load(file)) == 6
+
+
+class FakeApiSearch(FakeSearch):
+    search_url = "https://c.test/rest/search"
+
+    def read_page(self, number):
+        return {f"{number}-{i}": {"link": f"/document/{number}{i}/", "abstract": "searched"} for i in range(2)}
+
+
+class FakeApiPaper(FakePaper):
+    base_url = "https://c.test"
+    use_api = True
+    store_details = staticmethod(Paper.store_details)
+
+    def api_details(self, key, value):
+        return value["abstract"], ["k"]
+
+
+def test_api_details_keep_one_abstract(monkeypatch, tmp_path):
+    monkeypatch.setattr(scheduler, 'search_scrapper', lambda name, config, cache=None: FakeApiSearch())
+    monkeypatch.setattr(scheduler, 'paper_class', lambda name: FakeApiPaper)
+
+    config = {"SCHEDULER": {"workers": 2},
+              "IEEE": {"search_term": "", "use_api": True,
+                       "link_file_save_to": str(tmp_path / "links.json"),
+                       "abs_file_save_to": str(tmp_path / "abs.json"),
+                       "keep_link_file": False}}
+
+    assert scheduler.run_scheduled(config, ['IEEE']) == {}
+
+    with open(tmp_path / "abs.json") as file:
+        records = json.load(file)
+
+    assert records["1-0"] == {"link": "/document/10/", "abs": "searched", "kws": ["k"]}
@@ -0,0 +1,86 @@
+import json
+
+import pytest
+
+from src.screening import compile_rules, keyword_pattern, load_rules, screen
+from src.sinks import read_records
+
+
+@pytest.fixture
+def sources(tmp_path):
+    ieee = {"1": {"title": "Sign language recognition", "date": "Mar 2021", "type_": "Journal",
+                  "abs": "We recognize sign language gestures with deep networks.", "kws": ["gesture", "CNN"]},
+            "2": {"title": "A survey of gesture interfaces", "date": "2019", "type_": "Journal",
+                  "abs": "Gesture interfaces are surveyed.", "kws": None}}
+    acm = {"3": {"title": "Gestural control of robots", "date": "12 May 2012", "type_": "research-article",
+                 "abs": "Robots are controlled by gestures in this work.", "kws": float("nan")},
+           "4": {"title": "Sign detection", "date": None, "type_": "Research-Article", "abs": None}}
+
+    (tmp_path / "ieee.json").write_text(json.dumps(ieee))
+    (tmp_path / "acm.jsonl").write_text(''.join(json.dumps({"key": k, "value": v}) + '\n' for k, v in acm.items()))
+
+    return {"IEEE": str(tmp_path / "ieee.json"), "ACM": str(tmp_path / "acm.jsonl")}
+
+
+def test_keyword_pattern():
+    assert keyword_pattern(["sign language", "gesture*"]) == r'\b(?:sign\s+language|gesture\w*)\b'
+
+
+def test_rule_counts_and_survivors(sources, tmp_path):
+    rules = compile_rules([
+        {"name": "topic", "kind": "keywords", "any": ["sign language", "gestur*"]},
+        {"name": "no surveys", "kind": "keywords", "fields": ["title"], "none": ["survey"]},
+        {"name": "recent", "kind": "year", "min": 2015},
+        {"name": "long", "kind": "abstract_length", "min_words": 5},
+    ])
+
+    report = screen(sources, rules, str(tmp_path / "kept.json"), chunk_size=3)
+
+    assert report["total"] == 4
+    assert report["kept"] == 1
+    assert report["rules"]["topic"] == {"passed": 3, "excluded": 1}
+    assert report["rules"]["no surveys"] == {"passed": 3, "excluded": 1}
+    assert report["rules"]["recent"] == {"passed": 2, "excluded": 2}
+    assert report["rules"]["long"] == {"passed": 2, "excluded": 2}
+    assert [k for k, _ in read_records(str(tmp_path / "kept.json"))] == ["IEEE:1"]
+
+
+def test_type_and_yaml_rules(sources, tmp_path):
+    path = tmp_path / "rules.yaml"
+    path.write_text("rules:\n"
+                    "  - kind: type\n"
+                    "    include: [research-article]\n"
+                    "  - kind: year\n"
+                    "    max: 2015\n"
+                    "    keep_missing: true\n")
+
+    report = screen(sources, load_rules(str(path)))
+
+    assert report["kept"] == 2
+    assert report["rules"]["type_0"] == {"passed": 2, "excluded": 2}
+
+
+def test_unknown_rule_kind():
+    with pytest.raises(ValueError):
+        compile_rules([{"kind": "author"}])
+
+
+def test_failing_rule_keeps_earlier_output(sources, tmp_path):
+    save_to = str(tmp_path / "kept.json")
+    screen(sources, compile_rules([{"name": "recent", "kind": "year", "min": 2015}]), save_to)
+    before = (tmp_path / "kept.json").read_text()
+    screened = []
+
+    def broken(frame):
+        screened.append(len(frame))
+
+        if len(screened) > 1:
+            raise KeyError("abs")
+
+        return [True] * len(frame)
+
+    with pytest.raises(KeyError):
+        screen(sources, [("broken", broken)], save_to, chunk_size=1)
+
+    assert (tmp_path / "kept.json").read_text() == before
+    assert not [p for p in tmp_path.iterdir() if p.name.startswith('.tmp-')]
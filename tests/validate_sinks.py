@@ -0,0 +1,130 @@
+import json
+import math
+import pytest
+
+from src import orchestrator
+from src.ieee import Paper
+from src.sinks import RecordSink, open_sink, read_records, register_sink, stream_details
+
+
+class FakePaper:
+    def __init__(self):
+        self.driver = None
+        self.read = []
+
+    def update_paper(self, value):
+        self.read.append(value["link"])
+        value["abs"] = f"abstract of {value['link']}"
+
+
+@pytest.mark.parametrize("name", ["out.json", "out.jsonl"])
+def test_records_read_back(tmp_path, name):
+    path = str(tmp_path / name)
+
+    with open_sink(name.split('.')[-1], path) as sink:
+        sink.write("a", {"title": "first"})
+        sink.write("b", {"title": "second"})
+
+    assert list(read_records(path)) == [("a", {"title": "first"}), ("b", {"title": "second"})]
+
+
+def test_json_output_matches_old_format(tmp_path):
+    path = str(tmp_path / "out.json")
+
+    with open_sink("json", path) as sink:
+        sink.write(1, {"title": "first"})
+
+    with open(path) as file:
+        assert json.load(file) == {"1": {"title": "first"}}
+
+
+def test_stream_skips_done_and_repeated(tmp_path):
+    path = str(tmp_path / "abs.jsonl")
+    records = [("a", {"link": "x"}), ("b", {"link": "y"}), ("a", {"link": "x"}), ("c", {"link": "z"})]
+    paper = FakePaper()
+
+    with open_sink("jsonl", path, append=True) as sink:
+        assert stream_details(paper, iter(records), sink, done=["b"]) == 2
+
+    assert paper.read == ["x", "z"]
+    assert dict(read_records(path))["c"] == {"link": "z", "abs": "abstract of z"}
+
+
+def test_kind_decides_reader_not_extension(tmp_path):
+    path = str(tmp_path / "out.json")
+
+    with open_sink("jsonl", path) as sink:
+        sink.write("a", {"title": "first"})
+        sink.write("b", {"title": "second"})
+
+    assert list(read_records(path, "jsonl")) == [("a", {"title": "first"}), ("b", {"title": "second"})]
+
+
+def test_failed_json_output_keeps_earlier_file(tmp_path):
+    path = str(tmp_path / "out.json")
+
+    with open_sink("json", path) as sink:
+        sink.write("a", {"title": "first"})
+
+    with pytest.raises(RuntimeError):
+        with open_sink("json", path) as sink:
+            sink.write("b", {"title": "second"})
+            raise RuntimeError("blocked")
+
+    assert dict(read_records(path, "json")) == {"a": {"title": "first"}}
+    assert [p.name for p in tmp_path.iterdir()] == ["out.json"]
+
+
+class FakeApiPaper:
+    use_api = True
+    store_details = staticmethod(Paper.store_details)
+
+    def api_details(self, key, value):
+        return (value["abstract"], ["k"]) if key != "bad" else (math.nan, math.nan)
+
+
+def test_streamed_api_records_keep_one_abstract(tmp_path):
+    path = str(tmp_path / "abs.jsonl")
+    records = [("a", {"link": "x", "abstract": "searched"}), ("bad", {"link": "y", "abstract": None})]
+
+    with open_sink("jsonl", path) as sink:
+        stream_details(FakeApiPaper(), iter(records), sink)
+
+    saved = dict(read_records(path))
+
+    assert saved["a"] == {"link": "x", "abs": "searched", "kws": ["k"]}
+    assert math.isnan(saved["bad"]["abs"]) and "abstract" in saved["bad"]
+
+
+def test_resume_reads_failed_papers_again(tmp_path, monkeypatch):
+    link_file, save_to = str(tmp_path / "links.jsonl"), str(tmp_path / "abs.jsonl")
+    config = {"ACM": {"stream": "jsonl", "resume": True, "link_file_save_to": link_file, "abs_file_save_to": save_to}}
+    paper = FakePaper()
+
+    def search_source(name, config, cache=None, sink=None):
+        sink.write("a", {"link": "x"})
+        sink.write("b", {"link": "y"})
+
+    monkeypatch.setattr(orchestrator, "search_source", search_source)
+    monkeypatch.setattr(orchestrator, "paper_class", lambda name: lambda *args, **kwargs: paper)
+
+    with open_sink("jsonl", save_to) as sink:
+        sink.write("a", {"link": "x", "abs": "kept"})
+        sink.write("b", {"link": "y", "abs": math.nan})
+
+    orchestrator.stream_source("ACM", config)
+
+    assert paper.read == ["y"]
+    assert dict(read_records(save_to))["b"]["abs"] == "abstract of y"
+
+
+def test_sink_without_write_fails_when_opened(monkeypatch):
+    class Incomplete(RecordSink):
+        def __init__(self, path, append=False):
+            self.path = path
+
+    monkeypatch.setattr("src.sinks.SINKS", {})
+    register_sink("incomplete", Incomplete)
+
+    with pytest.raises(TypeError):
+        open_sink("incomplete", "out.txt")
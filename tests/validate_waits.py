@@ -0,0 +1,16 @@
+from src.waits import PageWaits
+
+
+def test_ready_condition_returns_at_once():
+    waits = PageWaits('ACM', timeout=5.0)
+
+    assert waits.until(object(), lambda driver: 'element', 'abstract') == 'element'
+    assert waits.stats()['abstract']['count'] == 1
+    assert waits.stats()['abstract']['max'] < 1.0
+
+
+def test_timeout_recorded():
+    waits = PageWaits('ACM', timeout=0.2, poll=0.05)
+
+    assert waits.until(object(), lambda driver: False, 'keywords') is None
+    assert waits.stats()['keywords']['timeouts'] == 1